@@ -1,7 +1,13 @@
 from rlbot.agents.base_agent import SimpleControllerState
 
+from skeleton.util.agent_component import AgentComponent
+from skeleton.util.instrumentation import PHASE_ACTION
+
+
+class BaseAction(AgentComponent):
+    instrumented_method = "get_controls"
+    instrumented_phase = PHASE_ACTION
 
-class BaseAction:
     def __init__(self, agent, rendering_enabled=False):
         self.agent = agent
         self.rendering_enabled = rendering_enabled
@@ -11,3 +17,9 @@ class BaseAction:
 
     def get_controls(self, game_data) -> SimpleControllerState:
         raise NotImplementedError
+
+    def reset(self):
+        """Makes a finished or failed action ready to be used again, instead of creating a new one.
+        Inheriting classes should also reset their mechanics, but can keep caches that are still valid."""
+        self.finished = False
+        self.failed = False
@@ -1,10 +1,15 @@
 import time
 from rlbot.agents.base_agent import SimpleControllerState
 from skeleton import SkeletonAgent
+from util.boost_utils import PAD_TABLE
+from util.physics.turn_time_table import TURN_TABLE
 from .base_action import BaseAction
 
 
 class BaseTestAgent(SkeletonAgent):
+    # the same tables as DisasterBot
+    shared_tables = (TURN_TABLE, PAD_TABLE)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.action = self.create_action()
@@ -20,6 +25,7 @@ class BaseTestAgent(SkeletonAgent):
         return SimpleControllerState()
 
     def retire(self):
+        super().retire()
         self.matchcomms.outgoing_broadcast.put_nowait("pass")
         while not self.matchcomms.outgoing_broadcast.empty():
             time.sleep(0.01)
@@ -36,10 +42,10 @@ class BaseTestAgent(SkeletonAgent):
 
         if self.action.finished:
             outgoing.put_nowait("pass")
-            self.action = self.create_action()
+            self.action.reset()
             self.initialized = False
 
         if self.action.failed:
             outgoing.put_nowait("fail")
-            self.action = self.create_action()
+            self.action.reset()
             self.initialized = False
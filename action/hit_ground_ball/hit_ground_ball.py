@@ -1,31 +1,68 @@
-import numpy as np
-
 from rlbot.agents.base_agent import SimpleControllerState
 
 from skeleton.util.conversion import rotation_to_matrix
+from skeleton.util.governor import DEGRADE_INTERCEPT_HORIZON, DEGRADE_REUSE_PLANS, SHORT_INTERCEPT_HORIZON
+from skeleton.util.scheduler import PRIORITY_SEARCH
 
 from action.base_action import BaseAction
 from mechanic.drive_arrive_in_time import DriveArriveInTime
 
-from util.collision_utils import box_ball_collision_distance, box_ball_low_location_on_collision
-from util.physics.drive_1d_time import state_at_time_vectorized
+from util.collision_utils import box_ball_low_location_on_collision
+from util.intercept_utils import earliest_intercept, ball_location_at_time, car_intercept_margin
+from util.linear_algebra import norm
+
+# the car's elevation from the ground due to wheels and suspension
+ORIGIN_HEIGHT = 17
+
+# how far the predicted ball location at the intercept time can move before we search again
+DRIFT_TOLERANCE = 20
+# how far behind the fastest arrival schedule the car can fall before we search again
+SCHEDULE_TOLERANCE = 50
+# the target is searched again every so many ticks even if it's still valid, to find earlier intercepts
+REFRESH_INTERVAL = 15
+
+# the instrumentation counters of the ticks that reused the cached intercept, and of the ones that searched again
+CACHE_HITS = "intercept cache hits"
+CACHE_MISSES = "intercept cache misses"
 
 
 class HitGroundBall(BaseAction):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.mechanic = DriveArriveInTime(self.agent, rendering_enabled=self.rendering_enabled)
+        self.mechanic = DriveArriveInTime(self.agent, rendering_enabled=self._rendering_enabled)
         self.target_loc = None
         self.target_time = None
 
+        # cached intercept
+        self.target_ball_loc = None
+        self.touch_time = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def reset(self):
+        super().reset()
+        self.mechanic.reset()
+
+    @property
+    def cache_hit_rate(self) -> float:
+        return self.cache_hits / max(self.cache_hits + self.cache_misses, 1)
+
     def get_controls(self, game_data) -> SimpleControllerState:
 
-        if self.target_loc is None or True:
-            # remove "or True" to test the accuracy without recalculating each tick.
-            self.target_loc, target_dt = self.get_target_ball_state(game_data)
-            self.target_time = game_data.time + target_dt
+        if self.is_cache_valid(game_data):
+            self.cache_hits += 1
+            self.agent.instrumentation.count(CACHE_HITS)
+            if self.is_refresh_due(game_data) and not self.agent.governor.degraded(DEGRADE_REUSE_PLANS):
+                # not needed for this tick's controls, so it only runs if there's time left
+                self.agent.scheduler.submit("intercept search", lambda: self.update_target(game_data), PRIORITY_SEARCH)
+        else:
+            self.cache_misses += 1
+            self.agent.instrumentation.count(CACHE_MISSES)
+            self.update_target(game_data)
 
         target_dt = self.target_time - game_data.time
+        if self.agent.telemetry is not None:
+            self.agent.telemetry.set("intercept_time", target_dt)
         self.controls = self.mechanic.step(game_data.my_car, self.target_loc, target_dt)
 
         self.finished = self.mechanic.finished
@@ -33,50 +70,82 @@ class HitGroundBall(BaseAction):
 
         return self.controls
 
-    @staticmethod
-    def get_target_ball_state(game_data):
+    def update_target(self, game_data):
+        horizon = SHORT_INTERCEPT_HORIZON if self.agent.governor.degraded(DEGRADE_INTERCEPT_HORIZON) else None
+        self.target_loc, target_dt, self.target_ball_loc = self.get_target(
+            game_data, horizon, self.agent.instrumentation
+        )
+        self.target_time = game_data.time + target_dt
+        self.touch_time = game_data.ball.touch_time
 
-        ball_prediction = game_data.ball_prediction
-        car = game_data.my_car
-        car_rot = rotation_to_matrix([0, car.rotation[1], car.rotation[2]])
+    def is_cache_valid(self, game_data) -> bool:
+        """The cached intercept is still valid if nothing touched the ball, the ball prediction
+        at the intercept time didn't drift and the car can still get there in time."""
 
-        ball = game_data.ball
+        if self.target_ball_loc is None or game_data.ball.touch_time != self.touch_time:
+            return False
 
-        hitbox_height = car.hitbox_corner[2] + car.hitbox_offset[2]
-        origin_height = 17  # the car's elevation from the ground due to wheels and suspension
+        target_dt = self.target_time - game_data.time
+        if target_dt < 0:
+            return False
 
-        # only accurate if we're already moving towards the target
-        boost = np.array([car.boost] * len(ball_prediction), dtype=np.float64)
+        ball_loc = ball_location_at_time(game_data.ball_prediction, self.target_time)
+        if norm(ball_loc - self.target_ball_loc) > DRIFT_TOLERANCE:
+            return False
 
-        location_slices = ball_prediction["physics"]["location"]
+        car_rot, max_height = self.get_car_rot_and_max_height(game_data)
+        margin = car_intercept_margin(ball_loc, target_dt, game_data.my_car, car_rot, game_data.ball.radius, max_height)
+        return margin > -SCHEDULE_TOLERANCE
 
-        distance_slices = box_ball_collision_distance(
-            location_slices, car.location, car_rot, car.hitbox_corner, car.hitbox_offset, ball.radius,
-        )
-        time_slices = np.array(ball_prediction["game_seconds"] - game_data.time, dtype=np.float64)
+    def is_refresh_due(self, game_data) -> bool:
+        """Periodic refresh, offset by the car index so that bots don't all search on the same tick."""
+        return (game_data.counter + game_data.index) % REFRESH_INTERVAL == 0
 
-        not_too_high = location_slices[:, 2] < ball.radius + hitbox_height + origin_height
+    @staticmethod
+    def get_car_rot_and_max_height(game_data):
+        car = game_data.my_car
+        car_rot = rotation_to_matrix([0, car.rotation[1], car.rotation[2]])
 
-        velocity = car.velocity[None, :]
-        direction_slices = location_slices - car.location
-        velocity = np.sum(velocity * direction_slices, 1) / np.linalg.norm(direction_slices, 2, 1)
-        velocity = np.array(velocity, dtype=np.float64)
+        hitbox_height = car.hitbox_corner[2] + car.hitbox_offset[2]
+        max_height = game_data.ball.radius + hitbox_height + ORIGIN_HEIGHT
 
-        reachable = (state_at_time_vectorized(time_slices, velocity, boost)[0] > distance_slices) & not_too_high
+        return car_rot, max_height
 
-        filtered_prediction = ball_prediction[reachable]
+    @staticmethod
+    def get_target(game_data, horizon: float = None, instrumentation=None):
+        """Returns the target location for the car, the time until the intercept
+        and the ball location at the intercept, or None if there's no reachable intercept.
+        Only the first horizon seconds of the ball prediction are searched, if given.
+        The slices culled by the search's broad phase are counted in the instrumentation, if given."""
 
-        target_loc = game_data.ball_prediction[-1]["physics"]["location"].copy()
-        target_loc[2] = origin_height
-        target_dt = game_data.ball_prediction[-1]["game_seconds"] - game_data.time
+        ball_prediction = game_data.ball_prediction
+        if horizon is not None:
+            in_horizon = ball_prediction[ball_prediction["game_seconds"] <= game_data.time + horizon]
+            if len(in_horizon) > 0:
+                ball_prediction = in_horizon
+        car = game_data.my_car
+        ball = game_data.ball
+        car_rot, max_height = HitGroundBall.get_car_rot_and_max_height(game_data)
+
+        intercept = earliest_intercept(ball_prediction, game_data.time, car, car_rot, ball.radius, max_height)
+        if intercept is not None and instrumentation is not None:
+            instrumentation.count("culled slices", intercept.culled)
 
-        if len(filtered_prediction) > 0:
-            target_loc = filtered_prediction[0]["physics"]["location"]
-            target_dt = filtered_prediction[0]["game_seconds"] - game_data.time
-            target_loc = box_ball_low_location_on_collision(
-                target_loc, car.location, car_rot, car.hitbox_corner, car.hitbox_offset, ball.radius,
-            )
+        if intercept is None:
+            target_loc = ball_prediction[-1]["physics"]["location"].copy()
+            target_loc[2] = ORIGIN_HEIGHT
+            target_dt = ball_prediction[-1]["game_seconds"] - game_data.time
+            return target_loc, target_dt, None
+
+        target_loc = box_ball_low_location_on_collision(
+            intercept.ball_location, car.location, car_rot, car.hitbox_corner, car.hitbox_offset, ball.radius,
+        )
 
+        return target_loc, intercept.time, intercept.ball_location
+
+    @staticmethod
+    def get_target_ball_state(game_data):
+        target_loc, target_dt, _ = HitGroundBall.get_target(game_data)
         return target_loc, target_dt
 
     def is_valid(self, game_data):
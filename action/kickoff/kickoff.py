@@ -8,7 +8,11 @@ from mechanic.drive_navigate_boost import DriveNavigateBoost
 class Kickoff(BaseAction):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.mechanic = DriveNavigateBoost(self.agent, self.rendering_enabled)
+        self.mechanic = DriveNavigateBoost(self.agent, self._rendering_enabled)
+
+    def reset(self):
+        super().reset()
+        self.mechanic.reset()
 
     def get_controls(self, game_data) -> SimpleControllerState:
 
@@ -1,8 +1,12 @@
 from skeleton import SkeletonAgent
 from policy.example_policy.example_policy import ExamplePolicy
+from util.boost_utils import PAD_TABLE
+from util.physics.turn_time_table import TURN_TABLE
 
 
 class DisasterBot(SkeletonAgent):
+    shared_tables = (TURN_TABLE, PAD_TABLE)
+
     def __init__(self, name, team, index):
         super(DisasterBot, self).__init__(name, team, index)
         self.policy = ExamplePolicy(self)
@@ -10,6 +14,8 @@ class DisasterBot(SkeletonAgent):
     def get_controls(self):
 
         action = self.policy.get_action(self.game_data)
+        if self.telemetry is not None:
+            self.telemetry.set_action(action)
         controls = action.get_controls(self.game_data)
 
         return controls
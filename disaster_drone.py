@@ -0,0 +1,11 @@
+from pathlib import Path
+
+from rlbot.agents.hivemind.drone_agent import DroneAgent
+
+
+class DisasterDrone(DroneAgent):
+    """Participant controlled by the DisasterHivemind, one hivemind process runs all the drones of a team."""
+
+    hive_path = str(Path(__file__).parent / "disaster_hivemind.py")
+    hive_key = "DisasterBot"
+    hive_name = "DisasterBot Hivemind"
@@ -0,0 +1,10 @@
+from pathlib import Path
+
+from skeleton.skeleton_hivemind import SkeletonHivemind
+from disaster_bot import DisasterBot
+
+
+class DisasterHivemind(SkeletonHivemind):
+    agent_class = DisasterBot
+    # the drones are configured like single bots
+    config_file = str(Path(__file__).parent / "disaster_bot.cfg")
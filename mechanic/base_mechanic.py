@@ -1,7 +1,13 @@
 from rlbot.agents.base_agent import SimpleControllerState
 
+from skeleton.util.agent_component import AgentComponent
+from skeleton.util.instrumentation import PHASE_MECHANIC
+
+
+class BaseMechanic(AgentComponent):
+    instrumented_method = "step"
+    instrumented_phase = PHASE_MECHANIC
 
-class BaseMechanic:
     def __init__(self, agent, rendering_enabled=False):
         self.controls = SimpleControllerState()
         self.agent = agent
@@ -11,3 +17,13 @@ class BaseMechanic:
 
     def step(self, *args) -> SimpleControllerState:
         raise NotImplementedError
+
+    def reset(self):
+        """Makes a finished or failed mechanic ready to be used again, instead of creating a new one.
+        Inheriting classes should also reset the mechanics they're made of."""
+        self.finished = False
+        self.failed = False
+
+    def close(self):
+        """Stops the background work of a mechanic that's discarded before the agent retires.
+        Inheriting classes should also close the mechanics they're made of."""
@@ -1,10 +1,15 @@
 import time
 from rlbot.agents.base_agent import SimpleControllerState
 from skeleton import SkeletonAgent
+from util.boost_utils import PAD_TABLE
+from util.physics.turn_time_table import TURN_TABLE
 from .base_mechanic import BaseMechanic
 
 
 class BaseTestAgent(SkeletonAgent):
+    # the same tables as DisasterBot
+    shared_tables = (TURN_TABLE, PAD_TABLE)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.mechanic = self.create_mechanic()
@@ -23,6 +28,7 @@ class BaseTestAgent(SkeletonAgent):
         raise NotImplementedError
 
     def retire(self):
+        super().retire()
         self.matchcomms.outgoing_broadcast.put_nowait("pass")
         while not self.matchcomms.outgoing_broadcast.empty():
             time.sleep(0.01)
@@ -39,10 +45,10 @@ class BaseTestAgent(SkeletonAgent):
 
         if self.mechanic.finished:
             outgoing.put_nowait("pass")
-            self.mechanic = self.create_mechanic()
+            self.mechanic.reset()
             self.initialized = False
 
         if self.mechanic.failed:
             outgoing.put_nowait("fail")
-            self.mechanic = self.create_mechanic()
+            self.mechanic.reset()
             self.initialized = False
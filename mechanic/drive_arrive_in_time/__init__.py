@@ -1 +1,8 @@
-from .drive_arrive_in_time import DriveArriveInTime, throttle_velocity, boost_velocity
+from .drive_arrive_in_time import (
+    DriveArriveInTime,
+    throttle_velocity,
+    boost_velocity,
+    arrive_in_time_controls,
+    arrive_in_time_controls_vectorized,
+    arrive_in_time_controls_batch,
+)
@@ -1,12 +1,15 @@
 import math
 import numpy as np
+from numba import jit, guvectorize, f8, b1
 
 from rlbot.agents.base_agent import SimpleControllerState
 
 from mechanic.base_mechanic import BaseMechanic
-from mechanic.drive_turn_face_target import DriveTurnFaceTarget
+from mechanic.drive_turn_face_target import turn_face_target_controls
 
-from util.numerics import clip, sign
+from skeleton.util.scheduler import PRIORITY_RENDERING
+
+from util.numerics import jit_clip, jit_sign
 from util.physics.drive_1d_simulation_utils import (
     throttle_acceleration,
     BOOST_MIN_ACCELERATION,
@@ -18,71 +21,64 @@ from util.render_utils import render_hitbox, render_car_text
 
 PI = math.pi
 
+throttle_acceleration = jit(nopython=True, fastmath=True, cache=True)(throttle_acceleration)
 
-class DriveArriveInTime(BaseMechanic):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.turn_mechanic = DriveTurnFaceTarget(self.agent, rendering_enabled=False)
 
+class DriveArriveInTime(BaseMechanic):
     def step(self, car, target_loc, time) -> SimpleControllerState:
 
-        turn_mechanic_controls = self.turn_mechanic.step(car, target_loc)
-        self.controls.steer = turn_mechanic_controls.steer
-        self.controls.handbrake = turn_mechanic_controls.handbrake
-
         # useful variables
         delta_time = car.time - car.last_time
         if delta_time == 0:
             delta_time = 1 / 60
 
-        target_in_local_coords = (target_loc - car.location).dot(car.rotation_matrix)
-        car_forward_velocity = car.velocity.dot(car.rotation_matrix[:, 0])
+        target_in_local_coords = car.local_coords(target_loc)
         distance = np.linalg.norm(target_in_local_coords)
 
-        car_ang_vel_local_coords = np.dot(car.angular_velocity, car.rotation_matrix)
+        if self.agent.telemetry is not None:
+            self.agent.telemetry.set("target", target_loc)
 
-        # arrive in time
-        desired_vel = clip(distance / max(time - delta_time, 1e-5), -2300, 2300)
-
-        # throttle to desired velocity
-        self.controls.throttle = throttle_velocity(car_forward_velocity, desired_vel, delta_time)
-
-        # boost to desired velocity
-        self.controls.boost = not self.controls.handbrake and boost_velocity(
-            car_forward_velocity, desired_vel, delta_time
+        steer, throttle, boost, handbrake = arrive_in_time_controls(
+            target_in_local_coords, car.local_velocity, car.local_angular_velocity, time, delta_time
         )
-
-        # This makes sure we're not powersliding
-        # if the car is spinning the opposite way we're steering towards
-        if car_ang_vel_local_coords[2] * self.controls.steer < 0:
-            self.controls.handbrake = False
-        # and also not boosting if we're sliding the opposite way we're throttling towards.
-        if car_forward_velocity * self.controls.throttle < 0:
-            self.controls.handbrake = self.controls.boost = False
+        self.controls.steer = steer
+        self.controls.throttle = throttle
+        self.controls.boost = boost
+        self.controls.handbrake = handbrake
 
         # rendering
         if self.rendering_enabled:
-            text_list = [
-                f"target_height : {target_loc[2]}",
-                f"desired_vel : {desired_vel:.2f}",
-                f"time : {time:.2f}",
-                f"throttle : {self.controls.throttle:.2f}",
-            ]
-
-            color = self.agent.renderer.white()
-
-            self.agent.renderer.begin_rendering()
-            # rendering all debug text in 3d near the car
-            render_car_text(self.agent.renderer, car, text_list, color)
-            # rendering a line from the car to the target
-            self.agent.renderer.draw_rect_3d(target_loc, 20, 20, True, self.agent.renderer.red())
-            self.agent.renderer.draw_line_3d(car.location, target_loc, color)
-            # hitbox rendering
-            render_hitbox(
-                self.agent.renderer, car.location, car.rotation_matrix, color, car.hitbox_corner, car.hitbox_offset,
+
+            def render():
+                desired_vel = arrive_in_time_velocity(distance, time, delta_time)
+                text_list = [
+                    f"target_height : {target_loc[2]}",
+                    f"desired_vel : {desired_vel:.2f}",
+                    f"time : {time:.2f}",
+                    f"throttle : {self.controls.throttle:.2f}",
+                ]
+
+                color = self.agent.render_buffer.white()
+
+                # rendering all debug text in 3d near the car
+                render_car_text(self.agent.render_buffer, car, text_list, color)
+                # rendering a line from the car to the target
+                self.agent.render_buffer.draw_rect_3d(target_loc, 20, 20, True, self.agent.render_buffer.red())
+                self.agent.render_buffer.draw_line_3d(car.location, target_loc, color)
+                # hitbox rendering
+                render_hitbox(
+                    self.agent.render_buffer,
+                    car.location,
+                    car.rotation_matrix,
+                    color,
+                    car.hitbox_corner,
+                    car.hitbox_offset,
+                )
+                self.agent.render_buffer.draw_rect_3d(car.location, 20, 20, True, self.agent.render_buffer.grey())
+
+            self.agent.scheduler.submit(
+                f"render {self.__class__.__name__}", render, PRIORITY_RENDERING, carry_over=False
             )
-            self.agent.renderer.draw_rect_3d(car.location, 20, 20, True, self.agent.renderer.grey())
-            self.agent.renderer.end_rendering()
 
         # updating status
         if distance < 20 and abs(time) < 0.05:
@@ -93,17 +89,19 @@ class DriveArriveInTime(BaseMechanic):
         return self.controls
 
 
+@jit(nopython=True, nogil=True, fastmath=True, cache=True)
 def throttle_velocity(vel, desired_vel, dt):
     """Model based throttle to velocity"""
-    desired_accel = (desired_vel - vel) / dt * sign(desired_vel)
+    desired_accel = (desired_vel - vel) / dt * jit_sign(desired_vel)
     if desired_accel > 0:
-        return clip(desired_accel / max(throttle_acceleration(vel, 1), 0.001)) * sign(desired_vel)
+        return jit_clip(desired_accel / max(throttle_acceleration(vel, 1), 0.001)) * jit_sign(desired_vel)
     elif -BREAK_ACCELERATION < desired_accel <= 0:
         return 0
     else:
         return -1
 
 
+@jit(nopython=True, nogil=True, fastmath=True, cache=True)
 def boost_velocity(vel, desired_vel, dt):
     """Model based velocity boost control"""
     if desired_vel < vel or vel < 0 or vel > MAX_CAR_SPEED - 1:
@@ -112,3 +110,82 @@ def boost_velocity(vel, desired_vel, dt):
     else:
         desired_accel = (desired_vel - vel) / dt
         return desired_accel > (BOOST_MIN_ACCELERATION + throttle_acceleration(vel, 1) * BOOST_MIN_TIME / dt) / 2
+
+
+@jit(nopython=True, nogil=True, fastmath=True, cache=True)
+def arrive_in_time_velocity(distance, time, delta_time):
+    """The velocity needed to cover the distance in time"""
+    return jit_clip(distance / max(time - delta_time, 1e-5), -MAX_CAR_SPEED, MAX_CAR_SPEED)
+
+
+@jit(nopython=True, nogil=True, fastmath=True, cache=True)
+def arrive_in_time_controls(target_in_local_coords, car_local_velocity, car_ang_vel_local_coords, time, delta_time):
+    """All of DriveArriveInTime's controls in one call, from the target and the car's velocities in local coordinates.
+    Returns (steer, throttle, boost, handbrake)."""
+
+    steer, handbrake, _, _ = turn_face_target_controls(
+        target_in_local_coords, car_local_velocity, car_ang_vel_local_coords
+    )
+
+    car_forward_velocity = car_local_velocity[0]
+    distance = math.sqrt(
+        target_in_local_coords[0] ** 2 + target_in_local_coords[1] ** 2 + target_in_local_coords[2] ** 2
+    )
+
+    # arrive in time
+    desired_vel = arrive_in_time_velocity(distance, time, delta_time)
+
+    # throttle to desired velocity
+    throttle = float(throttle_velocity(car_forward_velocity, desired_vel, delta_time))
+
+    # boost to desired velocity
+    boost = not handbrake and boost_velocity(car_forward_velocity, desired_vel, delta_time)
+
+    # This makes sure we're not powersliding
+    # if the car is spinning the opposite way we're steering towards
+    if car_ang_vel_local_coords[2] * steer < 0:
+        handbrake = False
+    # and also not boosting if we're sliding the opposite way we're throttling towards.
+    if car_forward_velocity * throttle < 0:
+        handbrake = boost = False
+
+    return steer, throttle, boost, handbrake
+
+
+@guvectorize(
+    ["(f8[:, :], f8[:], f8[:], f8[:], f8, f8[:], f8[:], b1[:], b1[:])"],
+    "(n, k), (n), (k), (k), () -> (n), (n), (n), (n)",
+    nopython=True,
+)
+def arrive_in_time_controls_vectorized(
+    target_in_local_coords,
+    time,
+    car_local_velocity,
+    car_ang_vel_local_coords,
+    delta_time,
+    out_steer,
+    out_throttle,
+    out_boost,
+    out_handbrake,
+) -> None:
+    """Returns the controls (steer[], throttle[], boost[], handbrake[]) for many candidate targets and times."""
+    for i in range(len(time)):
+        out_steer[i], out_throttle[i], out_boost[i], out_handbrake[i] = arrive_in_time_controls(
+            target_in_local_coords[i], car_local_velocity, car_ang_vel_local_coords, time[i], delta_time
+        )
+
+
+def arrive_in_time_controls_batch(car, target_locs: np.ndarray, times: np.ndarray):
+    """What DriveArriveInTime would do this tick for each of the target locations and times."""
+    delta_time = car.time - car.last_time
+    if delta_time == 0:
+        delta_time = 1 / 60
+
+    target_in_local_coords = np.dot(np.asarray(target_locs, dtype=np.float64) - car.location, car.rotation_matrix)
+    return arrive_in_time_controls_vectorized(
+        target_in_local_coords,
+        np.asarray(times, dtype=np.float64),
+        np.asarray(car.local_velocity, dtype=np.float64),
+        np.asarray(car.local_angular_velocity, dtype=np.float64),
+        float(delta_time),
+    )
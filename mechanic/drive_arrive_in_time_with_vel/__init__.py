@@ -1 +1,10 @@
-from .drive_arrive_in_time_with_vel import DriveArriveInTimeWithVel
+from .drive_arrive_in_time_with_vel import (
+    DriveArriveInTimeWithVel,
+    arrive_with_vel_plan,
+    arrive_with_vel_plan_vectorized,
+    PHASE_REVERSE,
+    PHASE_ACCELERATE,
+    PHASE_CRUISE,
+    PHASE_BRAKE,
+    PHASE_NAMES,
+)
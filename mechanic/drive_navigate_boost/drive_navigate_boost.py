@@ -1,22 +1,100 @@
+from typing import Optional
+
+import numpy as np
 from rlbot.agents.base_agent import SimpleControllerState
 
 from mechanic.base_mechanic import BaseMechanic
 from mechanic.drive_arrive_in_time import DriveArriveInTime
+from skeleton.util.governor import DEGRADE_REUSE_PLANS
 from skeleton.util.structure import Player
 
 from util.linear_algebra import norm
 from util.path_finder import find_fastest_path, first_target, optional_boost_target
+from util.physics.turn_time_table import TURN_TABLE
+
+# how far the target can move from the one the boost route was planned for, before the plan is recomputed inline
+PLANNED_TARGET_TOLERANCE = 100
+
+# seconds of game time after which the target is planned again even if it didn't move, less than the planner's max_age
+PLAN_RESUBMIT_AGE = 0.05
+
+
+def plan_boost_target(snapshot):
+    """The boost pad to pick up on the way to the target, None if it's faster to go straight to the target."""
+    boost_pads, location, target_loc, velocity, boost, forward, yaw_rate, tables = snapshot
+    turn_table = tables.get(TURN_TABLE)
+    target = optional_boost_target(boost_pads, location, target_loc, velocity, boost, forward, yaw_rate, turn_table)
+    return target_loc, None if (target == target_loc).all() else target
 
 
 class DriveNavigateBoost(BaseMechanic):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.mechanic = DriveArriveInTime(self.agent, rendering_enabled=self.rendering_enabled)
+        self.mechanic = DriveArriveInTime(self.agent, rendering_enabled=self._rendering_enabled)
+        self.planner = self.agent.create_planner(plan_boost_target, "boost route planner")
+
+        # the target and the game time of the last snapshot submitted to the planner
+        self.submitted_target = None
+        self.submitted_time = 0.0
+
+    def reset(self):
+        super().reset()
+        self.mechanic.reset()
+        self.submitted_target = None
+        self.submitted_time = 0.0
+
+    def close(self):
+        self.planner.close()
+        self.mechanic.close()
+
+    def snapshot(self, car: Player, boost_pads, target_loc) -> tuple:
+        # the pads are updated in place, the rest is replaced every tick
+        return (
+            boost_pads.copy(),
+            car.location,
+            target_loc.copy(),
+            car.velocity,
+            car.boost,
+            car.rotation_matrix[:, 0],
+            car.angular_velocity[2],
+            self.agent.tables,
+        )
+
+    def boost_target(self, car: Player, boost_pads, target_loc) -> Optional[np.ndarray]:
+        """The boost pad to pick up on the way to the target, None to go straight to it. From the planner when it has
+        a plan for this target."""
+        # a new snapshot is planned when the target moves, and before the current plan gets too old to be used
+        if (
+            self.submitted_target is None
+            or norm(self.submitted_target - target_loc) > PLANNED_TARGET_TOLERANCE
+            or not 0 <= car.time - self.submitted_time < PLAN_RESUBMIT_AGE
+        ):
+            self.planner.submit(self.snapshot(car, boost_pads, target_loc), car.time)
+            self.submitted_target = target_loc.copy()
+            self.submitted_time = car.time
+
+        if self.agent.governor.degraded(DEGRADE_REUSE_PLANS) and self.planner.result is not None:
+            # the ticks are too slow to plan inline, even an old plan is better than none, if it's for this target
+            planned_target, boost_target = self.planner.result.value
+            if norm(planned_target - target_loc) > PLANNED_TARGET_TOLERANCE:
+                boost_target = None
+        else:
+            planned = self.planner.latest(car.time)
+            if planned is None or norm(planned.value[0] - target_loc) > PLANNED_TARGET_TOLERANCE:
+                # no fresh plan yet, planning inline
+                _, boost_target = plan_boost_target(self.snapshot(car, boost_pads, target_loc))
+            else:
+                _, boost_target = planned.value
+
+        return boost_target
 
     def step(self, car: Player, boost_pads, target_loc, target_dt=0) -> SimpleControllerState:
-        # path = find_fastest_path(boost_pads, car.location, target_loc, car.velocity, car.boost)
+        # path = find_fastest_path(boost_pads, car.location, target_loc, car.velocity, car.boost, self.agent.tables)
         # target = first_target(boost_pads, target_loc, path)
-        target = optional_boost_target(boost_pads, car.location, target_loc, car.velocity, car.boost)
+
+        boost_target = self.boost_target(car, boost_pads, target_loc)
+
+        target = target_loc if boost_target is None else boost_target
 
         time = target_dt if (target == target_loc).all() else 0
 
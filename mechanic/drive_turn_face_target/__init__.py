@@ -1 +1 @@
-from .drive_turn_face_target import DriveTurnFaceTarget
+from .drive_turn_face_target import DriveTurnFaceTarget, turn_face_target_controls
@@ -1,59 +1,73 @@
 import math
-import numpy as np
+from numba import jit
 from rlbot.agents.base_agent import SimpleControllerState
 from mechanic.base_mechanic import BaseMechanic
-from util.numerics import clip, sign
+from skeleton.util.scheduler import PRIORITY_RENDERING
+from util.numerics import jit_clip, jit_sign
 from util.render_utils import render_car_text
 
 PI = math.pi
 
 
-class DriveTurnFaceTarget(BaseMechanic):
-    def step(self, car, target_loc) -> SimpleControllerState:
+@jit(nopython=True, nogil=True, fastmath=True, cache=True)
+def turn_face_target_controls(
+    target_in_local_coords, car_local_velocity, car_ang_vel_local_coords, proportional_gain=12.0, derivative_gain=0.5
+):
+    """PD steering towards the target, all in the car's local coordinates.
+    Returns (steer, handbrake, yaw_angle_to_target, car_yaw_ang_vel)."""
 
-        target_in_local_coords = (target_loc - car.location).dot(car.rotation_matrix)
-        car_local_velocity = car.velocity.dot(car.rotation_matrix)
+    # PD for steer
+    yaw_angle_to_target = math.atan2(target_in_local_coords[1], target_in_local_coords[0])
+    car_yaw_ang_vel = -car_ang_vel_local_coords[2]
 
-        # PD for steer
-        yaw_angle_to_target = math.atan2(target_in_local_coords[1], target_in_local_coords[0])
-        car_ang_vel_local_coords = np.dot(car.angular_velocity, car.rotation_matrix)
-        car_yaw_ang_vel = -car_ang_vel_local_coords[2]
+    proportional_steer = proportional_gain * yaw_angle_to_target
+    derivative_steer = derivative_gain * car_yaw_ang_vel
 
-        proportional_steer = 12 * yaw_angle_to_target
-        derivative_steer = 1 / 2 * car_yaw_ang_vel
+    handbrake = jit_sign(yaw_angle_to_target) * (yaw_angle_to_target + car_yaw_ang_vel / 3) > PI / 10
 
-        if sign(yaw_angle_to_target) * (yaw_angle_to_target + car_yaw_ang_vel / 3) > PI / 10:
-            self.controls.handbrake = True
-        else:
-            self.controls.handbrake = False
+    steer = jit_clip(proportional_steer + derivative_steer)
 
-        self.controls.steer = clip(proportional_steer + derivative_steer)
-        self.controls.throttle = 0.5
+    # This makes sure we're not powersliding
+    # if the car is spinning the opposite way we're steering towards
+    if car_ang_vel_local_coords[2] * steer < 0:
+        handbrake = False
+    # and also not if we're sliding the opposite way we're throttling towards.
+    if car_local_velocity[0] < 0:
+        handbrake = False
+
+    return steer, handbrake, yaw_angle_to_target, car_yaw_ang_vel
+
+
+class DriveTurnFaceTarget(BaseMechanic):
+    def step(self, car, target_loc) -> SimpleControllerState:
+
+        steer, handbrake, yaw_angle_to_target, car_yaw_ang_vel = turn_face_target_controls(
+            car.local_coords(target_loc), car.local_velocity, car.local_angular_velocity
+        )
 
-        # This makes sure we're not powersliding
-        # if the car is spinning the opposite way we're steering towards
-        if car_ang_vel_local_coords[2] * self.controls.steer < 0:
-            self.controls.handbrake = False
-        # and also not boosting if we're sliding the opposite way we're throttling towards.
-        if car_local_velocity[0] * self.controls.throttle < 0:
-            self.controls.handbrake = False
+        self.controls.steer = steer
+        self.controls.handbrake = handbrake
+        self.controls.throttle = 0.5
 
         if self.rendering_enabled:
-            # rendering
-            text_list = [
-                f"yaw_angle_to_target : {yaw_angle_to_target:.2}",
-                f"car_yaw_ang_vel : {car_yaw_ang_vel:.2}",
-                f"steer : {self.controls.steer:.2f}",
-                f"handbrake : {self.controls.handbrake}",
-            ]
-            color = self.agent.renderer.white()
-            self.agent.renderer.begin_rendering()
-            # rendering all debug text in 3d near the car
-            render_car_text(self.agent.renderer, car, text_list, color)
-            # rendering a line from the car to the target
-            self.agent.renderer.draw_rect_3d(target_loc, 20, 20, True, self.agent.renderer.red())
-            self.agent.renderer.draw_line_3d(car.location, target_loc, color)
-            self.agent.renderer.end_rendering()
+
+            def render():
+                text_list = [
+                    f"yaw_angle_to_target : {yaw_angle_to_target:.2}",
+                    f"car_yaw_ang_vel : {car_yaw_ang_vel:.2}",
+                    f"steer : {self.controls.steer:.2f}",
+                    f"handbrake : {self.controls.handbrake}",
+                ]
+                color = self.agent.render_buffer.white()
+                # rendering all debug text in 3d near the car
+                render_car_text(self.agent.render_buffer, car, text_list, color)
+                # rendering a line from the car to the target
+                self.agent.render_buffer.draw_rect_3d(target_loc, 20, 20, True, self.agent.render_buffer.red())
+                self.agent.render_buffer.draw_line_3d(car.location, target_loc, color)
+
+            self.agent.scheduler.submit(
+                f"render {self.__class__.__name__}", render, PRIORITY_RENDERING, carry_over=False
+            )
 
         # updating status
         error = abs(car_yaw_ang_vel) + abs(yaw_angle_to_target)
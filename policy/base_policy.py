@@ -1,13 +1,28 @@
 from action.base_action import BaseAction
+from skeleton.util.agent_component import AgentComponent
+from skeleton.util.instrumentation import PHASE_POLICY
 
 
-class BasePolicy:
+class BasePolicy(AgentComponent):
+    instrumented_method = "get_action"
+    instrumented_phase = PHASE_POLICY
+
     def __init__(self, agent, rendering_enabled=False):
         self.agent = agent
         self.rendering_enabled = rendering_enabled
+        self.action_pool = {}
 
     def get_controls(self, game_data):
         return self.get_action(game_data).get_controls(game_data)
 
     def get_action(self, game_data) -> BaseAction:
         raise NotImplementedError
+
+    def get_pooled_action(self, action_class) -> BaseAction:
+        """Returns the policy's reset instance of action_class, it's only created the first time."""
+        action = self.action_pool.get(action_class)
+        if action is None:
+            action = self.action_pool[action_class] = action_class(self.agent, self._rendering_enabled)
+        else:
+            action.reset()
+        return action
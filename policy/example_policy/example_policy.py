@@ -16,16 +16,21 @@ from typing import Generator
 class ExamplePolicy(BasePolicy):
     def __init__(self, agent, rendering_enabled=True):
         super(ExamplePolicy, self).__init__(agent, rendering_enabled)
-        self.kickoff_action = Kickoff(agent, rendering_enabled)
+        self.kickoff_action = self.get_pooled_action(Kickoff)
         self.action_loop = self.create_action_loop()
+        self.kickoff = False
 
     def get_action(self, game_data: GameData) -> BaseAction:
         ball_loc = game_data.ball.location
         kickoff = math.sqrt(ball_loc[0] ** 2 + ball_loc[1] ** 2) < 1
 
-        if kickoff:
+        if kickoff and not self.kickoff:
             # reset the action loop
             self.action_loop = self.create_action_loop()
+            self.kickoff_action = self.get_pooled_action(Kickoff)
+        self.kickoff = kickoff
+
+        if kickoff:
             return self.kickoff_action
         else:
             return self.action_loop.send(game_data)
@@ -37,9 +42,9 @@ class ExamplePolicy(BasePolicy):
         while True:
             # choose action to do
             if game_data.my_car.boost > 20:
-                action = HitGroundBall(self.agent, self.rendering_enabled)
+                action = self.get_pooled_action(HitGroundBall)
             else:
-                action = CollectBoost(self.agent, self.rendering_enabled)
+                action = self.get_pooled_action(CollectBoost)
 
             # use action until it is finished
             while not action.finished and not action.failed:
@@ -1,7 +1,29 @@
 import time
-from rlbot.agents.base_agent import BaseAgent, SimpleControllerState
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from rlbot.agents.base_agent import BaseAgent, SimpleControllerState, BOT_CONFIG_AGENT_HEADER
+from rlbot.parsing.custom_config import ConfigHeader, ConfigObject
 from rlbot.utils.structures.game_data_struct import GameTickPacket
+from skeleton.util.allocations import AllocationTracker
+from skeleton.util.gc_manager import GCManager
+from skeleton.util.governor import QualityGovernor
 from skeleton.util.structure.game_data import GameData
+from skeleton.util.instrumentation import (
+    TickInstrumentation,
+    PHASE_TICK,
+    PHASE_PARSE,
+    PHASE_BALL_PREDICTION,
+    PHASE_SCHEDULER,
+    PHASE_RENDER_FLUSH,
+    PHASE_TELEMETRY_WRITE,
+)
+from skeleton.util.planner import AsyncPlanner
+from skeleton.util.render_buffer import RenderBuffer, DEFAULT_RENDER_RATE
+from skeleton.util.profiler import SamplingProfiler, get_profiler, DEFAULT_INTERVAL
+from skeleton.util.scheduler import TickScheduler, TICK_BUDGET, PRIORITY_TELEMETRY
+from skeleton.util.telemetry import TelemetryWriter, controls_to_row
+from util.shared_tables import attach_tables
 
 
 class SkeletonAgent(BaseAgent):
@@ -9,22 +31,135 @@ class SkeletonAgent(BaseAgent):
     """Base class inheriting from BaseAgent that manages data provided by the rlbot framework,
     and converts it into our internal data structure, and extracts further useful info."""
 
+    # names of the precomputed tables to attach, they're shared between all the bot processes of the machine
+    shared_tables: Tuple[str, ...] = ()
+
+    # expensive plans are made on background threads, the headless simulator turns it off for reproducible tests
+    asynchronous_planning = True
+
+    # the garbage collections are deferred to when the game stops or a tick has time to spare
+    manage_garbage_collection = True
+
+    # quality is traded for speed when the ticks get too slow, the headless simulator turns it off too
+    adaptive_quality = True
+
     def __init__(self, name: str = "skeleton", team: int = 0, index: int = 0):
 
         super(SkeletonAgent, self).__init__(name, team, index)
 
         self.game_data = GameData(self.name, self.team, self.index)
         self.controls = SimpleControllerState()
+        self.scheduler = TickScheduler()
+        self.instrumentation = TickInstrumentation(self.logger)
+        self.scheduler.instrumentation = self.instrumentation
+        self.gc_manager = GCManager(self.logger)
+        self.governor = QualityGovernor(self.logger, enabled=self.adaptive_quality)
+        self.render_buffer = RenderBuffer()
+
+        # the background planners of the policy, actions and mechanics, their threads are stopped on retire
+        self.planners: List[AsyncPlanner] = []
+
+        # the attached shared tables by name, read only
+        self.tables: Dict[str, np.ndarray] = {}
+
+        # makes the matchcomms client instead of connecting to the match's server, for agents run without the game
+        self.matchcomms_factory: Optional[Callable[[], Any]] = None
+        self.matchcomms_client = None
+
+        # set by the hivemind controlling this agent, it parses each tick once for all it's drones
+        self.hive_game_data: Optional[GameData] = None
+
+        # the sampling profiler is off unless a path is set in the config or the environment
+        self.profile_path = ""
+        self.profile_interval = DEFAULT_INTERVAL
+        self.profiler: Optional[SamplingProfiler] = None
+
+        # a record of every tick is written to the telemetry directory, if one is set
+        self.telemetry_path = ""
+        self.telemetry: Optional[TelemetryWriter] = None
+
+        # tracemalloc measurements of the bytes allocated by each tick, slow, only for debugging sessions
+        self.track_allocations = False
+        self.allocation_budget = 0
+
+    @staticmethod
+    def create_agent_configurations(config: ConfigObject):
+        params = config.get_header(BOT_CONFIG_AGENT_HEADER)
+        params.add_value(
+            "profile_path",
+            str,
+            default="",
+            description="Collapsed stacks of the ticks are written there at the end of the match, "
+            "{index} is replaced by the bot's index. Empty to not profile.",
+        )
+        params.add_value("profile_interval", float, default=DEFAULT_INTERVAL, description="Seconds between samples.")
+        params.add_value(
+            "render_rate", float, default=DEFAULT_RENDER_RATE, description="Debug renderings per second, 0 for all."
+        )
+        params.add_value(
+            "telemetry_path",
+            str,
+            default="",
+            description="Directory the tick records are written to, a new run directory in it per match, "
+            "{index} is replaced by the bot's index. Empty for no telemetry.",
+        )
+        params.add_value(
+            "instrumentation_path",
+            str,
+            default="",
+            description="Json file the timings of the tick phases are written to at the end of the match, "
+            "{index} is replaced by the bot's index. Empty to not write them.",
+        )
+        params.add_value(
+            "track_allocations", bool, default=False, description="Measures the memory allocated by the ticks, slow."
+        )
+        params.add_value(
+            "allocation_budget", int, default=0, description="Bytes a tick may allocate before a warning, 0 for none."
+        )
+
+    def load_config(self, config_header: ConfigHeader):
+        self.profile_path = config_header.get("profile_path") or ""
+        self.profile_interval = config_header.getfloat("profile_interval")
+        self.render_buffer.rate = config_header.getfloat("render_rate")
+        self.telemetry_path = config_header.get("telemetry_path") or ""
+        instrumentation_path = config_header.get("instrumentation_path")
+        self.instrumentation.dump_path = instrumentation_path.format(index=self.index) if instrumentation_path else None
+        self.track_allocations = config_header.getboolean("track_allocations")
+        self.allocation_budget = config_header.getint("allocation_budget")
 
     def initialize_agent(self):
         """Hopefully this gets called before get_output and after the game has fully loaded.
         And hopefully no inheriting classes override this method without calling super()"""
         self.game_data.read_field_info(self.get_field_info())
+        self.tables = attach_tables(self.shared_tables)
+
+        self.profiler = get_profiler(self.profile_path, self.profile_interval)
+        if self.profiler is not None:
+            self.profiler.path = self.profiler.path.format(index=self.index)
+
+        if self.telemetry_path:
+            self.telemetry = TelemetryWriter(self.telemetry_path.format(index=self.index))
+
+        if self.track_allocations:
+            budgets = {PHASE_TICK: self.allocation_budget} if self.allocation_budget > 0 else {}
+            self.instrumentation.allocations = AllocationTracker(budgets, self.logger)
+            self.instrumentation.allocations.start()
+
+        # last, so that everything allocated by the initialization is frozen
+        if self.manage_garbage_collection:
+            self.gc_manager.start()
 
     def get_output(self, game_tick_packet: GameTickPacket) -> SimpleControllerState:
         """Overriding this function is not advised, use get_controls() instead."""
 
-        chrono_start = time.time()
+        if self.profiler is not None:
+            self.profiler.begin_tick()
+
+        self.instrumentation.begin_tick()
+
+        chrono_start = time.perf_counter_ns()
+        self.scheduler.begin_tick(chrono_start / 1e9)
+        self.render_buffer.begin_tick(chrono_start / 1e9)
 
         self.pre_process(game_tick_packet)
 
@@ -32,18 +167,54 @@ class SkeletonAgent(BaseAgent):
 
         self.feedback()
 
-        delta_time = time.time() - chrono_start
+        self.gc_manager.on_tick(self.game_data, self.scheduler)
+
+        cost = time.perf_counter_ns() - chrono_start
+
+        # optional work registered during this tick, as long as there's time left
+        self.instrumentation.begin(PHASE_SCHEDULER)
+        self.scheduler.run()
+        self.instrumentation.end(PHASE_SCHEDULER)
+
+        # everything rendered this tick is sent as one group
+        self.instrumentation.begin(PHASE_RENDER_FLUSH)
+        self.render_buffer.flush(self.renderer, time.perf_counter())
+        self.instrumentation.end(PHASE_RENDER_FLUSH)
+
+        delta_time = time.perf_counter_ns() - chrono_start
+
+        # the quality of the next ticks
+        self.governor.record(cost / 1e9, delta_time / 1e9)
+
+        # slow ticks are reported in the instrumentation's summary log
+        self.instrumentation.end_tick(delta_time, delta_time > TICK_BUDGET * 1e9)
+
+        if self.telemetry is not None:
+            self.instrumentation.begin(PHASE_TELEMETRY_WRITE)
+            self.write_telemetry(delta_time / 1e3)
+            self.instrumentation.end(PHASE_TELEMETRY_WRITE)
 
-        if delta_time > 1 / 120:
-            self.logger.warn(f"Slow to execute on tick {self.game_data.counter}: {delta_time * 120 * 100:.3f}%")
+        if self.profiler is not None:
+            self.profiler.end_tick()
 
         return self.controls
 
     def pre_process(self, game_tick_packet: GameTickPacket):
         """First thing executed in get_output()."""
 
+        if self.hive_game_data is not None:
+            self.game_data.read_hive_game_data(self.hive_game_data)
+            self.game_data.update_extra_game_data()
+            return
+
+        self.instrumentation.begin(PHASE_PARSE)
         self.game_data.read_game_tick_packet(game_tick_packet)
+        self.instrumentation.end(PHASE_PARSE)
+
+        self.instrumentation.begin(PHASE_BALL_PREDICTION)
         self.game_data.read_ball_prediction_struct(self.get_ball_prediction_struct())
+        self.instrumentation.end(PHASE_BALL_PREDICTION)
+
         self.game_data.update_extra_game_data()
 
     def feedback(self):
@@ -54,3 +225,51 @@ class SkeletonAgent(BaseAgent):
     def get_controls(self) -> SimpleControllerState:
         """Function to override by inheriting classes"""
         return self.controls
+
+    def write_telemetry(self, tick_cost_us: float):
+        """Completes the tick's telemetry record, the policy, actions and mechanics set the rest of it."""
+        car = self.game_data.my_car
+        self.telemetry.set("time", self.game_data.time)
+        self.telemetry.set("car_location", car.location)
+        self.telemetry.set("car_velocity", car.velocity)
+        self.telemetry.set("car_rotation", car.rotation)
+        self.telemetry.set("car_boost", car.boost)
+        self.telemetry.set("controls", controls_to_row(self.controls))
+        self.telemetry.set("tick_cost_us", tick_cost_us)
+        self.telemetry.end_row()
+
+        # the rows are recorded every tick, writing them to disk can wait for a tick with time to spare
+        if self.telemetry.flush_due:
+            self.scheduler.submit("telemetry flush", self.telemetry.flush, PRIORITY_TELEMETRY)
+
+    @property
+    def matchcomms(self):
+        """The matchcomms client, made by matchcomms_factory on first use if it's set,
+        connected to the match's matchcomms server by BaseAgent otherwise."""
+        if self.matchcomms_factory is None:
+            return super().matchcomms
+        if self.matchcomms_client is None:
+            self.matchcomms_client = self.matchcomms_factory()
+        return self.matchcomms_client
+
+    def create_planner(self, plan: Callable[[Any], Any], name: str, max_age: float = 0.1) -> AsyncPlanner:
+        """An AsyncPlanner that's closed when the agent retires."""
+        planner = AsyncPlanner(plan, name, max_age, self.asynchronous_planning)
+        self.planners.append(planner)
+        return planner
+
+    def retire(self):
+        for planner in self.planners:
+            planner.close()
+        self.gc_manager.close()
+        if self.telemetry is not None:
+            self.telemetry.close()
+        if self.instrumentation.dump_path:
+            self.instrumentation.dump()
+        if self.profiler is not None:
+            self.profiler.close()
+            self.profiler.write()
+            profiler = self.profiler
+            self.logger.info(f"{profiler.samples} samples of {profiler.ticks} ticks written to {profiler.path}")
+        if self.instrumentation.allocations is not None:
+            self.logger.info(f"Allocations per tick:\n{self.instrumentation.allocations.summary()}")
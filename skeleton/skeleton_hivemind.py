@@ -0,0 +1,90 @@
+from typing import Dict, Optional
+
+import numpy as np
+
+from rlbot.agents.base_agent import BOT_CONFIG_AGENT_HEADER
+from rlbot.agents.hivemind.python_hivemind import PythonHivemind
+from rlbot.parsing.bot_config_bundle import get_bot_config_bundle
+from rlbot.parsing.custom_config import ConfigHeader
+from rlbot.utils.structures.bot_input_struct import PlayerInput
+from rlbot.utils.structures.game_data_struct import GameTickPacket
+
+from skeleton.skeleton_agent import SkeletonAgent
+from skeleton.util.conversion import controls_to_player_input
+from skeleton.util.structure.game_data import GameData
+from util.shared_tables import attach_tables
+
+
+class SkeletonHivemind(PythonHivemind):
+    """Hivemind running a SkeletonAgent for each of it's drones in one process.
+    The packet and the ball prediction are parsed once per tick into a shared GameData,
+    that the drones read instead of parsing them again."""
+
+    # the SkeletonAgent subclass controlling each drone
+    agent_class = SkeletonAgent
+
+    # the bot config whose Bot Parameters are loaded by every drone, None for the defaults
+    config_file: Optional[str] = None
+
+    def __init__(self, agent_metadata_queue, quit_event, options):
+        super().__init__(agent_metadata_queue, quit_event, options)
+        self.drones: Dict[int, SkeletonAgent] = {}
+        self.player_inputs: Dict[int, PlayerInput] = {}
+        self.tables: Dict[str, np.ndarray] = {}
+
+    def load_agent_config(self) -> ConfigHeader:
+        """The Bot Parameters of the config file, like the bot manager loads them for a single bot."""
+        config = self.agent_class.base_create_agent_configurations()
+        if self.config_file is not None:
+            bundle = get_bot_config_bundle(self.config_file)
+            config.parse_file(bundle.config_obj, config_directory=bundle.config_directory)
+        return config.get_header(BOT_CONFIG_AGENT_HEADER)
+
+    def start(self):
+        try:
+            super().start()
+        finally:
+            self.retire()
+
+    def initialize_hive(self, packet: GameTickPacket):
+        first_index = min(self.drone_indices)
+        self.hive_game_data = GameData("hivemind", packet.game_cars[first_index].team, first_index)
+        self.hive_game_data.read_field_info(self.get_field_info())
+
+        # attached once for the process, the drones get the same mapped tables
+        self.tables = attach_tables(self.agent_class.shared_tables)
+
+        config_header = self.load_agent_config()
+        for index in sorted(self.drone_indices):
+            game_car = packet.game_cars[index]
+            drone = self.agent_class(game_car.name, game_car.team, index)
+            drone.load_config(config_header)
+
+            # the drones use the hivemind's game interface
+            drone.get_field_info = self.get_field_info
+            drone.get_ball_prediction_struct = self.get_ball_prediction_struct
+            drone.get_match_settings = self.get_match_settings
+            drone.set_game_state = self.set_game_state
+            drone.renderer = self.renderer
+            drone.hive_game_data = self.hive_game_data
+            drone.initialize_agent()
+
+            self.drones[index] = drone
+            self.player_inputs[index] = PlayerInput()
+
+    def get_outputs(self, packet: GameTickPacket) -> Dict[int, PlayerInput]:
+        self.hive_game_data.read_game_tick_packet(packet)
+        self.hive_game_data.read_ball_prediction_struct(self.get_ball_prediction_struct())
+
+        for index, drone in self.drones.items():
+            # render groups are kept separate by bot index
+            self.renderer.set_bot_index_and_team(index, drone.team)
+            controls_to_player_input(drone.get_output(packet), self.player_inputs[index])
+
+        return self.player_inputs
+
+    def retire(self):
+        """Retires every drone when the hivemind stops, closing their planners, telemetry and profilers."""
+        for drone in self.drones.values():
+            drone.retire()
+        self.drones.clear()
@@ -0,0 +1,37 @@
+from skeleton.test.skeleton_agent_test import SkeletonAgentTest
+from skeleton.util.governor import DEGRADE_RENDERING
+from skeleton.util.instrumentation import PHASE_ACTION, PHASE_MECHANIC, PHASE_POLICY
+
+from action.base_action import BaseAction
+from mechanic.base_mechanic import BaseMechanic
+from policy.base_policy import BasePolicy
+
+
+class Mechanic(BaseMechanic):
+    def step(self):
+        return self.controls
+
+
+class Action(BaseAction):
+    def get_controls(self, game_data):
+        return Mechanic(self.agent).step()
+
+
+class Policy(BasePolicy):
+    def get_action(self, game_data):
+        return self.get_pooled_action(Action)
+
+
+def test_policies_actions_and_mechanics_are_timed_and_share_the_rendering_switch():
+    agent = SkeletonAgentTest("test_agent", 0, 0)
+    policy = Policy(agent, rendering_enabled=True)
+
+    policy.get_controls(agent.game_data)
+    assert {PHASE_POLICY, PHASE_ACTION, PHASE_MECHANIC} <= set(agent.instrumentation.phases)
+
+    action = policy.get_pooled_action(Action)
+    assert policy.rendering_enabled and action.rendering_enabled
+
+    agent.governor.degraded = lambda level: level <= DEGRADE_RENDERING
+    assert not policy.rendering_enabled and not action.rendering_enabled
+    assert action._rendering_enabled
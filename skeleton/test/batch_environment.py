@@ -0,0 +1,239 @@
+import math
+from random import Random
+from typing import List
+
+import numpy as np
+from numba import jit
+from rlbottraining.rng import SeededRandomNumberGenerator
+
+from mechanic.drive_arrive_in_time import arrive_in_time_controls
+from mechanic.drive_turn_face_target import turn_face_target_controls
+from skeleton.test.headless_simulator import (
+    ball_step,
+    car_ball_hit,
+    read_game_state,
+    ORIGIN_HEIGHT,
+    ARENA_HALF_WIDTH,
+    ARENA_HALF_LENGTH,
+)
+from util.physics.drive_1d_simulation_utils import DT
+from util.physics.drive_2d_simulation import drive_2d_step
+
+# rows of the car and ball arrays
+CAR_X, CAR_Y, CAR_VX, CAR_VY, CAR_YAW, CAR_YAW_RATE, CAR_BOOST = range(7)
+BALL_X, BALL_Y, BALL_Z, BALL_VX, BALL_VY, BALL_VZ = range(6)
+
+
+@jit(nopython=True, fastmath=True, cache=True)
+def batch_step(cars, balls, touch_times, active, time, throttle, steer, boost, handbrake):
+    """Steps every active scenario by one tick with it's controls, and records the time of the first touch."""
+    for i in range(cars.shape[1]):
+        if not active[i]:
+            continue
+
+        x, y, vx, vy, yaw, yaw_rate, car_boost = drive_2d_step(
+            cars[CAR_X, i],
+            cars[CAR_Y, i],
+            cars[CAR_VX, i],
+            cars[CAR_VY, i],
+            cars[CAR_YAW, i],
+            cars[CAR_YAW_RATE, i],
+            cars[CAR_BOOST, i],
+            throttle[i],
+            steer[i],
+            boost[i],
+            handbrake[i],
+        )
+
+        # keeping the car in the arena
+        if abs(x) > ARENA_HALF_WIDTH:
+            x = math.copysign(ARENA_HALF_WIDTH, x)
+            vx = 0.0
+        if abs(y) > ARENA_HALF_LENGTH:
+            y = math.copysign(ARENA_HALF_LENGTH, y)
+            vy = 0.0
+
+        cars[CAR_X, i], cars[CAR_Y, i], cars[CAR_VX, i], cars[CAR_VY, i] = x, y, vx, vy
+        cars[CAR_YAW, i], cars[CAR_YAW_RATE, i], cars[CAR_BOOST, i] = yaw, yaw_rate, car_boost
+
+        ball_x, ball_y, ball_z, ball_vx, ball_vy, ball_vz = ball_step(
+            balls[BALL_X, i],
+            balls[BALL_Y, i],
+            balls[BALL_Z, i],
+            balls[BALL_VX, i],
+            balls[BALL_VY, i],
+            balls[BALL_VZ, i],
+        )
+        hit, ball_x, ball_y, ball_z, ball_vx, ball_vy, ball_vz, _, _, _, _, _, _ = car_ball_hit(
+            x, y, vx, vy, yaw, ball_x, ball_y, ball_z, ball_vx, ball_vy, ball_vz
+        )
+        if hit and touch_times[i] < 0:
+            touch_times[i] = time
+
+        balls[BALL_X, i], balls[BALL_Y, i], balls[BALL_Z, i] = ball_x, ball_y, ball_z
+        balls[BALL_VX, i], balls[BALL_VY, i], balls[BALL_VZ, i] = ball_vx, ball_vy, ball_vz
+
+
+@jit(nopython=True, fastmath=True, cache=True)
+def car_local_frame(cars, i, target_x, target_y, target_z):
+    """The target, the velocity and the angular velocity of a scenario's car in it's local coordinates."""
+    cos_yaw = math.cos(cars[CAR_YAW, i])
+    sin_yaw = math.sin(cars[CAR_YAW, i])
+    dx = target_x - cars[CAR_X, i]
+    dy = target_y - cars[CAR_Y, i]
+
+    target_in_local_coords = np.array(
+        [dx * cos_yaw + dy * sin_yaw, -dx * sin_yaw + dy * cos_yaw, target_z - ORIGIN_HEIGHT]
+    )
+    car_local_velocity = np.array(
+        [
+            cars[CAR_VX, i] * cos_yaw + cars[CAR_VY, i] * sin_yaw,
+            -cars[CAR_VX, i] * sin_yaw + cars[CAR_VY, i] * cos_yaw,
+            0.0,
+        ]
+    )
+    car_ang_vel_local_coords = np.array([0.0, 0.0, cars[CAR_YAW_RATE, i]])
+    return target_in_local_coords, car_local_velocity, car_ang_vel_local_coords
+
+
+@jit(nopython=True, fastmath=True, cache=True)
+def turn_face_target_batch(cars, targets, proportional_gain, derivative_gain, out_steer, out_handbrake, out_error):
+    """DriveTurnFaceTarget's controls for every scenario, each with it's own PD gains.
+    out_error is the mechanic's finishing error, it's finished below 0.01."""
+    for i in range(cars.shape[1]):
+        target_in_local_coords, car_local_velocity, car_ang_vel_local_coords = car_local_frame(
+            cars, i, targets[0, i], targets[1, i], targets[2, i]
+        )
+        steer, handbrake, yaw_angle_to_target, car_yaw_ang_vel = turn_face_target_controls(
+            target_in_local_coords,
+            car_local_velocity,
+            car_ang_vel_local_coords,
+            proportional_gain[i],
+            derivative_gain[i],
+        )
+        out_steer[i] = steer
+        out_handbrake[i] = handbrake
+        out_error[i] = abs(car_yaw_ang_vel) + abs(yaw_angle_to_target)
+
+
+@jit(nopython=True, fastmath=True, cache=True)
+def arrive_in_time_batch(cars, targets, times, delta_time, out_steer, out_throttle, out_boost, out_handbrake):
+    """DriveArriveInTime's controls for every scenario."""
+    for i in range(cars.shape[1]):
+        target_in_local_coords, car_local_velocity, car_ang_vel_local_coords = car_local_frame(
+            cars, i, targets[0, i], targets[1, i], targets[2, i]
+        )
+        out_steer[i], out_throttle[i], out_boost[i], out_handbrake[i] = arrive_in_time_controls(
+            target_in_local_coords, car_local_velocity, car_ang_vel_local_coords, times[i], delta_time
+        )
+
+
+class BatchEnvironment:
+    """Many independent scenarios of a car and a ball on flat ground, stepped in lockstep.
+    The states are stored as struct of arrays, cars[CAR_X] holds the x location of every scenario's car,
+    so that compiled policies and the physics step all the scenarios without a python loop."""
+
+    def __init__(self, game_states: list):
+        n = len(game_states)
+        self.cars = np.zeros((7, n))
+        self.balls = np.zeros((6, n))
+
+        for i, game_state in enumerate(game_states):
+            cars, ball_location, ball_velocity = read_game_state(game_state)
+            self.cars[:, i] = cars.get(0, (0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 33.0))
+            self.balls[BALL_X : BALL_Z + 1, i] = ball_location
+            self.balls[BALL_VX : BALL_VZ + 1, i] = ball_velocity
+
+        self.time = 0.0
+        self.touch_times = np.full(n, -1.0)
+        self.finish_times = np.full(n, np.nan)
+        self.active = np.ones(n, dtype=np.bool_)
+
+    @classmethod
+    def from_exercise(cls, exercise, seeds: List[int]) -> "BatchEnvironment":
+        """One scenario per seed, made by the exercise's make_game_state like rlbottraining does."""
+        return cls([exercise.make_game_state(SeededRandomNumberGenerator(Random(seed))) for seed in seeds])
+
+    def __len__(self):
+        return self.cars.shape[1]
+
+    @property
+    def ball_locations(self) -> np.ndarray:
+        return self.balls[BALL_X : BALL_Z + 1]
+
+    def step(self, throttle, steer, boost, handbrake):
+        """Steps the active scenarios by one tick, the controls are arrays with a value for each scenario."""
+        n = len(self)
+        self.time += DT
+        batch_step(
+            self.cars,
+            self.balls,
+            self.touch_times,
+            self.active,
+            self.time,
+            np.broadcast_to(np.asarray(throttle, dtype=np.float64), n),
+            np.broadcast_to(np.asarray(steer, dtype=np.float64), n),
+            np.broadcast_to(np.asarray(boost, dtype=np.bool_), n),
+            np.broadcast_to(np.asarray(handbrake, dtype=np.bool_), n),
+        )
+
+    def finish(self, mask: np.ndarray):
+        """Stops the active scenarios in the mask, and records when they finished."""
+        newly_finished = mask & self.active
+        self.finish_times[newly_finished] = self.time
+        self.active &= ~mask
+
+    @property
+    def done(self) -> bool:
+        return not self.active.any()
+
+
+def main():
+    """Sweeping the PD gains of DriveTurnFaceTarget over the seeds of it's exercise"""
+
+    from time import perf_counter
+    from mechanic.drive_turn_face_target.drive_test import make_default_playlist
+
+    exercise = make_default_playlist()[0]
+    seeds = list(range(200))
+    proportional_gains = [6.0, 9.0, 12.0, 15.0, 18.0]
+    derivative_gains = [0.25, 0.5, 0.75, 1.0]
+    gains = [(p, d) for p in proportional_gains for d in derivative_gains]
+
+    start = perf_counter()
+    env = BatchEnvironment.from_exercise(exercise, seeds * len(gains))
+    n = len(env)
+    proportional_gain = np.repeat([p for p, _ in gains], len(seeds)).astype(np.float64)
+    derivative_gain = np.repeat([d for _, d in gains], len(seeds)).astype(np.float64)
+
+    steer = np.zeros(n)
+    handbrake = np.zeros(n, dtype=np.bool_)
+    error = np.zeros(n)
+
+    max_time = 4.0
+    ticks = 0
+    while not env.done and env.time < max_time:
+        turn_face_target_batch(
+            env.cars, env.ball_locations, proportional_gain, derivative_gain, steer, handbrake, error
+        )
+        env.finish(error < 0.01)
+        env.step(0.5, steer, False, handbrake)
+        ticks += 1
+
+    time_taken = perf_counter() - start
+    print(f"Simulated {n} scenarios for {ticks} ticks in {time_taken:.2f} seconds.")
+
+    finish_times = env.finish_times.reshape(len(gains), len(seeds))
+    for (p, d), times in zip(gains, finish_times):
+        finished = ~np.isnan(times)
+        mean_time = times[finished].mean() if finished.any() else float("nan")
+        print(f"P {p:5.2f} D {d:4.2f}: finished {finished.mean() * 100:5.1f}%, mean time {mean_time:.3f}s")
+
+    # the finish rate first, then the mean time
+    scores = [(np.isnan(times).mean(), np.nanmean(times)) for times in finish_times]
+    p, d = gains[min(range(len(gains)), key=lambda i: scores[i])]
+    print(f"Best gains: P {p} D {d}")
+
+
+if __name__ == "__main__":
+    main()
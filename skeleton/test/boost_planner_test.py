@@ -0,0 +1,60 @@
+import numpy as np
+
+from mechanic.drive_navigate_boost.drive_navigate_boost import DriveNavigateBoost, PLAN_RESUBMIT_AGE
+from skeleton.test.skeleton_agent_test import SkeletonAgentTest
+from skeleton.util.governor import DEGRADE_REUSE_PLANS
+from util.boost_utils import STANDARD_PAD_LOCATIONS
+
+
+class PlannerAgent(SkeletonAgentTest):
+    asynchronous_planning = False
+    manage_garbage_collection = False
+
+
+def make_navigation():
+    agent = PlannerAgent("test_agent", 0, 0)
+    agent.initialize_agent()
+    navigation = DriveNavigateBoost(agent)
+
+    boost_pads = agent.game_data.boost_pads[: len(STANDARD_PAD_LOCATIONS)].copy()
+    boost_pads["location"] = STANDARD_PAD_LOCATIONS
+    boost_pads["is_full_boost"] = True
+    boost_pads["is_active"] = True
+
+    car = agent.game_data.my_car
+    car.location = np.array([0.0, -4500.0, 17.0])
+    car.velocity = np.zeros(3)
+    car.rotation_matrix = np.array([[0.0, -1.0, 0.0], [1.0, 0.0, 0.0], [0.0, 0.0, 1.0]])
+    car.boost = 0
+    return agent, navigation, car, boost_pads
+
+
+def test_snapshots_are_submitted_when_the_target_moves_or_the_plan_gets_old():
+    agent, navigation, car, boost_pads = make_navigation()
+    target = np.array([0.0, 4000.0, 93.0])
+
+    ticks = int(PLAN_RESUBMIT_AGE * 120) + 1
+    for tick in range(ticks):
+        car.time = tick / 120
+        navigation.boost_target(car, boost_pads, target)
+    assert navigation.planner.planned == 2
+
+    target = target + [0.0, 50.0, 0.0]
+    navigation.boost_target(car, boost_pads, target)
+    assert navigation.planner.planned == 2
+
+    target = target + [500.0, 0.0, 0.0]
+    navigation.boost_target(car, boost_pads, target)
+    assert navigation.planner.planned == 3
+
+
+def test_degraded_ticks_dont_reuse_a_plan_for_another_target(monkeypatch):
+    agent, navigation, car, boost_pads = make_navigation()
+    target = np.array([0.0, 4000.0, 93.0])
+    boost_target = navigation.boost_target(car, boost_pads, target)
+    assert boost_target is not None
+
+    monkeypatch.setattr(agent.governor, "degraded", lambda level: level <= DEGRADE_REUSE_PLANS)
+    monkeypatch.setattr(navigation.planner, "submit", lambda snapshot, time: None)
+    assert navigation.boost_target(car, boost_pads, target) is boost_target
+    assert navigation.boost_target(car, boost_pads, np.array([3000.0, 0.0, 93.0])) is None
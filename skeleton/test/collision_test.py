@@ -0,0 +1,61 @@
+import numpy as np
+
+from skeleton.util.structure import Player
+from util.collision_utils import (
+    box_ball_broad_phase,
+    box_ball_collision_distance,
+    box_ball_location_on_collision,
+    box_ball_low_location_on_collision,
+    box_point_collision_location,
+    pruned_collision,
+)
+from util.intercept_utils import car_intercept_margin
+
+COLLISION_FUNCTIONS = (
+    box_point_collision_location,
+    box_ball_location_on_collision,
+    box_ball_low_location_on_collision,
+    box_ball_collision_distance,
+)
+
+
+def make_slices():
+    """A ball rolling past a car at rest, then flying away."""
+    times = np.arange(1, 121) / 60
+    locations = np.array([300.0, -1000.0, 92.0]) + np.outer(times, [0.0, 1000.0, 0.0])
+    locations[60:, 2] += np.arange(60) * 50
+    return locations, times
+
+
+def test_pruned_collision_matches_every_collision_function():
+    locations, times = make_slices()
+    car_rot = np.identity(3)
+
+    for collision_function in COLLISION_FUNCTIONS:
+        mask, result, culled = pruned_collision(
+            collision_function, locations, times, np.zeros(3), car_rot, np.zeros(3), max_height=300
+        )
+        assert 0 < culled < len(locations)
+        assert culled == len(locations) - np.count_nonzero(mask)
+        assert np.allclose(result, collision_function(locations[mask], np.zeros(3), car_rot))
+
+
+def test_broad_phase_keeps_every_reachable_slice():
+    locations, times = make_slices()
+    car_locations = np.array([[300.0, 200.0, 17.0], [2000.0, 2000.0, 17.0]])
+    car_velocities = np.array([[0.0, 500.0, 0.0], [0.0, 0.0, 0.0]])
+
+    mask, culled = box_ball_broad_phase(locations, times, car_locations, car_velocities, 0.0)
+    assert mask.shape == (len(locations), len(car_locations))
+    assert culled == mask.size - np.count_nonzero(mask)
+
+    for index, (car_location, car_velocity) in enumerate(zip(car_locations, car_velocities)):
+        car = Player()
+        car.location = car_location
+        car.velocity = car_velocity
+        car.boost = 0
+        margins = np.array(
+            [car_intercept_margin(location, time, car, np.identity(3)) for location, time in zip(locations, times)]
+        )
+        assert mask[margins > 0, index].all()
+    assert mask[:, 0].any() and not mask[:, 1].any()
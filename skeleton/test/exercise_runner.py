@@ -0,0 +1,189 @@
+import argparse
+import configparser
+import importlib
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from random import Random
+from time import perf_counter
+from typing import List, Optional
+
+from rlbot.agents.base_agent import BaseAgent
+from rlbot.utils.class_importer import extract_class
+from rlbot.training.training import Pass
+from rlbottraining.grading.training_tick_packet import TrainingTickPacket
+from rlbottraining.rng import SeededRandomNumberGenerator
+
+from skeleton.test.headless_simulator import HeadlessSimulator, run_episode
+from skeleton.util.instrumentation import PHASE_TICK
+from util.local_matchcomms import LocalMatchcommsServer
+
+ROOT_PATH = Path(__file__).absolute().parent.parent.parent
+
+# the playlists of the test modules already loaded by this process
+_playlists = {}
+
+
+def find_test_modules(paths: List[str] = None) -> List[str]:
+    """The dotted names of the test modules defining a make_default_playlist, under the paths or the whole repo."""
+    files = []
+    for path in paths or [ROOT_PATH]:
+        path = Path(path).absolute()
+        files += [path] if path.is_file() else sorted(path.glob("**/*_test.py"))
+
+    modules = []
+    for file in files:
+        if "make_default_playlist" in file.read_text():
+            modules.append(".".join(file.relative_to(ROOT_PATH).with_suffix("").parts))
+    return modules
+
+
+def get_playlist(module_name: str) -> list:
+    if module_name not in _playlists:
+        _playlists[module_name] = importlib.import_module(module_name).make_default_playlist()
+    return _playlists[module_name]
+
+
+def load_agent_class(config_path: str):
+    """Imports the bot class of a bot config, by it's module path in the repo, as all the test agent files
+    share a few names."""
+    config = configparser.ConfigParser()
+    config.read(config_path)
+    python_file = Path(config_path).parent / config["Locations"]["python_file"]
+    module_name = ".".join(python_file.resolve().relative_to(ROOT_PATH).with_suffix("").parts)
+    return extract_class(importlib.import_module(module_name), BaseAgent)
+
+
+def make_grade(grader):
+    """Adapts an exercise's grader to the simulator's grade function, Pass and Fail become True and False."""
+    tick = TrainingTickPacket()
+
+    def grade(simulator: HeadlessSimulator, agents: list) -> Optional[bool]:
+        tick.update(simulator.packet)
+        result = grader.on_tick(tick)
+        if result is None:
+            return None
+        return isinstance(result, Pass)
+
+    return grade
+
+
+def run_exercise(
+    module_name: str, exercise_index: int, seeds: List[int], max_time: float = 10.0, allocation_budget: int = None
+) -> list:
+    """Runs the exercise's scenario of each seed in the headless simulator.
+    Returns a (passed, time, ticks, seconds, allocated) tuple for each seed, seconds is the wall time of the episode's
+    ticks. allocated is the most bytes allocated by a tick when the allocations are tracked, against the budget."""
+    exercise = get_playlist(module_name)[exercise_index]
+    agent_configs = exercise.match_config.player_configs
+    agent_classes = [load_agent_class(player_config.config_path) for player_config in agent_configs]
+
+    results = []
+    for seed in seeds:
+        game_state = exercise.make_game_state(SeededRandomNumberGenerator(Random(seed)))
+
+        simulator = HeadlessSimulator(len(agent_configs))
+        simulator.set_game_state(game_state)
+
+        # the test agents and a fresh grader talk over local matchcomms, like they do in the game
+        matchcomms = LocalMatchcommsServer()
+        grader = type(exercise.grader)()
+        grader.matchcomms = matchcomms.connect()
+
+        agents = []
+        for index, (player_config, agent_class) in enumerate(zip(agent_configs, agent_classes)):
+            agent = agent_class(player_config.name, player_config.team, index)
+            if allocation_budget is not None:
+                agent.track_allocations = True
+                agent.allocation_budget = allocation_budget
+            matchcomms.attach(agent)
+            simulator.attach(agent)
+            agents.append(agent)
+
+        start = perf_counter()
+        passed, time = run_episode(simulator, agents, make_grade(grader), max_time)
+        seconds = perf_counter() - start
+
+        allocated = 0
+        for agent in agents:
+            allocations = agent.instrumentation.allocations
+            if allocations is not None and PHASE_TICK in allocations.phases:
+                allocated = max(allocated, allocations.phases[PHASE_TICK].max_bytes)
+        results.append((passed, time, simulator.frame, seconds, allocated))
+
+        # stops the agents' planner threads, nothing reads their last messages anymore
+        matchcomms.close()
+        for agent in agents:
+            agent.retire()
+    return results
+
+
+def run_playlists(
+    module_names: List[str],
+    n_seeds: int = 20,
+    max_time: float = 10.0,
+    processes: int = None,
+    chunk_size: int = 5,
+    allocation_budget: int = None,
+) -> dict:
+    """Runs the exercises of the modules' default playlists across a process pool.
+    Returns {exercise name: [(passed, time, ticks, seconds, allocated), ...]}."""
+    with ProcessPoolExecutor(processes) as executor:
+        futures = {}
+        for module_name in module_names:
+            for exercise_index, exercise in enumerate(get_playlist(module_name)):
+                name = f"{module_name}: {exercise.name}"
+                futures[name] = [
+                    executor.submit(run_exercise, module_name, exercise_index, list(seeds), max_time, allocation_budget)
+                    for seeds in (range(i, min(i + chunk_size, n_seeds)) for i in range(0, n_seeds, chunk_size))
+                ]
+
+        return {name: [result for future in chunks for result in future.result()] for name, chunks in futures.items()}
+
+
+def print_results(results: dict):
+    """Pass rate, mean time to finish of the passed episodes, tick cost and most bytes allocated by a tick
+    of each exercise."""
+    width = max(len(name) for name in results)
+    print(f"{'exercise':<{width}}  pass rate  time to finish  us per tick  bytes per tick")
+    for name, episodes in results.items():
+        finish_times = [time for passed, time, *_ in episodes if passed]
+        pass_rate = len(finish_times) / len(episodes) * 100
+        mean_time = sum(finish_times) / len(finish_times) if finish_times else float("nan")
+        ticks = sum(episode[2] for episode in episodes)
+        tick_cost = sum(episode[3] for episode in episodes) / max(ticks, 1) * 1e6
+        allocated = max(episode[4] for episode in episodes)
+        print(f"{name:<{width}}  {pass_rate:8.1f}%  {mean_time:13.2f}s  {tick_cost:11.1f}  {allocated:14d}")
+
+
+def over_allocation_budget(results: dict, allocation_budget: int) -> List[str]:
+    """The exercises with a tick that allocated more bytes than the budget."""
+    return [name for name, episodes in results.items() if max(episode[4] for episode in episodes) > allocation_budget]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs the training playlists in the headless simulator.")
+    parser.add_argument("paths", nargs="*", help="test modules or directories, the whole repo by default")
+    parser.add_argument("--seeds", type=int, default=20, help="number of seeded scenarios per exercise")
+    parser.add_argument("--max-time", type=float, default=10.0, help="episodes not graded by then fail")
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument(
+        "--allocation-budget", type=int, help="tracks the bytes allocated by each tick, and fails over this budget"
+    )
+    args = parser.parse_args()
+
+    start = perf_counter()
+    modules = find_test_modules(args.paths)
+    results = run_playlists(modules, args.seeds, args.max_time, args.processes, 5, args.allocation_budget)
+    print_results(results)
+    print(f"Took {perf_counter() - start:.2f} seconds.")
+
+    if args.allocation_budget is not None:
+        over_budget = over_allocation_budget(results, args.allocation_budget)
+        if over_budget:
+            sys.exit(f"Over the allocation budget of {args.allocation_budget} bytes per tick: {', '.join(over_budget)}")
+
+
+if __name__ == "__main__":
+    main()
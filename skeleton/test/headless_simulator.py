@@ -0,0 +1,456 @@
+import math
+from typing import Callable, List, Optional
+
+import numpy as np
+from numba import jit
+from rlbot.agents.base_agent import SimpleControllerState
+from rlbot.utils.structures.ball_prediction_struct import BallPrediction, MAX_SLICES
+from rlbot.utils.structures.game_data_struct import FieldInfoPacket, GameTickPacket
+
+from skeleton.util.structure.dtypes import dtype_Slice, dtype_BoostPadState
+from util.boost_utils import BOOST_PADS, STANDARD_PAD_LOCATIONS
+from util.physics.drive_1d_simulation_utils import DT
+from util.physics.drive_2d_simulation import drive_2d_step
+
+# the car's elevation from the ground due to wheels and suspension
+ORIGIN_HEIGHT = 17
+# octane hitbox
+HITBOX_SIZE = (118.01, 84.2, 36.16)
+HITBOX_OFFSET = (13.88, 0.0, 20.75)
+
+GRAVITY = -650.0
+BALL_RADIUS = 92.75
+BALL_DRAG = 0.0305
+BALL_RESTITUTION = 0.6
+BALL_MAX_SPEED = 6000.0
+# how much of the car's approach speed is given to the ball on a hit
+BALL_HIT_FACTOR = 1.7
+
+ARENA_HALF_WIDTH = 4096.0
+ARENA_HALF_LENGTH = 5120.0
+ARENA_HEIGHT = 2044.0
+
+BIG_PAD_RADIUS = 208.0
+SMALL_PAD_RADIUS = 144.0
+BIG_PAD_RECHARGE_TIME = 10.0
+SMALL_PAD_RECHARGE_TIME = 4.0
+
+
+@jit(nopython=True, fastmath=True, cache=True)
+def ball_step(x, y, z, vx, vy, vz, dt=DT):
+    """Advances the ball by dt with gravity, drag and bounces off the ground, the walls and the ceiling.
+    Returns the new (x, y, z, vx, vy, vz)."""
+
+    drag = 1 - BALL_DRAG * dt
+    vx *= drag
+    vy *= drag
+    vz = vz * drag + GRAVITY * dt
+
+    x += vx * dt
+    y += vy * dt
+    z += vz * dt
+
+    if z < BALL_RADIUS and vz < 0:
+        z = BALL_RADIUS
+        vz = -vz * BALL_RESTITUTION
+    if z > ARENA_HEIGHT - BALL_RADIUS and vz > 0:
+        z = ARENA_HEIGHT - BALL_RADIUS
+        vz = -vz * BALL_RESTITUTION
+    if abs(x) > ARENA_HALF_WIDTH - BALL_RADIUS and x * vx > 0:
+        x = math.copysign(ARENA_HALF_WIDTH - BALL_RADIUS, x)
+        vx = -vx * BALL_RESTITUTION
+    if abs(y) > ARENA_HALF_LENGTH - BALL_RADIUS and y * vy > 0:
+        y = math.copysign(ARENA_HALF_LENGTH - BALL_RADIUS, y)
+        vy = -vy * BALL_RESTITUTION
+
+    return x, y, z, vx, vy, vz
+
+
+@jit(nopython=True, fastmath=True, cache=True)
+def predict_ball(location, velocity, time, slice_dt, out_location, out_velocity, out_time):
+    """Fills the outputs with the future ball states every slice_dt, simulated with the simulator's own steps."""
+    x, y, z = location[0], location[1], location[2]
+    vx, vy, vz = velocity[0], velocity[1], velocity[2]
+    steps = max(int(round(slice_dt / DT)), 1)
+    for i in range(len(out_time)):
+        for _ in range(steps):
+            x, y, z, vx, vy, vz = ball_step(x, y, z, vx, vy, vz)
+        time += steps * DT
+        out_location[i, 0], out_location[i, 1], out_location[i, 2] = x, y, z
+        out_velocity[i, 0], out_velocity[i, 1], out_velocity[i, 2] = vx, vy, vz
+        out_time[i] = time
+
+
+@jit(nopython=True, fastmath=True, cache=True)
+def car_ball_hit(x, y, vx, vy, yaw, ball_x, ball_y, ball_z, ball_vx, ball_vy, ball_vz):
+    """Pushes the ball out of the car's hitbox and gives it the car's approach speed.
+    Returns (hit, ball state (x, y, z, vx, vy, vz), hit location (x, y, z), hit normal (x, y, z))."""
+
+    cos_yaw = math.cos(yaw)
+    sin_yaw = math.sin(yaw)
+    dx = ball_x - x
+    dy = ball_y - y
+    dz = ball_z - ORIGIN_HEIGHT
+
+    local_x = dx * cos_yaw + dy * sin_yaw
+    local_y = -dx * sin_yaw + dy * cos_yaw
+    local_z = dz
+
+    hit_x = min(max(local_x - HITBOX_OFFSET[0], -HITBOX_SIZE[0] / 2), HITBOX_SIZE[0] / 2) + HITBOX_OFFSET[0]
+    hit_y = min(max(local_y - HITBOX_OFFSET[1], -HITBOX_SIZE[1] / 2), HITBOX_SIZE[1] / 2) + HITBOX_OFFSET[1]
+    hit_z = min(max(local_z - HITBOX_OFFSET[2], -HITBOX_SIZE[2] / 2), HITBOX_SIZE[2] / 2) + HITBOX_OFFSET[2]
+
+    normal_x = local_x - hit_x
+    normal_y = local_y - hit_y
+    normal_z = local_z - hit_z
+    distance = math.sqrt(normal_x**2 + normal_y**2 + normal_z**2)
+    if distance >= BALL_RADIUS:
+        return False, ball_x, ball_y, ball_z, ball_vx, ball_vy, ball_vz, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0
+
+    if distance < 1e-6:
+        # the ball's center is inside the hitbox
+        normal_x = local_x - HITBOX_OFFSET[0]
+        normal_y = local_y - HITBOX_OFFSET[1]
+        normal_z = local_z - HITBOX_OFFSET[2]
+        distance = max(math.sqrt(normal_x**2 + normal_y**2 + normal_z**2), 1e-6)
+    normal_x, normal_y, normal_z = normal_x / distance, normal_y / distance, normal_z / distance
+
+    # back to world coordinates
+    normal_x, normal_y = normal_x * cos_yaw - normal_y * sin_yaw, normal_x * sin_yaw + normal_y * cos_yaw
+    hit_x, hit_y = hit_x * cos_yaw - hit_y * sin_yaw + x, hit_x * sin_yaw + hit_y * cos_yaw + y
+    hit_z += ORIGIN_HEIGHT
+
+    ball_x = hit_x + normal_x * BALL_RADIUS
+    ball_y = hit_y + normal_y * BALL_RADIUS
+    ball_z = hit_z + normal_z * BALL_RADIUS
+
+    approach_speed = (vx - ball_vx) * normal_x + (vy - ball_vy) * normal_y - ball_vz * normal_z
+    if approach_speed > 0:
+        ball_vx += normal_x * approach_speed * BALL_HIT_FACTOR
+        ball_vy += normal_y * approach_speed * BALL_HIT_FACTOR
+        ball_vz += normal_z * approach_speed * BALL_HIT_FACTOR
+        speed = math.sqrt(ball_vx**2 + ball_vy**2 + ball_vz**2)
+        if speed > BALL_MAX_SPEED:
+            ball_vx *= BALL_MAX_SPEED / speed
+            ball_vy *= BALL_MAX_SPEED / speed
+            ball_vz *= BALL_MAX_SPEED / speed
+
+    return True, ball_x, ball_y, ball_z, ball_vx, ball_vy, ball_vz, hit_x, hit_y, hit_z, normal_x, normal_y, normal_z
+
+
+def read_game_state(game_state):
+    """Converts an rlbot GameState, like the ones made by the exercises' make_game_state, to the simulator's states.
+    Returns ({index: (x, y, vx, vy, yaw, yaw_rate, boost)}, ball_location, ball_velocity), unset values are zero."""
+
+    def vector(value, size=3):
+        if value is None:
+            return [0.0] * size
+        return [float(getattr(value, name) or 0.0) for name in ("x", "y", "z")[:size]]
+
+    cars = {}
+    for index, car_state in (game_state.cars or {}).items():
+        physics = car_state.physics
+        location = vector(physics.location if physics else None, 2)
+        velocity = vector(physics.velocity if physics else None, 2)
+        yaw = float(physics.rotation.yaw or 0.0) if physics and physics.rotation else 0.0
+        yaw_rate = vector(physics.angular_velocity if physics else None)[2]
+        boost = float(car_state.boost_amount) if car_state.boost_amount is not None else 33.0
+        cars[index] = (location[0], location[1], velocity[0], velocity[1], yaw, yaw_rate, boost)
+
+    ball_location = np.array([0.0, 0.0, BALL_RADIUS])
+    ball_velocity = np.zeros(3)
+    if game_state.ball is not None and game_state.ball.physics is not None:
+        physics = game_state.ball.physics
+        if physics.location is not None:
+            ball_location = np.array(vector(physics.location))
+            ball_location[2] = max(ball_location[2], BALL_RADIUS)
+        ball_velocity = np.array(vector(physics.velocity))
+
+    return cars, ball_location, ball_velocity
+
+
+class NullRenderer:
+    """Renderer that ignores all rendering calls."""
+
+    def __getattr__(self, name):
+        def ignore(*args, **kwargs):
+            pass
+
+        return ignore
+
+
+class HeadlessSimulator:
+    """Flat ground simulation of cars and a ball, without the game. It consumes SimpleControllerStates
+    and produces the GameTickPacket, FieldInfoPacket and BallPrediction that SkeletonAgents read.
+    Cars use the ground car model of drive_2d_simulation, they can't jump."""
+
+    def __init__(self, num_cars: int = 1):
+        self.num_cars = num_cars
+        self.time = 0.0
+        self.frame = 0
+
+        # car states (x, y, vx, vy, yaw, yaw_rate, boost)
+        self.cars = np.zeros((num_cars, 7))
+        self.ball_location = np.array([0.0, 0.0, BALL_RADIUS])
+        self.ball_velocity = np.zeros(3)
+
+        self.pad_locations = STANDARD_PAD_LOCATIONS.copy()
+        self.pad_is_full_boost = np.array([is_full_boost for _, _, is_full_boost in BOOST_PADS])
+        self.pad_timers = np.zeros(len(BOOST_PADS))
+
+        self.field_info = self.make_field_info()
+        self.packet = GameTickPacket()
+        self.game_boosts = np.frombuffer(self.packet.game_boosts, dtype_BoostPadState)
+        self.ball_prediction = BallPrediction()
+        self.ball_prediction.num_slices = MAX_SLICES
+        self.slices = np.frombuffer(self.ball_prediction.slices, dtype_Slice)
+
+        self.write_packet()
+
+    def make_field_info(self) -> FieldInfoPacket:
+        field_info = FieldInfoPacket()
+        field_info.num_boosts = len(BOOST_PADS)
+        for i, (location, is_full_boost) in enumerate(zip(self.pad_locations, self.pad_is_full_boost)):
+            pad = field_info.boost_pads[i]
+            pad.location.x, pad.location.y, pad.location.z = location
+            pad.is_full_boost = bool(is_full_boost)
+
+        field_info.num_goals = 2
+        for team, side in enumerate((-1, 1)):
+            goal = field_info.goals[team]
+            goal.team_num = team
+            goal.location.y = side * ARENA_HALF_LENGTH
+            goal.location.z = 321.3875
+            goal.direction.y = -side
+            goal.width = 1785.51
+            goal.height = 642.775
+        return field_info
+
+    def attach(self, agent):
+        """Makes the agent read the field info and the ball prediction from the simulator, and initializes it.
+        The background planning and the quality governor are turned off, so that episodes don't depend on the load
+        of the machine."""
+        agent.asynchronous_planning = False
+        agent.adaptive_quality = False
+        agent.governor.enabled = False
+        for planner in agent.planners:
+            planner.asynchronous = False
+
+        agent.get_field_info = lambda: self.field_info
+        agent.get_ball_prediction_struct = lambda: self.ball_prediction
+        if agent.renderer is None:
+            agent.renderer = NullRenderer()
+        agent.initialize_agent()
+
+    def set_car(self, index: int, location, velocity=(0.0, 0.0), yaw: float = 0.0, yaw_rate=0.0, boost=33.0):
+        self.cars[index] = (location[0], location[1], velocity[0], velocity[1], yaw, yaw_rate, boost)
+        self.write_packet()
+
+    def set_ball(self, location, velocity=(0.0, 0.0, 0.0)):
+        self.ball_location = np.array(location, dtype=np.float64)
+        self.ball_velocity = np.array(velocity, dtype=np.float64)
+        self.write_packet()
+
+    def set_game_state(self, game_state):
+        """Sets the cars and the ball like the rlbot GameState does in the game."""
+        cars, self.ball_location, self.ball_velocity = read_game_state(game_state)
+        for index, car in cars.items():
+            self.cars[index] = car
+        self.write_packet()
+
+    def step(self, controls: List[SimpleControllerState]) -> GameTickPacket:
+        """Advances the game by one tick with the controls of each car, returns the packet of the next tick."""
+        self.time += DT
+        self.frame += 1
+
+        for i, car_controls in enumerate(controls):
+            self.cars[i] = drive_2d_step(
+                *self.cars[i],
+                car_controls.throttle,
+                car_controls.steer,
+                car_controls.boost,
+                car_controls.handbrake,
+            )
+            self.keep_car_in_arena(i)
+            self.pick_up_boost(i)
+
+        ball_state = ball_step(*self.ball_location, *self.ball_velocity)
+        self.ball_location = np.array(ball_state[:3])
+        self.ball_velocity = np.array(ball_state[3:])
+
+        for i in range(self.num_cars):
+            self.hit_ball(i)
+
+        self.pad_timers = np.maximum(self.pad_timers - DT, 0)
+
+        self.write_packet()
+        return self.packet
+
+    def keep_car_in_arena(self, index: int):
+        car = self.cars[index]
+        for axis, half_size in ((0, ARENA_HALF_WIDTH), (1, ARENA_HALF_LENGTH)):
+            if abs(car[axis]) > half_size:
+                car[axis] = math.copysign(half_size, car[axis])
+                car[axis + 2] = 0.0
+
+    def pick_up_boost(self, index: int):
+        car = self.cars[index]
+        distances = np.hypot(self.pad_locations[:, 0] - car[0], self.pad_locations[:, 1] - car[1])
+        radius = np.where(self.pad_is_full_boost, BIG_PAD_RADIUS, SMALL_PAD_RADIUS)
+        for i in np.flatnonzero((distances < radius) & (self.pad_timers == 0)):
+            car[6] = min(car[6] + (100 if self.pad_is_full_boost[i] else 12), 100)
+            self.pad_timers[i] = BIG_PAD_RECHARGE_TIME if self.pad_is_full_boost[i] else SMALL_PAD_RECHARGE_TIME
+
+    def hit_ball(self, index: int):
+        """Pushes the ball out of the car's hitbox and gives it the car's approach speed."""
+        x, y, vx, vy, yaw, _, _ = self.cars[index]
+        hit, *ball_state, hit_x, hit_y, hit_z, normal_x, normal_y, normal_z = car_ball_hit(
+            x, y, vx, vy, yaw, *self.ball_location, *self.ball_velocity
+        )
+        if not hit:
+            return
+
+        self.ball_location = np.array(ball_state[:3])
+        self.ball_velocity = np.array(ball_state[3:])
+        hit_location = (hit_x, hit_y, hit_z)
+        normal = (normal_x, normal_y, normal_z)
+
+        touch = self.packet.game_ball.latest_touch
+        touch.player_name = self.packet.game_cars[index].name
+        touch.time_seconds = self.time
+        touch.hit_location.x, touch.hit_location.y, touch.hit_location.z = hit_location
+        touch.hit_normal.x, touch.hit_normal.y, touch.hit_normal.z = normal
+        touch.team = self.packet.game_cars[index].team
+        touch.player_index = index
+
+    def write_packet(self):
+        packet = self.packet
+        packet.num_cars = self.num_cars
+        packet.num_boost = len(BOOST_PADS)
+
+        for i in range(self.num_cars):
+            x, y, vx, vy, yaw, yaw_rate, boost = self.cars[i]
+            game_car = packet.game_cars[i]
+            physics = game_car.physics
+            physics.location.x, physics.location.y, physics.location.z = x, y, ORIGIN_HEIGHT
+            physics.rotation.pitch, physics.rotation.yaw, physics.rotation.roll = 0.0, yaw, 0.0
+            physics.velocity.x, physics.velocity.y, physics.velocity.z = vx, vy, 0.0
+            physics.angular_velocity.x, physics.angular_velocity.y, physics.angular_velocity.z = 0.0, 0.0, yaw_rate
+            game_car.has_wheel_contact = True
+            game_car.is_super_sonic = math.hypot(vx, vy) > 2200
+            game_car.is_bot = True
+            game_car.team = i % 2
+            game_car.name = f"car {i}"
+            game_car.boost = int(boost)
+            game_car.hitbox.length, game_car.hitbox.width, game_car.hitbox.height = HITBOX_SIZE
+            game_car.hitbox_offset.x, game_car.hitbox_offset.y, game_car.hitbox_offset.z = HITBOX_OFFSET
+
+        self.game_boosts["is_active"][: len(BOOST_PADS)] = self.pad_timers == 0
+        self.game_boosts["timer"][: len(BOOST_PADS)] = self.pad_timers
+
+        physics = packet.game_ball.physics
+        physics.location.x, physics.location.y, physics.location.z = self.ball_location
+        physics.velocity.x, physics.velocity.y, physics.velocity.z = self.ball_velocity
+        packet.game_ball.collision_shape.sphere.diameter = BALL_RADIUS * 2
+
+        game_info = packet.game_info
+        game_info.seconds_elapsed = self.time
+        game_info.game_time_remaining = max(300 - self.time, 0)
+        game_info.is_round_active = True
+        game_info.is_unlimited_time = True
+        game_info.world_gravity_z = GRAVITY
+        game_info.game_speed = 1.0
+        game_info.frame_num = self.frame
+
+        self.write_ball_prediction()
+
+    def write_ball_prediction(self):
+        location = np.zeros((MAX_SLICES, 3))
+        velocity = np.zeros((MAX_SLICES, 3))
+        time = np.zeros(MAX_SLICES)
+        predict_ball(self.ball_location, self.ball_velocity, self.time, 1 / 60, location, velocity, time)
+        self.slices["physics"]["location"] = location
+        self.slices["physics"]["velocity"] = velocity
+        self.slices["game_seconds"] = time
+
+
+def run_episode(
+    simulator: HeadlessSimulator,
+    agents: list,
+    grade: Callable[[HeadlessSimulator, list], Optional[bool]],
+    max_time: float = 10.0,
+):
+    """Runs the agents in the simulator until grade returns True (pass) or False (fail), or until max_time.
+    Returns (passed, time)."""
+    packet = simulator.packet
+    start_time = simulator.time
+    while simulator.time - start_time < max_time:
+        controls = [agent.get_output(packet) for agent in agents]
+        packet = simulator.step(controls)
+
+        result = grade(simulator, agents)
+        if result is not None:
+            return result, simulator.time - start_time
+
+    return False, simulator.time - start_time
+
+
+def main():
+    """Running HitGroundBall episodes from random states, to measure the success rate and speed"""
+
+    from time import perf_counter
+    from random import Random
+
+    from action.hit_ground_ball import HitGroundBall
+    from skeleton import SkeletonAgent
+
+    class HitBallAgent(SkeletonAgent):
+        def initialize_agent(self):
+            super().initialize_agent()
+            self.action = HitGroundBall(self)
+
+        def get_controls(self) -> SimpleControllerState:
+            return self.action.get_controls(self.game_data)
+
+    def grade(simulator, agents):
+        if simulator.packet.game_ball.latest_touch.time_seconds > 0:
+            return True
+        if agents[0].action.failed:
+            return False
+        return None
+
+    rng = Random(0)
+    n_episodes = 50
+    passed = 0
+    ticks = 0
+    start = perf_counter()
+
+    for _ in range(n_episodes):
+        simulator = HeadlessSimulator()
+        simulator.set_car(
+            0,
+            (rng.uniform(-3000, 3000), rng.uniform(-4000, 4000)),
+            (rng.uniform(-1000, 1000), rng.uniform(-1000, 1000)),
+            rng.uniform(-math.pi, math.pi),
+            boost=rng.uniform(0, 50),
+        )
+        simulator.set_ball(
+            (rng.uniform(-3000, 3000), rng.uniform(-4000, 4000), rng.uniform(93, 1000)),
+            (rng.uniform(-3000, 3000), rng.uniform(-3000, 3000), rng.uniform(-1000, 1000)),
+        )
+
+        agent = HitBallAgent("headless", 0, 0)
+        simulator.attach(agent)
+
+        result, _ = run_episode(simulator, [agent], grade)
+        passed += result
+        ticks += simulator.frame
+
+    time_taken = perf_counter() - start
+    print(f"Passed {passed} of {n_episodes} episodes.")
+    print(f"Took {time_taken:.2f} seconds, {n_episodes / time_taken * 60:.0f} episodes per minute.")
+    print(f"That's {time_taken / ticks * 1e6:.1f} us per tick.")
+
+
+if __name__ == "__main__":
+    main()
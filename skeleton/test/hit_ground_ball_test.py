@@ -0,0 +1,45 @@
+import numpy as np
+from rlbot.agents.base_agent import SimpleControllerState
+
+from action.hit_ground_ball import HitGroundBall
+from action.hit_ground_ball.hit_ground_ball import CACHE_HITS, CACHE_MISSES, DRIFT_TOLERANCE
+from skeleton import SkeletonAgent
+from skeleton.test.headless_simulator import HeadlessSimulator
+
+
+class HitBallAgent(SkeletonAgent):
+    manage_garbage_collection = False
+
+    def initialize_agent(self):
+        super().initialize_agent()
+        self.action = HitGroundBall(self)
+
+    def get_controls(self) -> SimpleControllerState:
+        return self.action.get_controls(self.game_data)
+
+
+def test_intercept_cache_hits_until_the_prediction_drifts():
+    simulator = HeadlessSimulator()
+    simulator.set_car(0, (0.0, -2000.0), yaw=np.pi / 2, boost=0.0)
+    simulator.set_ball((0.0, 1000.0, 93.0), (0.0, -500.0, 0.0))
+
+    agent = HitBallAgent("test_agent", 0, 0)
+    simulator.attach(agent)
+    action = agent.action
+
+    # the first tick searches, the next ones reuse the intercept while the prediction doesn't change
+    packet = simulator.packet
+    for _ in range(5):
+        packet = simulator.step([agent.get_output(packet)])
+    assert (action.cache_misses, action.cache_hits) == (1, 4)
+
+    # the ball is pushed sideways further than the tolerance at the intercept
+    simulator.set_ball(simulator.ball_location + [DRIFT_TOLERANCE * 2, 0.0, 0.0], simulator.ball_velocity)
+    agent.get_output(simulator.packet)
+    assert (action.cache_misses, action.cache_hits) == (2, 4)
+    assert action.cache_hit_rate == 4 / 6
+
+    # the counts are reported in the instrumentation's summary and dump
+    assert agent.instrumentation.counters[CACHE_HITS] == 4
+    assert agent.instrumentation.counters[CACHE_MISSES] == 2
+    agent.retire()
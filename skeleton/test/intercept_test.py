@@ -0,0 +1,34 @@
+import numpy as np
+
+from skeleton.util.structure import Player
+from skeleton.util.structure.dtypes import dtype_Slice
+from util.intercept_utils import earliest_intercept, car_intercept_margin
+
+
+def test_short_window_between_strides():
+    """A fast ball grazing the front of a car at rest is only reachable for 3 slices, between the slices
+    a plain stride of 4 looks at."""
+    times = np.arange(1, 121) / 120
+    velocity = np.array([0.0, 5000.0, 0.0])
+    locations = np.array([172.0, -725.0, 92.0]) + np.outer(times, velocity)
+
+    ball_prediction = np.zeros(len(times), dtype_Slice)
+    ball_prediction["game_seconds"] = times
+    ball_prediction["physics"]["location"] = locations
+    ball_prediction["physics"]["velocity"] = velocity
+
+    car = Player()
+    car.location = np.array([0.0, 0.0, 17.0])
+    car.velocity = np.zeros(3)
+    car.boost = 0
+    car_rot = np.identity(3)
+
+    margins = np.array([car_intercept_margin(location, time, car, car_rot) for location, time in zip(locations, times)])
+    reachable = np.flatnonzero(margins > 0)
+    assert reachable.tolist() == [16, 17, 18]
+
+    intercept = earliest_intercept(ball_prediction, 0.0, car, car_rot, stride=4)
+    assert intercept is not None
+    assert times[15] <= intercept.time <= times[16]
+    # the slices before the window are ruled out by the broad phase alone
+    assert 0 < intercept.culled <= 16
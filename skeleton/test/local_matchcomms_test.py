@@ -0,0 +1,26 @@
+from skeleton.test.skeleton_agent_test import SkeletonAgentTest
+from util.local_matchcomms import LocalMatchcommsServer
+
+
+def test_messages_wait_in_the_broadcast_until_read():
+    server = LocalMatchcommsServer()
+    grader = server.connect()
+    agent = SkeletonAgentTest("test_agent", 0, 0)
+    client = server.attach(agent)
+
+    # injected through the agent's hook, without touching BaseAgent's own client
+    assert agent.matchcomms is client
+    assert agent._matchcomms is None
+
+    agent.matchcomms.outgoing_broadcast.put_nowait("initialized")
+    assert not client.outgoing_broadcast.empty()
+
+    assert not grader.incoming_broadcast.empty()
+    assert client.outgoing_broadcast.empty()
+    assert grader.incoming_broadcast.get_nowait() == "initialized"
+    assert client.incoming_broadcast.empty()
+
+    # nothing is kept once the server is closed, flushing doesn't wait for the readers that are gone
+    server.close()
+    client.outgoing_broadcast.put_nowait("pass")
+    assert client.outgoing_broadcast.empty()
@@ -0,0 +1,59 @@
+import threading
+
+import numpy as np
+
+from util.collision_utils import broad_phase_kernel, broad_phase_margin
+from util.intercept_utils import earliest_intercept_kernel, intercept_margin
+from util.parallel import split_batch
+
+
+def test_split_collision_batch():
+    """The broad phase of many ball locations, split in chunks run on the thread pool."""
+    rng = np.random.default_rng(0)
+    ball_locations = rng.uniform(-4000, 4000, (5000, 3))
+    delta_times = np.linspace(0, 6, 5000)
+    shared = (rng.uniform(-4000, 4000, (4, 3)), np.full(4, 1000.0), np.full(4, 50.0), 100.0, 92.0, 300.0)
+
+    expected = broad_phase_kernel(ball_locations, delta_times, *shared)
+    result = split_batch(
+        broad_phase_kernel, ball_locations, delta_times, shared=shared, min_chunk_size=500, max_chunks=4
+    )
+    assert np.array_equal(expected, result)
+
+
+def test_collision_kernels_release_the_gil():
+    for kernel in (broad_phase_margin, broad_phase_kernel, intercept_margin, earliest_intercept_kernel):
+        assert kernel.targetoptions.get("nogil"), kernel.__name__
+
+
+def test_intercept_search_on_threads():
+    """The intercept search gives the same results run from several threads at once."""
+    times = np.arange(1, 361) / 120
+    velocity = np.array([-500.0, 0.0, 0.0])
+    locations = np.array([2000.0, 3000.0, 92.0]) + np.outer(times, velocity)
+    velocities = np.tile(velocity, (360, 1))
+    arguments = (
+        locations,
+        velocities,
+        times,
+        np.array([0.0, 0.0, 17.0]),
+        np.array([0.0, 1000.0, 0.0]),
+        50.0,
+        np.identity(3),
+        np.array([59.0, 42.0, 18.0]),
+        np.array([13.88, 0.0, 20.76]),
+        92.0,
+        200.0,
+        4,
+        1e-3,
+        8,
+    )
+    expected = earliest_intercept_kernel(*arguments)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(earliest_intercept_kernel(*arguments))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [expected] * 4
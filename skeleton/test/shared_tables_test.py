@@ -0,0 +1,78 @@
+import importlib.util
+import linecache
+import os
+
+import numpy as np
+import pytest
+
+from util import shared_tables
+from util.boost_utils import PAD_TABLE, STANDARD_PAD_LOCATIONS, build_pad_geometry, pad_geometry
+from util.shared_tables import attach_table, register_table, table_hash
+
+SOURCE = "SCALE = {}\n\n\ndef build():\n    return SCALE * np.arange(4.0)\n"
+
+
+@pytest.fixture
+def tables_directory(tmp_path, monkeypatch):
+    """Tables published to an empty directory, without the ones attached by other tests."""
+    monkeypatch.setattr(shared_tables, "TABLES_DIRECTORY", str(tmp_path / "tables"))
+    monkeypatch.setattr(shared_tables, "_specs", dict(shared_tables._specs))
+    monkeypatch.setattr(shared_tables, "_attached", {})
+    return shared_tables.TABLES_DIRECTORY
+
+
+def import_source(path, scale):
+    with open(path, "w") as file:
+        file.write("import numpy as np\n\n" + SOURCE.format(scale))
+    # the hash reads the sources through linecache, like a new process would read the edited file
+    linecache.checkcache(str(path))
+    spec = importlib.util.spec_from_file_location("table_source", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_changed_source_rebuilds_the_table(tables_directory, tmp_path):
+    builds = []
+
+    def register(module):
+        def build():
+            builds.append(module)
+            return module.build()
+
+        register_table("test", build, sources=(module,))
+
+    first = import_source(tmp_path / "table_source.py", 1)
+    register(first)
+    first_hash = table_hash("test")
+    assert np.array_equal(attach_table("test"), np.arange(4.0))
+
+    # another process with the same source reuses the published table
+    shared_tables._attached.clear()
+    assert np.array_equal(attach_table("test"), np.arange(4.0))
+    assert len(builds) == 1
+
+    second = import_source(tmp_path / "table_source.py", 10)
+    register(second)
+    assert table_hash("test") != first_hash
+
+    shared_tables._attached.clear()
+    assert np.array_equal(attach_table("test"), 10 * np.arange(4.0))
+    assert builds == [first, second]
+
+    # the stale version is removed when the new one is published
+    assert os.listdir(tables_directory) == [f"test-{table_hash('test')}.npy"]
+
+
+def test_pad_geometry_table(tables_directory):
+    tables = {PAD_TABLE: attach_table(PAD_TABLE)}
+    assert np.allclose(tables[PAD_TABLE], build_pad_geometry(STANDARD_PAD_LOCATIONS))
+
+    boost_pads = np.zeros(len(STANDARD_PAD_LOCATIONS), [("location", "<f4", 3), ("is_full_boost", "?")])
+    boost_pads["location"] = STANDARD_PAD_LOCATIONS
+    boost_pads["location"][:, 2] = 73
+    assert pad_geometry(boost_pads, tables) is tables[PAD_TABLE]
+
+    # other layouts can't use it
+    boost_pads["location"][0, 0] += 500
+    assert np.allclose(pad_geometry(boost_pads, tables), build_pad_geometry(boost_pads["location"]))
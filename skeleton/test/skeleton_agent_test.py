@@ -12,6 +12,11 @@ from rlbot.utils.structures.ball_prediction_struct import BallPrediction, MAX_SL
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from skeleton import SkeletonAgent
+from skeleton.util.allocations import AllocationTracker
+from skeleton.util.instrumentation import PHASE_TICK
+
+# bytes a tick of the benchmark may allocate, temporaries included
+TICK_ALLOCATION_BUDGET = 96 * 1024
 
 
 class SkeletonAgentTest(SkeletonAgent):
@@ -35,14 +40,7 @@ def main():
 
     from timeit import timeit
 
-    # import cProfile
-    # import pstats
-    # import io
-    # from pstats import SortKey
-
-    # pr = cProfile.Profile()
-    # pr.enable()
-
+    # set DISASTERBOT_PROFILE to a path to also write the collapsed stacks of the ticks there
     agent = SkeletonAgentTest("test_agent", 0, 0)
     game_tick_packet = GameTickPacket()
     game_tick_packet.num_cars = MAX_PLAYERS
@@ -64,12 +62,19 @@ def main():
     print(f"Took {time_taken} seconds to run {n_times} times.")
     print(f"That's {percentage:.5f} % of our time budget.")
 
-    # pr.disable()
-    # s = io.StringIO()
-    # sortby = SortKey.CUMULATIVE
-    # ps = pstats.Stats(pr, stream=s).sort_stats(sortby)
-    # ps.print_stats()
-    # print(s.getvalue())
+    # the same ticks again, measuring their allocations
+    allocations = AllocationTracker({PHASE_TICK: TICK_ALLOCATION_BUDGET})
+    agent.instrumentation.allocations = allocations
+    allocations.start()
+    for _ in range(100):
+        test_function()
+    allocations.stop()
+    print(allocations.summary())
+    allocations.check()
+
+    agent.retire()
+    if agent.profiler is not None:
+        print(f"{agent.profiler.samples} samples written to {agent.profiler.path}")
 
 
 if __name__ == "__main__":
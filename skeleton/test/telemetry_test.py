@@ -0,0 +1,51 @@
+import numpy as np
+from rlbot.utils.structures.game_data_struct import GameTickPacket
+
+from skeleton.test.skeleton_agent_test import SkeletonAgentTest, MAX_BOOSTS
+from skeleton.util.scheduler import PRIORITY_TELEMETRY
+from skeleton.util.telemetry import TelemetryWriter, load_telemetry, telemetry_runs
+
+
+def write_rows(directory: str, times, segment_rows: int = 100) -> str:
+    writer = TelemetryWriter(directory, segment_rows=segment_rows)
+    for time in times:
+        writer.set("time", time)
+        writer.end_row()
+    writer.close()
+    return writer.run_directory
+
+
+def test_runs_dont_overwrite_each_other(tmp_path):
+    """A short match after a long one, in the same directory, used to load the leftover segments of the long one."""
+    directory = str(tmp_path)
+    first = write_rows(directory, np.arange(1000, 1250))
+    second = write_rows(directory, np.arange(30))
+
+    assert telemetry_runs(directory) == [first, second]
+
+    columns, _ = load_telemetry(directory)
+    assert np.array_equal(columns["time"], np.arange(30))
+
+    columns, _ = load_telemetry(first)
+    assert np.array_equal(columns["time"], np.arange(1000, 1250))
+
+
+def test_flushes_are_scheduled_as_telemetry_work(tmp_path):
+    agent = SkeletonAgentTest("test_agent", 0, 0)
+    agent.manage_garbage_collection = False
+    agent.telemetry_path = str(tmp_path)
+    agent.initialize_agent()
+    agent.telemetry.flush_interval = 5
+
+    packet = GameTickPacket()
+    packet.num_cars = 1
+    packet.num_boost = MAX_BOOSTS
+    for _ in range(5):
+        agent.get_output(packet)
+    assert agent.scheduler.pending["telemetry flush"].priority == PRIORITY_TELEMETRY
+    assert load_telemetry(str(tmp_path))[0]["time"].size == 0
+
+    agent.get_output(packet)
+    assert "telemetry flush" not in agent.scheduler.pending
+    assert load_telemetry(str(tmp_path))[0]["time"].size == 5
+    agent.retire()
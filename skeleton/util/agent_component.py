@@ -0,0 +1,29 @@
+from skeleton.util.governor import DEGRADE_RENDERING
+from skeleton.util.instrumentation import instrumented
+
+
+class AgentComponent:
+    """Mixin of the policies, actions and mechanics, the parts of an agent's tick.
+    The instrumented_method of every class that defines it is timed as the instrumented_phase,
+    and the debug renderings are only drawn when the agent allows them. The agent is self.agent."""
+
+    instrumented_method = ""
+    instrumented_phase = ""
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        method = cls.__dict__.get(cls.instrumented_method)
+        if method is not None:
+            setattr(cls, cls.instrumented_method, instrumented(cls.instrumented_phase, method))
+
+    @property
+    def rendering_enabled(self) -> bool:
+        """Whether to draw on this tick: only on the ticks the render buffer collects, and not while the governor
+        trades quality for speed. Children are built with the configured _rendering_enabled instead."""
+        if not self._rendering_enabled or not self.agent.render_buffer.active:
+            return False
+        return not self.agent.governor.degraded(DEGRADE_RENDERING)
+
+    @rendering_enabled.setter
+    def rendering_enabled(self, rendering_enabled: bool):
+        self._rendering_enabled = rendering_enabled
@@ -0,0 +1,144 @@
+import json
+import sys
+import time
+import tracemalloc
+from typing import Dict, List
+
+from skeleton.util.instrumentation import PHASE_TICK
+
+# python 3.9+, without it only the retained bytes are measured, not the temporaries
+_reset_peak = getattr(tracemalloc, "reset_peak", None)
+
+
+class AllocationStats:
+    """Bytes and blocks allocated by a phase, per call."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_bytes = 0
+        self.max_bytes = 0
+        self.total_retained = 0
+        self.total_blocks = 0
+        self.over_budget = 0
+
+    def record(self, allocated: int, retained: int, blocks: int):
+        self.count += 1
+        self.total_bytes += allocated
+        self.max_bytes = max(self.max_bytes, allocated)
+        self.total_retained += retained
+        self.total_blocks += blocks
+
+    def to_dict(self) -> dict:
+        count = max(self.count, 1)
+        return {
+            "count": self.count,
+            "mean_bytes": self.total_bytes / count,
+            "max_bytes": self.max_bytes,
+            "mean_retained_bytes": self.total_retained / count,
+            "mean_blocks": self.total_blocks / count,
+            "over_budget": self.over_budget,
+        }
+
+
+class AllocationTracker:
+    """Measures the memory allocated by each phase of the ticks with tracemalloc.
+    The allocated bytes of a phase are the peak of the traced memory above what it was when the phase began,
+    so they include the temporaries freed before the phase ends. The retained bytes and the blocks are what's
+    still allocated when the phase ends, the blocks count the objects and the buffers of arrays.
+    The budgets are in allocated bytes per call of a phase, the tick phase being the whole tick.
+    tracemalloc slows everything down, so this is only meant for benchmarks and debugging sessions."""
+
+    def __init__(self, budgets: Dict[str, int] = None, logger=None, log_interval: float = 10.0):
+        self.budgets = dict(budgets or {})
+        self.logger = logger
+        self.log_interval = log_interval
+
+        self.phases: Dict[str, AllocationStats] = {}
+        # phase, traced memory and blocks when it began, and the peak reached by it's finished sub phases
+        self.stack: List[list] = []
+
+        self.violations: List[str] = []
+        self.violations_since_log = 0
+        self.last_log = time.perf_counter()
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stop(self):
+        tracemalloc.stop()
+
+    def begin(self, phase: str):
+        if not tracemalloc.is_tracing():
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        if self.stack:
+            parent = self.stack[-1]
+            parent[3] = max(parent[3], peak)
+        if _reset_peak is not None:
+            _reset_peak()
+        self.stack.append([phase, current, sys.getallocatedblocks(), current])
+
+    def end(self, phase: str):
+        if not self.stack or self.stack[-1][0] != phase:
+            return
+        _, start, start_blocks, sub_peak = self.stack.pop()
+        current, peak = tracemalloc.get_traced_memory()
+        if _reset_peak is None:
+            peak = current
+        peak = max(peak, sub_peak)
+        if self.stack:
+            parent = self.stack[-1]
+            parent[3] = max(parent[3], peak)
+
+        allocated = peak - start
+        stats = self.phases.get(phase)
+        if stats is None:
+            stats = self.phases[phase] = AllocationStats()
+        stats.record(allocated, current - start, sys.getallocatedblocks() - start_blocks)
+
+        budget = self.budgets.get(phase)
+        if budget is not None and allocated > budget:
+            stats.over_budget += 1
+            self.violations_since_log += 1
+            if len(self.violations) < 100:
+                self.violations.append(f"{phase} allocated {allocated} bytes, over it's budget of {budget}")
+
+        if phase == PHASE_TICK:
+            self.log()
+
+    def log(self):
+        now = time.perf_counter()
+        if self.logger is not None and now - self.last_log > self.log_interval:
+            log = self.logger.warning if self.violations_since_log > 0 else self.logger.info
+            log(
+                f"{self.violations_since_log} allocation budgets exceeded in the last {now - self.last_log:.0f}s\n"
+                f"{self.summary()}"
+            )
+            self.last_log = now
+            self.violations_since_log = 0
+
+    def check(self):
+        """Raises an AssertionError if a budget was exceeded, for the benchmarks."""
+        if self.violations:
+            over_budget = sum(stats.over_budget for stats in self.phases.values())
+            raise AssertionError(f"{over_budget} allocation budgets exceeded:\n" + "\n".join(self.violations[:10]))
+
+    def summary(self) -> str:
+        lines = [f"{'phase':<16} {'bytes':>10} {'max bytes':>10} {'retained':>10} {'blocks':>8} {'budget':>10}"]
+        for phase, stats in self.phases.items():
+            data = stats.to_dict()
+            budget = self.budgets.get(phase)
+            lines.append(
+                f"{phase:<16} {data['mean_bytes']:10.0f} {data['max_bytes']:10d} {data['mean_retained_bytes']:10.0f} "
+                f"{data['mean_blocks']:8.1f} {budget if budget is not None else '-':>10}"
+            )
+        return "\n".join(lines)
+
+    def dump(self, path: str):
+        data = {
+            "budgets": self.budgets,
+            "phases": {phase: stats.to_dict() for phase, stats in self.phases.items()},
+        }
+        with open(path, "w") as file:
+            json.dump(data, file, indent=2)
@@ -3,6 +3,7 @@ import numpy as np
 
 from rlbot.utils.structures.game_data_struct import Vector3, Rotator, BoxShape
 from rlbot.agents.base_agent import SimpleControllerState
+from rlbot.utils.structures.bot_input_struct import PlayerInput
 
 
 def vector3_to_numpy(vector: Vector3):
@@ -67,3 +68,16 @@ def copy_controls(obj_to: SimpleControllerState, obj_from: SimpleControllerState
     obj_to.boost = obj_from.boost
     obj_to.handbrake = obj_from.handbrake
     obj_to.use_item = obj_from.use_item
+
+
+def controls_to_player_input(controls: SimpleControllerState, player_input: PlayerInput):
+    """Copies the controls of a SimpleControllerState to a PlayerInput"""
+    player_input.throttle = controls.throttle
+    player_input.steer = controls.steer
+    player_input.pitch = controls.pitch
+    player_input.yaw = controls.yaw
+    player_input.roll = controls.roll
+    player_input.jump = controls.jump
+    player_input.boost = controls.boost
+    player_input.handbrake = controls.handbrake
+    player_input.use_item = controls.use_item
@@ -0,0 +1,105 @@
+import gc
+import time
+from typing import Dict, Optional
+
+from skeleton.util.instrumentation import PhaseStats
+from skeleton.util.scheduler import TickScheduler, PRIORITY_GARBAGE_COLLECTION
+from skeleton.util.structure.game_data import GameData
+
+# automatic collections of the oldest generation are pushed back that far during live play
+DEFERRED_THRESHOLD = 1 << 30
+
+# the manager running the garbage collector of the process, the collector is global
+_active: Optional["GCManager"] = None
+
+
+class GCManager:
+    """Keeps the cyclic garbage collector from pausing the ticks of live play.
+    The objects alive after the agent's initialization are frozen, so that collections never go through them again.
+    During live play the oldest generation is never collected automatically, the younger ones are collected
+    ahead of time at the end of the ticks that have time to spare.
+    The oldest generation is collected once each time the game stops: the countdowns of the kickoffs,
+    the goal replays and the end of the match.
+    The pauses of every collection are measured, and summarized in the logs at most every log_interval seconds."""
+
+    def __init__(self, logger=None, log_interval: float = 10.0):
+        self.logger = logger
+        self.log_interval = log_interval
+
+        self.thresholds = gc.get_threshold()
+        self.idle_collected = False
+
+        self.pauses: Dict[int, PhaseStats] = {}
+        self.collection_start = 0
+        self.last_log = time.perf_counter()
+
+    def start(self):
+        """Freezes what's alive now and takes over the collections from the automatic ones."""
+        global _active
+        if _active is not None:
+            _active.close()
+        _active = self
+
+        gc.collect()
+        gc.freeze()
+        self.thresholds = gc.get_threshold()
+        gc.set_threshold(self.thresholds[0], self.thresholds[1], DEFERRED_THRESHOLD)
+        gc.callbacks.append(self.measure)
+
+    def close(self):
+        """Gives the collections back to the automatic ones."""
+        global _active
+        if _active is not self:
+            return
+        _active = None
+
+        gc.callbacks.remove(self.measure)
+        gc.set_threshold(*self.thresholds)
+        gc.unfreeze()
+
+    def measure(self, phase: str, info: dict):
+        if phase == "start":
+            self.collection_start = time.perf_counter_ns()
+            return
+
+        generation = info["generation"]
+        stats = self.pauses.get(generation)
+        if stats is None:
+            stats = self.pauses[generation] = PhaseStats()
+        stats.record(time.perf_counter_ns() - self.collection_start)
+
+    def on_tick(self, game_data: GameData, scheduler: TickScheduler):
+        """Called every tick before the scheduler runs, collects now or in the tick's spare time."""
+        if _active is not self:
+            return
+
+        if game_data.match_ended or not game_data.round_active:
+            if not self.idle_collected:
+                gc.collect()
+                self.idle_collected = True
+        else:
+            self.idle_collected = False
+
+            # half way to an automatic collection
+            if gc.get_count()[0] > self.thresholds[0] // 2:
+                scheduler.submit(
+                    "garbage collection", self.collect_young, PRIORITY_GARBAGE_COLLECTION, carry_over=False
+                )
+
+        self.log()
+
+    def collect_young(self):
+        gc.collect(1 if gc.get_count()[1] > self.thresholds[1] // 2 else 0)
+
+    def log(self):
+        now = time.perf_counter()
+        if self.logger is not None and self.pauses and now - self.last_log > self.log_interval:
+            self.logger.info(f"Garbage collection pauses:\n{self.summary()}")
+            self.last_log = now
+
+    def summary(self) -> str:
+        lines = [f"{'generation':<16} {'count':>9} {'p50 us':>9} {'p99 us':>9} {'max us':>9}"]
+        for generation, stats in sorted(self.pauses.items()):
+            p50, p99, rolling_max = stats.rolling()
+            lines.append(f"{generation:<16} {stats.count:9d} {p50:9.1f} {p99:9.1f} {rolling_max:9.1f}")
+        return "\n".join(lines)
@@ -0,0 +1,100 @@
+import numpy as np
+
+from skeleton.util.scheduler import TICK_BUDGET
+
+# the degradation levels, each one also applies the ones below it
+DEGRADE_NONE = 0
+# the policy, actions and mechanics stop rendering
+DEGRADE_RENDERING = 1
+# intercepts are only searched in the first seconds of the ball prediction
+DEGRADE_INTERCEPT_HORIZON = 2
+# plans and searches that are still roughly valid are reused instead of being made again during the tick
+DEGRADE_REUSE_PLANS = 3
+MAX_DEGRADATION = DEGRADE_REUSE_PLANS
+
+DEGRADATION_NAMES = ["full quality", "no rendering", "short intercept horizon", "reused plans"]
+
+# seconds of ball prediction searched for intercepts at DEGRADE_INTERCEPT_HORIZON
+SHORT_INTERCEPT_HORIZON = 3.0
+
+
+class QualityGovernor:
+    """Trades quality for speed when the ticks get too slow, like on a loaded machine.
+    The median cost of the ticks without their optional scheduled work is taken over windows of ticks,
+    so that rare slow ticks don't count, unless there are too many. The first warmup_ticks aren't counted at all,
+    they're compiling jitted functions and filling caches.
+    A window that's too expensive, or that has too many ticks over the budget, steps the degradation up a level.
+    It steps back down after recover_windows cheap windows in a row, the gap between the degrade and recover
+    ratios and the consecutive windows keep it from oscillating between two levels."""
+
+    def __init__(
+        self,
+        logger=None,
+        budget: float = TICK_BUDGET,
+        window: int = 60,
+        degrade_ratio: float = 0.6,
+        recover_ratio: float = 0.3,
+        max_slow_ticks: int = 3,
+        recover_windows: int = 3,
+        warmup_ticks: int = 240,
+        enabled: bool = True,
+    ):
+        self.logger = logger
+        self.budget = budget
+        self.window = window
+        self.degrade_ratio = degrade_ratio
+        self.recover_ratio = recover_ratio
+        self.max_slow_ticks = max_slow_ticks
+        self.recover_windows = recover_windows
+        self.warmup_ticks = warmup_ticks
+        self.enabled = enabled
+
+        self.level = DEGRADE_NONE
+
+        self.costs = []
+        self.slow_ticks = 0
+        self.cheap_windows = 0
+
+    def degraded(self, level: int) -> bool:
+        """Whether the degradation of that level applies."""
+        return self.level >= level
+
+    def record(self, cost: float, duration: float):
+        """Records a tick's cost without it's optional work and it's whole duration, in seconds."""
+        if not self.enabled:
+            return
+        if self.warmup_ticks > 0:
+            self.warmup_ticks -= 1
+            return
+
+        self.costs.append(cost)
+        if duration > self.budget:
+            self.slow_ticks += 1
+
+        if len(self.costs) < self.window:
+            return
+
+        median_cost = float(np.median(self.costs))
+        if median_cost > self.budget * self.degrade_ratio or self.slow_ticks > self.max_slow_ticks:
+            self.cheap_windows = 0
+            if self.level < MAX_DEGRADATION:
+                self.set_level(self.level + 1, median_cost)
+        elif median_cost < self.budget * self.recover_ratio and self.slow_ticks == 0:
+            self.cheap_windows += 1
+            if self.cheap_windows >= self.recover_windows and self.level > DEGRADE_NONE:
+                self.cheap_windows = 0
+                self.set_level(self.level - 1, median_cost)
+        else:
+            self.cheap_windows = 0
+
+        self.costs.clear()
+        self.slow_ticks = 0
+
+    def set_level(self, level: int, median_cost: float):
+        if self.logger is not None:
+            log = self.logger.warning if level > self.level else self.logger.info
+            log(
+                f"Ticks took {median_cost * 1e6:.0f}us, "
+                f"going from {DEGRADATION_NAMES[self.level]} to {DEGRADATION_NAMES[level]}"
+            )
+        self.level = level
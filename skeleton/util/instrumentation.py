@@ -0,0 +1,190 @@
+import functools
+import json
+import time
+from collections import deque
+from typing import Dict, List
+
+import numpy as np
+
+# the usual phases of a tick, the policy phase contains the action phase which contains the mechanic phase
+PHASE_TICK = "tick"
+PHASE_PARSE = "parse"
+PHASE_BALL_PREDICTION = "ball prediction"
+PHASE_POLICY = "policy"
+PHASE_ACTION = "action"
+PHASE_MECHANIC = "mechanic"
+PHASE_SCHEDULER = "scheduler"
+PHASE_PLANNING = "planning"
+PHASE_SEARCH = "search"
+PHASE_RENDERING = "rendering"
+PHASE_TELEMETRY = "telemetry"
+PHASE_GARBAGE_COLLECTION = "garbage collection"
+# the agent's own work at the end of the tick, apart from the scheduled rendering and telemetry
+PHASE_RENDER_FLUSH = "render flush"
+PHASE_TELEMETRY_WRITE = "telemetry write"
+
+# upper edges of the histogram buckets in microseconds, the last bucket holds everything slower
+BUCKET_EDGES = (10, 20, 50, 100, 200, 500, 1000, 2000, 4000, 8333, 16667, 50000)
+
+
+class PhaseStats:
+    """Fixed bucket histogram of a phase's durations since the start, and a rolling window of the latest ones."""
+
+    def __init__(self, window: int = 1200):
+        self.counts = [0] * (len(BUCKET_EDGES) + 1)
+        self.recent = deque(maxlen=window)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, duration_ns: int):
+        microseconds = duration_ns / 1000
+        bucket = 0
+        while bucket < len(BUCKET_EDGES) and microseconds > BUCKET_EDGES[bucket]:
+            bucket += 1
+        self.counts[bucket] += 1
+        self.recent.append(duration_ns)
+        self.count += 1
+        self.total_ns += duration_ns
+        self.max_ns = max(self.max_ns, duration_ns)
+
+    def rolling(self) -> (float, float, float):
+        """p50, p99 and max of the rolling window, in microseconds."""
+        if not self.recent:
+            return 0.0, 0.0, 0.0
+        recent = np.fromiter(self.recent, dtype=np.int64, count=len(self.recent)) / 1000
+        p50, p99 = np.percentile(recent, (50, 99))
+        return p50, p99, recent.max()
+
+    def to_dict(self) -> dict:
+        p50, p99, rolling_max = self.rolling()
+        return {
+            "count": self.count,
+            "mean_us": self.total_ns / max(self.count, 1) / 1000,
+            "max_us": self.max_ns / 1000,
+            "rolling_p50_us": p50,
+            "rolling_p99_us": p99,
+            "rolling_max_us": rolling_max,
+            "bucket_edges_us": list(BUCKET_EDGES),
+            "bucket_counts": list(self.counts),
+        }
+
+
+class TickInstrumentation:
+    """Times the phases of each tick with perf_counter_ns. A phase that is entered again while it's running,
+    like a mechanic stepping it's sub-mechanics, is only timed by the outermost call.
+    The summary is logged at most once every log_interval seconds, as a warning if some ticks were too slow."""
+
+    def __init__(
+        self, logger=None, enabled: bool = True, log_interval: float = 10.0, window: int = 1200, dump_path: str = None
+    ):
+        self.logger = logger
+        self.enabled = enabled
+        # where dump() writes by default, the agent dumps there when it retires
+        self.dump_path = dump_path
+        self.log_interval = log_interval
+        self.window = window
+
+        self.phases: Dict[str, PhaseStats] = {}
+        self.depths: Dict[str, int] = {}
+        self.starts: Dict[str, int] = {}
+
+        self.slow_ticks = 0
+        self.slow_ticks_since_log = 0
+        self.last_log = time.perf_counter()
+
+        # totals of what's counted during the ticks, like the slices culled by the broad phase
+        self.counters: Dict[str, int] = {}
+
+        # an AllocationTracker measuring the memory allocated by the same phases, when allocations are tracked
+        self.allocations = None
+
+    def begin_tick(self):
+        if self.enabled and self.allocations is not None:
+            self.allocations.begin(PHASE_TICK)
+
+    def begin(self, phase: str):
+        if not self.enabled:
+            return
+        depth = self.depths.get(phase, 0)
+        if depth == 0:
+            if self.allocations is not None:
+                self.allocations.begin(phase)
+            self.starts[phase] = time.perf_counter_ns()
+        self.depths[phase] = depth + 1
+
+    def end(self, phase: str):
+        depth = self.depths.get(phase, 0) - 1
+        if not self.enabled or depth < 0:
+            return
+        self.depths[phase] = depth
+        if depth == 0:
+            self.record(phase, time.perf_counter_ns() - self.starts[phase])
+            if self.allocations is not None:
+                self.allocations.end(phase)
+
+    def record(self, phase: str, duration_ns: int):
+        stats = self.phases.get(phase)
+        if stats is None:
+            stats = self.phases[phase] = PhaseStats(self.window)
+        stats.record(duration_ns)
+
+    def count(self, counter: str, amount: int = 1):
+        if self.enabled:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def end_tick(self, duration_ns: int, slow: bool):
+        """Records the whole tick's duration, and logs the summary when it's time to."""
+        if not self.enabled:
+            return
+        self.record(PHASE_TICK, duration_ns)
+        if self.allocations is not None:
+            self.allocations.end(PHASE_TICK)
+        if slow:
+            self.slow_ticks += 1
+            self.slow_ticks_since_log += 1
+
+        now = time.perf_counter()
+        if self.logger is not None and now - self.last_log > self.log_interval:
+            log = self.logger.warning if self.slow_ticks_since_log > 0 else self.logger.info
+            log(f"{self.slow_ticks_since_log} slow ticks in the last {now - self.last_log:.0f}s\n{self.summary()}")
+            self.last_log = now
+            self.slow_ticks_since_log = 0
+
+    def summary(self) -> str:
+        lines: List[str] = [f"{'phase':<16} {'p50 us':>9} {'p99 us':>9} {'max us':>9}"]
+        for phase, stats in self.phases.items():
+            p50, p99, rolling_max = stats.rolling()
+            lines.append(f"{phase:<16} {p50:9.1f} {p99:9.1f} {rolling_max:9.1f}")
+        for counter, total in self.counters.items():
+            lines.append(f"{counter:<16} {total:9d}")
+        return "\n".join(lines)
+
+    def dump(self, path: str = None):
+        """Writes the histograms and the rolling statistics of every phase, and the counters, to a json file."""
+        path = path or self.dump_path
+        data = {
+            "slow_ticks": self.slow_ticks,
+            "phases": {phase: stats.to_dict() for phase, stats in self.phases.items()},
+            "counters": self.counters,
+        }
+        with open(path, "w") as file:
+            json.dump(data, file, indent=2)
+
+
+def instrumented(phase: str, method):
+    """Wraps a method of a policy, action or mechanic to time it as the phase, in it's agent's instrumentation."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        instrumentation = getattr(self.agent, "instrumentation", None)
+        if instrumentation is None or not instrumentation.enabled:
+            return method(self, *args, **kwargs)
+
+        instrumentation.begin(phase)
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            instrumentation.end(phase)
+
+    return wrapper
@@ -0,0 +1,91 @@
+import threading
+import traceback
+from typing import Any, Callable, Optional
+
+
+class PlanResult:
+    def __init__(self, version: int, time: float, value: Any):
+        self.version = version
+        # game time of the snapshot the plan was made from
+        self.time = time
+        self.value = value
+
+
+class AsyncPlanner:
+    """Runs an expensive planning function on a background thread, so that it doesn't add to the tick's latency.
+    Each tick submits a snapshot of what the plan depends on, only the latest pending snapshot is planned.
+    The results are versioned, and are handed back only while their snapshot is fresh enough.
+    The snapshots must not be modified after they're submitted, copy arrays that are updated in place.
+    When not asynchronous the snapshots are planned right away, for reproducible tests."""
+
+    def __init__(self, plan: Callable[[Any], Any], name: str = "planner", max_age: float = 0.1, asynchronous=True):
+        self.plan = plan
+        self.name = name
+        self.max_age = max_age
+        self.asynchronous = asynchronous
+
+        self.version = 0
+        self.result: Optional[PlanResult] = None
+        self.pending: Optional[tuple] = None
+
+        self.condition = threading.Condition()
+        self.thread: Optional[threading.Thread] = None
+        self.closed = False
+
+        # statistics
+        self.planned = 0
+        self.skipped = 0
+
+    def submit(self, snapshot: Any, time: float):
+        """Queues the snapshot taken at game time, replacing the pending one that wasn't planned yet."""
+        self.version += 1
+
+        if not self.asynchronous:
+            self.result = PlanResult(self.version, time, self.plan(snapshot))
+            self.planned += 1
+            return
+
+        with self.condition:
+            if self.pending is not None:
+                self.skipped += 1
+            self.pending = (self.version, time, snapshot)
+            self.condition.notify()
+
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.work, name=self.name, daemon=True)
+            self.thread.start()
+
+    def latest(self, time: float, max_age: float = None) -> Optional[PlanResult]:
+        """The newest result, if it's snapshot isn't older than max_age seconds of game time."""
+        result = self.result
+        max_age = self.max_age if max_age is None else max_age
+        if result is None or time - result.time > max_age:
+            return None
+        return result
+
+    def work(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closed:
+                    self.condition.wait()
+                if self.closed:
+                    return
+                version, time, snapshot = self.pending
+                self.pending = None
+
+            try:
+                value = self.plan(snapshot)
+            except Exception:
+                traceback.print_exc()
+                continue
+
+            # the assignment is atomic, the tick thread sees either the previous result or this one
+            self.result = PlanResult(version, time, value)
+            self.planned += 1
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join(1.0)
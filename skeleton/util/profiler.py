@@ -0,0 +1,118 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+# set to a path to profile every agent of the process, it overrides the profile_path of the bot's config,
+# {index} is replaced by the index of the agent
+PROFILE_ENVIRONMENT_VARIABLE = "DISASTERBOT_PROFILE"
+
+# seconds of ticks between two samples, cheap enough to be left on during a whole match
+DEFAULT_INTERVAL = 0.002
+
+
+def frame_label(code) -> str:
+    return f"{os.path.splitext(os.path.basename(code.co_filename))[0]}.{code.co_name}:{code.co_firstlineno}"
+
+
+class SamplingProfiler:
+    """Samples the stack of the tick thread at regular intervals of the time spent in the ticks.
+    The time between the ticks doesn't count, so ticks shorter than the interval are still sampled,
+    a sample being taken in the tick during which another interval has passed.
+    The tick thread is made to hand over the GIL more often, so that the sampler gets it in time during the ticks.
+    A sample that still came late counts once for every interval it covers.
+    The samples are counted by stack and written as collapsed stacks, the input format of flame graph tools.
+    The sampling runs on a background thread with sys._current_frames, which works on every platform,
+    unlike the SIGPROF timer, and leaves jitted code running at full speed: it's seen as the python frame calling it."""
+
+    def __init__(self, path: str, interval: float = DEFAULT_INTERVAL):
+        self.path = path
+        self.interval = interval
+
+        self.stacks = Counter()
+        self.samples = 0
+        self.ticks = 0
+
+        # seconds spent in the finished ticks, and the start of the current one
+        self.tick_time = 0.0
+        self.tick_start = 0.0
+        self.next_sample = interval
+
+        self.target_id: Optional[int] = None
+        self.in_tick = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.closed = False
+        self.switch_interval = sys.getswitchinterval()
+
+    def begin_tick(self):
+        self.target_id = threading.get_ident()
+        self.ticks += 1
+        self.tick_start = time.perf_counter()
+        self.in_tick.set()
+        if self.thread is None:
+            # the GIL is only handed over to a waiting thread every switch interval, 5ms by default
+            self.switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(min(self.switch_interval, self.interval / 20))
+            self.thread = threading.Thread(target=self.sample, name="profiler", daemon=True)
+            self.thread.start()
+
+    def end_tick(self):
+        self.in_tick.clear()
+        self.tick_time += time.perf_counter() - self.tick_start
+
+    def clock(self) -> float:
+        """Seconds spent in the ticks so far."""
+        if self.in_tick.is_set():
+            return self.tick_time + time.perf_counter() - self.tick_start
+        return self.tick_time
+
+    def sample(self):
+        own_frame = sys._getframe()
+        while not self.closed:
+            # sleeps between the ticks
+            self.in_tick.wait()
+            if self.closed:
+                return
+            time.sleep(max(self.next_sample - self.clock(), 0.0))
+            if self.closed:
+                return
+            # the tick ended before the interval passed, the rest of it is spent in the next ticks
+            clock = self.clock()
+            if not self.in_tick.is_set() or clock < self.next_sample:
+                continue
+
+            weight = int((clock - self.next_sample) / self.interval) + 1
+            self.next_sample += weight * self.interval
+
+            frame = sys._current_frames().get(self.target_id)
+            stack = []
+            while frame is not None and frame is not own_frame:
+                stack.append(frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += weight
+                self.samples += weight
+
+    def write(self, path: str = None):
+        """Writes one 'frame;frame;frame count' line per distinct stack."""
+        path = path or self.path
+        with open(path, "w") as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f"{stack} {count}\n")
+
+    def close(self):
+        self.closed = True
+        self.in_tick.set()
+        if self.thread is not None:
+            self.thread.join(1.0)
+            sys.setswitchinterval(self.switch_interval)
+
+
+def get_profiler(default_path: str = None, interval: float = DEFAULT_INTERVAL) -> Optional[SamplingProfiler]:
+    """The profiler writing to the path of the environment variable, or to default_path, or None to not profile."""
+    path = os.environ.get(PROFILE_ENVIRONMENT_VARIABLE) or default_path
+    if not path:
+        return None
+    return SamplingProfiler(path, interval)
@@ -0,0 +1,143 @@
+import math
+from typing import List
+
+import numpy as np
+
+# colors as (alpha, red, green, blue), the arguments of the renderer's create_color
+BLACK = (255, 0, 0, 0)
+WHITE = (255, 255, 255, 255)
+GREY = (255, 128, 128, 128)
+RED = (255, 255, 0, 0)
+GREEN = (255, 0, 128, 0)
+BLUE = (255, 0, 0, 255)
+YELLOW = (255, 255, 255, 0)
+
+# how many times per second the debug rendering is sent to the game, 0 to send it every tick
+DEFAULT_RENDER_RATE = 30.0
+
+
+class RenderBuffer:
+    """Collects the debug rendering of the policy, actions and mechanics during a tick, and sends it to the game
+    as one render group at the end of the tick. The lines are kept as arrays, so that batches of them,
+    like the edges of a hitbox, are added and compared with a few numpy operations.
+    The rendering is only collected on the ticks it's due, rate times per second. It's not sent again
+    if it didn't change since the last time, as the game keeps showing a group until it's replaced,
+    and the group is cleared after clear_after seconds without any rendering."""
+
+    def __init__(self, rate: float = DEFAULT_RENDER_RATE, group_id: str = "debug", clear_after: float = 1.0):
+        self.rate = rate
+        self.group_id = group_id
+        self.clear_after = clear_after
+
+        # whether this tick's rendering is collected, the renderings check it through their rendering_enabled
+        self.active = True
+
+        self.line_starts: List[np.ndarray] = []
+        self.line_ends: List[np.ndarray] = []
+        self.line_colors: List[tuple] = []
+        self.strings: List[tuple] = []
+        self.rects: List[tuple] = []
+
+        self.last_flush = -math.inf
+        self.last_content = -math.inf
+        self.signature = None
+
+        # statistics
+        self.sent = 0
+        self.unchanged = 0
+
+    def begin_tick(self, now: float):
+        """Called at the start of every tick with time.perf_counter()."""
+        self.active = self.rate <= 0 or now - self.last_flush >= 1 / self.rate
+
+    def create_color(self, alpha: int, red: int, green: int, blue: int) -> tuple:
+        return alpha, red, green, blue
+
+    def black(self):
+        return BLACK
+
+    def white(self):
+        return WHITE
+
+    def grey(self):
+        return GREY
+
+    def red(self):
+        return RED
+
+    def green(self):
+        return GREEN
+
+    def blue(self):
+        return BLUE
+
+    def yellow(self):
+        return YELLOW
+
+    def draw_lines_3d(self, starts: np.ndarray, ends: np.ndarray, color: tuple):
+        """Adds a batch of lines, starts and ends are (n, 3) arrays."""
+        self.line_starts.append(starts)
+        self.line_ends.append(ends)
+        self.line_colors.append((color, len(starts)))
+
+    def draw_line_3d(self, start, end, color: tuple):
+        self.draw_lines_3d(np.reshape(start, (1, 3)), np.reshape(end, (1, 3)), color)
+
+    def draw_string_3d(self, location, scale_x: float, scale_y: float, text: str, color: tuple):
+        self.strings.append((tuple(np.rint(location)), scale_x, scale_y, text, color))
+
+    def draw_rect_3d(self, location, width: float, height: float, filled: bool, color: tuple, centered=False):
+        self.rects.append((tuple(np.rint(location)), width, height, filled, color, centered))
+
+    def clear(self):
+        self.line_starts.clear()
+        self.line_ends.clear()
+        self.line_colors.clear()
+        self.strings.clear()
+        self.rects.clear()
+
+    def flush(self, renderer, now: float):
+        """Sends the tick's rendering to the game if it's due and it changed, and empties the buffer."""
+        if not self.active:
+            self.clear()
+            return
+
+        if not self.line_starts and not self.strings and not self.rects:
+            if self.signature is not None and now - self.last_content > self.clear_after:
+                renderer.clear_screen(self.group_id)
+                self.signature = None
+            return
+
+        self.last_flush = now
+        self.last_content = now
+
+        # rounded to the unit, smaller changes can't be seen
+        starts = np.rint(np.concatenate(self.line_starts)) if self.line_starts else np.empty((0, 3))
+        ends = np.rint(np.concatenate(self.line_ends)) if self.line_ends else np.empty((0, 3))
+        signature = (starts.tobytes(), ends.tobytes(), tuple(self.line_colors), tuple(self.strings), tuple(self.rects))
+        if signature == self.signature:
+            self.unchanged += 1
+            self.clear()
+            return
+        self.signature = signature
+
+        colors = {}
+
+        def get_color(color: tuple):
+            if color not in colors:
+                colors[color] = renderer.create_color(*color)
+            return colors[color]
+
+        line_colors = [color for color, count in self.line_colors for _ in range(count)]
+
+        renderer.begin_rendering(self.group_id)
+        for start, end, color in zip(starts.tolist(), ends.tolist(), line_colors):
+            renderer.draw_line_3d(start, end, get_color(color))
+        for location, width, height, filled, color, centered in self.rects:
+            renderer.draw_rect_3d(location, width, height, filled, get_color(color), centered)
+        for location, scale_x, scale_y, text, color in self.strings:
+            renderer.draw_string_3d(location, scale_x, scale_y, text, get_color(color))
+        renderer.end_rendering()
+
+        self.sent += 1
+        self.clear()
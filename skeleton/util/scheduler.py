@@ -0,0 +1,115 @@
+import time
+from typing import Callable, Dict
+
+from skeleton.util.instrumentation import (
+    PHASE_PLANNING,
+    PHASE_SEARCH,
+    PHASE_RENDERING,
+    PHASE_TELEMETRY,
+    PHASE_GARBAGE_COLLECTION,
+)
+
+TICK_BUDGET = 1 / 120
+
+# priorities of the usual kinds of optional work, higher runs first
+PRIORITY_PLANNING = 3
+PRIORITY_SEARCH = 2
+PRIORITY_RENDERING = 1
+PRIORITY_TELEMETRY = 0
+PRIORITY_GARBAGE_COLLECTION = -1
+
+# the instrumentation phase the work of each priority is timed as
+PRIORITY_PHASES = {
+    PRIORITY_PLANNING: PHASE_PLANNING,
+    PRIORITY_SEARCH: PHASE_SEARCH,
+    PRIORITY_RENDERING: PHASE_RENDERING,
+    PRIORITY_TELEMETRY: PHASE_TELEMETRY,
+    PRIORITY_GARBAGE_COLLECTION: PHASE_GARBAGE_COLLECTION,
+}
+
+
+class WorkItem:
+    def __init__(self, name: str, function: Callable[[], None], priority: int, cost: float, carry_over: bool):
+        self.name = name
+        self.function = function
+        self.priority = priority
+        self.cost = cost
+        self.carry_over = carry_over
+        self.deferred_ticks = 0
+
+
+class TickScheduler:
+    """Runs optional work submitted by the policy, actions and mechanics at the end of a tick,
+    highest priority first, but only while its estimated cost fits in what's left of the tick budget.
+    Work that doesn't fit is carried over to the next ticks, or dropped if it's only useful this tick.
+    Deferred work gains priority every tick, and is forced to run after max_deferred_ticks."""
+
+    def __init__(self, budget: float = TICK_BUDGET * 0.8, max_deferred_ticks: int = 30, smoothing: float = 0.2):
+        self.budget = budget
+        self.max_deferred_ticks = max_deferred_ticks
+        self.smoothing = smoothing
+
+        self.tick_start = time.perf_counter()
+        self.pending: Dict[str, WorkItem] = {}
+        self.estimated_costs: Dict[str, float] = {}
+
+        # set by the agent, to time the work by phase
+        self.instrumentation = None
+
+        # statistics
+        self.executed = 0
+        self.deferred = 0
+        self.dropped = 0
+
+    def begin_tick(self, tick_start: float = None):
+        """Called at the start of every tick, with the same time.perf_counter() the tick is measured from."""
+        self.tick_start = time.perf_counter() if tick_start is None else tick_start
+
+    def remaining(self) -> float:
+        """Time left in the current tick's budget, in seconds."""
+        return self.budget - (time.perf_counter() - self.tick_start)
+
+    def estimated_cost(self, name: str, default: float = 0.0) -> float:
+        return self.estimated_costs.get(name, default)
+
+    def can_afford(self, cost: float) -> bool:
+        return cost <= self.remaining()
+
+    def submit(self, name: str, function: Callable[[], None], priority: int = 0, cost: float = 0.0, carry_over=True):
+        """Registers work to run at the end of this tick. Submitting under a pending name replaces the work,
+        but keeps it's age. cost is the initial estimate in seconds, it's then measured at every run."""
+        item = WorkItem(name, function, priority, cost, carry_over)
+        if name in self.pending:
+            item.deferred_ticks = self.pending[name].deferred_ticks
+        self.pending[name] = item
+
+    def run(self):
+        """Runs the pending work that fits in the tick budget, defers or drops the rest."""
+        items = sorted(self.pending.values(), key=lambda work: work.priority + work.deferred_ticks, reverse=True)
+
+        for item in items:
+            cost = self.estimated_costs.get(item.name, item.cost)
+
+            if not self.can_afford(cost) and item.deferred_ticks < self.max_deferred_ticks:
+                if item.carry_over:
+                    item.deferred_ticks += 1
+                    self.deferred += 1
+                else:
+                    del self.pending[item.name]
+                    self.dropped += 1
+                continue
+
+            del self.pending[item.name]
+
+            start = time.perf_counter()
+            item.function()
+            measured = time.perf_counter() - start
+            if self.instrumentation is not None and self.instrumentation.enabled:
+                self.instrumentation.record(PRIORITY_PHASES.get(item.priority, item.name), int(measured * 1e9))
+
+            previous = self.estimated_costs.get(item.name)
+            if previous is None:
+                self.estimated_costs[item.name] = measured
+            else:
+                self.estimated_costs[item.name] = previous + (measured - previous) * self.smoothing
+            self.executed += 1
@@ -58,6 +58,9 @@ class GameData:
         # cars
         self.my_car = Player()
 
+        # all cars as a structured numpy array
+        self.game_cars: np.ndarray = np.empty(())
+
         # other cars as structured numpy arrays
         self.opponents: np.ndarray = np.empty(())
         self.teammates: np.ndarray = np.empty(())
@@ -105,11 +108,35 @@ class GameData:
         self.my_car.read_game_car(game_cars[self.index])
 
         buf = buf_from_mem(ctypes.addressof(game_cars), dtype_PlayerInfo.itemsize * num_cars, BUF_READ)
-        converted_game_cars = np.frombuffer(buf, dtype_PlayerInfo).copy()
+        self.game_cars = np.frombuffer(buf, dtype_PlayerInfo).copy()
+
+        teammates_mask = self.game_cars["team"] == self.my_car.team
+        self.opponents = self.game_cars[~teammates_mask]
+        self.teammates = self.game_cars[teammates_mask]
+
+    def read_hive_game_data(self, hive_game_data: "GameData"):
+        """Reads the tick from the game data the hivemind has already parsed, only our car is converted again.
+        The ball, the boost pads and the ball prediction are shared between the drones, don't modify them."""
+
+        self.game_tick_packet = hive_game_data.game_tick_packet
+        self.my_car.read_game_car(self.game_tick_packet.game_cars[self.index])
+
+        self.game_cars = hive_game_data.game_cars
+        teammates_mask = self.game_cars["team"] == self.my_car.team
+        self.opponents = self.game_cars[~teammates_mask]
+        self.teammates = self.game_cars[teammates_mask]
+
+        self.ball = hive_game_data.ball
+        self.boost_pads = hive_game_data.boost_pads
+        self.ball_prediction = hive_game_data.ball_prediction
 
-        teammates_mask = converted_game_cars["team"] == self.my_car.team
-        self.opponents = converted_game_cars[~teammates_mask]
-        self.teammates = converted_game_cars[teammates_mask]
+        self.time = hive_game_data.time
+        self.time_remaining = hive_game_data.time_remaining
+        self.overtime = hive_game_data.overtime
+        self.round_active = hive_game_data.round_active
+        self.kickoff_pause = hive_game_data.kickoff_pause
+        self.match_ended = hive_game_data.match_ended
+        self.gravity = hive_game_data.gravity
 
     def read_game_boosts(self, game_boosts: BoostPadState * MAX_BOOSTS, num_boosts: int):
         """Reads a list of BoostPadState ctype objects from the game tick packet,
@@ -228,6 +255,11 @@ class Player(PhysicsObject):
         self.hitbox_corner = np.array([59, 42, 18])
         self.hitbox_offset = np.array([13.87566, 0, 20.755])
 
+        # local frame info, updated once per tick
+        self.local_velocity = np.zeros(3)
+        self.local_angular_velocity = np.zeros(3)
+        self.local_coords_cache = {}
+
         # extra info
 
         # the moment in time the action happened
@@ -268,6 +300,24 @@ class Player(PhysicsObject):
         self.hitbox_corner = box_shape_to_numpy(game_car.hitbox) / 2
         self.hitbox_offset = vector3_to_numpy(game_car.hitbox_offset)
 
+        self.update_local_frame()
+
+    def update_local_frame(self):
+        """Recomputes the local frame info, needs to be called if the physics are changed by hand."""
+
+        self.local_velocity = self.velocity.dot(self.rotation_matrix)
+        self.local_angular_velocity = self.angular_velocity.dot(self.rotation_matrix)
+        self.local_coords_cache.clear()
+
+    def local_coords(self, point: np.ndarray) -> np.ndarray:
+        """The point in the car's local coordinates, memoized until the next tick. Don't modify the result."""
+
+        key = (point[0], point[1], point[2])
+        local = self.local_coords_cache.get(key)
+        if local is None:
+            local = self.local_coords_cache[key] = (point - self.location).dot(self.rotation_matrix)
+        return local
+
     def update_extra_game_data(self, time: float):
 
         self.time = time
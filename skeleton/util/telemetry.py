@@ -0,0 +1,211 @@
+import glob
+import itertools
+import json
+import os
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# one record per tick, each field is stored in it's own column file
+dtype_Telemetry = np.dtype(
+    [
+        ("time", "<f8"),
+        ("car_location", "<f4", 3),
+        ("car_velocity", "<f4", 3),
+        ("car_rotation", "<f4", 3),
+        ("car_boost", "<f4"),
+        # index in the action names of the telemetry, -1 if none was chosen
+        ("action", "<i2"),
+        # throttle, steer, pitch, yaw, roll, jump, boost, handbrake
+        ("controls", "<f4", 8),
+        ("target", "<f4", 3),
+        # seconds until the intercept the car is going for
+        ("intercept_time", "<f4"),
+        ("tick_cost_us", "<f4"),
+    ]
+)
+
+# 6 minutes of ticks at 120 fps per segment, a new segment is started when it's full
+DEFAULT_SEGMENT_ROWS = 120 * 60 * 6
+
+
+def controls_to_row(controls) -> tuple:
+    return (
+        controls.throttle,
+        controls.steer,
+        controls.pitch,
+        controls.yaw,
+        controls.roll,
+        controls.jump,
+        controls.boost,
+        controls.handbrake,
+    )
+
+
+def fill_value(dtype: np.dtype):
+    return np.nan if dtype.base.kind == "f" else -1
+
+
+def make_run_directory(directory: str) -> str:
+    """Creates a new run directory in the telemetry directory, named by the time it started and the process."""
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+    for attempt in itertools.count():
+        run_directory = os.path.join(directory, f"{name}-{attempt:03d}")
+        try:
+            os.makedirs(run_directory)
+            return run_directory
+        except FileExistsError:
+            continue
+
+
+def telemetry_runs(directory: str) -> List[str]:
+    """The run directories of a telemetry directory, from the oldest to the newest."""
+    return sorted(path for path in glob.glob(os.path.join(directory, "*-*-*-*")) if os.path.isdir(path))
+
+
+class TelemetryWriter:
+    """Appends one record per tick to preallocated memory mapped .npy files, one file per field of dtype_Telemetry.
+    The fields of the current row are set during the tick by whoever knows them, the fields that aren't set stay
+    nan, or -1 for integers. Nothing is formatted during the ticks, the files should be flushed when flush_due,
+    the agent schedules it as optional work of it's ticks.
+    Each writer writes to it's own run directory in the telemetry directory, so that the matches don't overwrite
+    each other. The records are split into segment directories of segment_rows rows, with a meta.json saying
+    how many rows of the segment are written and the names of the actions."""
+
+    def __init__(self, directory: str, segment_rows: int = DEFAULT_SEGMENT_ROWS, flush_interval: int = 600):
+        self.directory = directory
+        self.segment_rows = segment_rows
+        self.flush_interval = flush_interval
+
+        self.actions: Dict[str, int] = {}
+        self.segment = -1
+        self.columns: Dict[str, np.ndarray] = {}
+        self.row = 0
+        self.rows_since_flush = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self.run_directory = make_run_directory(directory)
+        self.open_segment()
+
+    def segment_directory(self, segment: int) -> str:
+        return os.path.join(self.run_directory, f"{segment:04d}")
+
+    def open_segment(self):
+        self.segment += 1
+        directory = self.segment_directory(self.segment)
+        os.makedirs(directory, exist_ok=True)
+
+        self.columns = {}
+        for name in dtype_Telemetry.names:
+            dtype = dtype_Telemetry[name]
+            column = np.lib.format.open_memmap(
+                os.path.join(directory, f"{name}.npy"), "w+", dtype.base, (self.segment_rows,) + dtype.shape
+            )
+            column[:] = fill_value(dtype)
+            self.columns[name] = column
+        self.row = 0
+        self.write_meta()
+
+    def set(self, name: str, value):
+        """Sets a field of the current row."""
+        self.columns[name][self.row] = value
+
+    def set_action(self, action):
+        index = self.actions.get(action.__class__.__name__)
+        if index is None:
+            index = self.actions[action.__class__.__name__] = len(self.actions)
+        self.columns["action"][self.row] = index
+
+    def end_row(self):
+        """Moves on to the next row, at the end of the tick. Full segments are flushed right away."""
+        self.row += 1
+        self.rows_since_flush += 1
+        if self.row == self.segment_rows:
+            self.flush()
+            self.open_segment()
+
+    @property
+    def flush_due(self) -> bool:
+        """Whether flush_interval rows were written since the last flush."""
+        return self.rows_since_flush >= self.flush_interval
+
+    def write_meta(self):
+        meta = {"rows": self.row, "actions": list(self.actions)}
+        with open(os.path.join(self.segment_directory(self.segment), "meta.json"), "w") as file:
+            json.dump(meta, file)
+
+    def flush(self):
+        for column in self.columns.values():
+            column.flush()
+        self.write_meta()
+        self.rows_since_flush = 0
+
+    def close(self):
+        self.flush()
+        self.columns = {}
+
+
+def load_telemetry(directory: str) -> Tuple[Dict[str, np.ndarray], List[str]]:
+    """The written rows of every column of a run directory, and the names of the actions.
+    Given a telemetry directory, it's latest run is loaded.
+    With a single segment the columns are read only memory mapped views of the files,
+    with more they're concatenated into memory."""
+
+    if not os.path.exists(os.path.join(directory, "0000")):
+        runs = telemetry_runs(directory)
+        if not runs:
+            raise FileNotFoundError(f"No telemetry runs in {directory}")
+        directory = runs[-1]
+
+    segments = []
+    actions: List[str] = []
+    for segment_directory in sorted(glob.glob(os.path.join(directory, "[0-9][0-9][0-9][0-9]"))):
+        with open(os.path.join(segment_directory, "meta.json")) as file:
+            meta = json.load(file)
+        # the names only grow, the last segment has them all
+        actions = meta["actions"]
+        segments.append(
+            {
+                name: np.load(os.path.join(segment_directory, f"{name}.npy"), mmap_mode="r")[: meta["rows"]]
+                for name in dtype_Telemetry.names
+            }
+        )
+
+    if len(segments) == 1:
+        return segments[0], actions
+    return {name: np.concatenate([segment[name] for segment in segments]) for name in dtype_Telemetry.names}, actions
+
+
+def main():
+    """Testing for errors and performance"""
+
+    import tempfile
+    from timeit import timeit
+    from rlbot.agents.base_agent import SimpleControllerState
+
+    directory = tempfile.mkdtemp()
+    writer = TelemetryWriter(directory, segment_rows=50000)
+    controls = SimpleControllerState(throttle=1.0, boost=True)
+    location = np.array([0.0, -3000.0, 17.0])
+
+    def test_function():
+        writer.set("time", 1.0)
+        writer.set("car_location", location)
+        writer.set("controls", controls_to_row(controls))
+        writer.set("tick_cost_us", 500.0)
+        writer.end_row()
+
+    n_times = 100000
+    time_taken = timeit(test_function, number=n_times)
+    print(f"Took {time_taken} seconds to write {n_times} rows.")
+    writer.close()
+
+    columns, _ = load_telemetry(directory)
+    assert len(columns["time"]) == n_times
+    assert np.isnan(columns["intercept_time"]).all()
+    print(f"Loaded {len(columns['time'])} rows from {directory}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,74 @@
 import numpy as np
 
+from util.shared_tables import register_table
+
+# standard soccar boost pads, full boosts are marked with True
+BOOST_PADS = [
+    (0.0, -4240.0, False),
+    (-1792.0, -4184.0, False),
+    (1792.0, -4184.0, False),
+    (-3072.0, -4096.0, True),
+    (3072.0, -4096.0, True),
+    (-940.0, -3308.0, False),
+    (940.0, -3308.0, False),
+    (0.0, -2816.0, False),
+    (-3584.0, -2484.0, False),
+    (3584.0, -2484.0, False),
+    (-1788.0, -2300.0, False),
+    (1788.0, -2300.0, False),
+    (-2048.0, -1036.0, False),
+    (0.0, -1024.0, False),
+    (2048.0, -1036.0, False),
+    (-3584.0, 0.0, True),
+    (-1024.0, 0.0, False),
+    (1024.0, 0.0, False),
+    (3584.0, 0.0, True),
+    (-2048.0, 1036.0, False),
+    (0.0, 1024.0, False),
+    (2048.0, 1036.0, False),
+    (-1788.0, 2300.0, False),
+    (1788.0, 2300.0, False),
+    (-3584.0, 2484.0, False),
+    (3584.0, 2484.0, False),
+    (0.0, 2816.0, False),
+    (-940.0, 3310.0, False),
+    (940.0, 3308.0, False),
+    (-3072.0, 4096.0, True),
+    (3072.0, 4096.0, True),
+    (-1792.0, 4184.0, False),
+    (1792.0, 4184.0, False),
+    (0.0, 4240.0, False),
+]
+
+# the name of the table in the shared tables
+PAD_TABLE = "pad_geometry"
+
+# the table's columns, the relative location from a pad to another one and the distance between them
+PAD_RELATIVE_LOCATION = slice(0, 3)
+PAD_DISTANCE = 3
+
+STANDARD_PAD_LOCATIONS = np.array([[x, y, 70.0] for x, y, _ in BOOST_PADS])
+
+
+def build_pad_geometry(locations: np.ndarray) -> np.ndarray:
+    """The (pads, pads, 4) matrix of the relative locations from each pad to each pad, and their distances."""
+    relative_locations = locations[None, :, :] - locations[:, None, :]
+    distances = np.linalg.norm(relative_locations, axis=2)
+    return np.concatenate([relative_locations, distances[:, :, None]], axis=2)
+
+
+register_table(PAD_TABLE, lambda: build_pad_geometry(STANDARD_PAD_LOCATIONS), inputs=(STANDARD_PAD_LOCATIONS,))
+
+
+def pad_geometry(boost_pads: np.ndarray, tables=None) -> np.ndarray:
+    """The pad geometry of the field, from the shared table if it's the standard layout, computed otherwise."""
+    table = None if tables is None else tables.get(PAD_TABLE)
+    if table is not None and len(table) == len(boost_pads):
+        # the pads' heights differ a bit between the game and the table
+        if np.allclose(boost_pads["location"][:, :2], STANDARD_PAD_LOCATIONS[:, :2]):
+            return table
+    return build_pad_geometry(boost_pads["location"].astype(np.float64))
+
 
 def closest_available_boost(my_loc: np.ndarray, boost_pads: np.ndarray) -> np.ndarray:
     """Returns the closest available boost pad to my_loc"""
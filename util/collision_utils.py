@@ -1,6 +1,11 @@
+import inspect
+import math
+
 import numpy as np
+from numba import jit
 
 from util.linear_algebra import normalize_batch
+from util.physics.drive_1d_simulation_utils import THROTTLE_ACCELERATION_0, BOOST_ACCELERATION, MAX_CAR_SPEED
 
 
 HITBOX = np.array([59, 42, 18])
@@ -18,7 +23,7 @@ def box_point_collision_location(point_loc, box_loc, box_rot_matrix, box_corner=
     """Point of hypothetical collision on the box."""
     point_local_loc = (point_loc - box_loc).dot(box_rot_matrix)
     collision_local_loc = box_local_collision_location(point_local_loc, box_corner, box_offset)
-    return box_loc + box_rot_matrix.dot(collision_local_loc)
+    return box_loc + collision_local_loc.dot(box_rot_matrix.T)
 
 
 def box_ball_location_on_collision(
@@ -30,7 +35,7 @@ def box_ball_location_on_collision(
     box_local_location_on_collision = (
         ball_local_loc + normalize_batch(hit_local_loc - ball_local_loc) * ball_radius - hit_local_loc
     )
-    return box_rot_matrix.dot(box_local_location_on_collision) + box_loc
+    return box_local_location_on_collision.dot(box_rot_matrix.T) + box_loc
 
 
 def box_ball_low_location_on_collision(
@@ -39,7 +44,7 @@ def box_ball_low_location_on_collision(
     """Closest in-plane box location for there to be a collision with the ball"""
     ball_local_loc = (ball_loc - box_loc).dot(box_rot_matrix)
     hit_local_loc = box_local_collision_location(ball_local_loc, box_corner, box_offset)
-    ball_2d_height_from_hit = np.clip(ball_local_loc[2] - hit_local_loc[2], -ball_radius, ball_radius)
+    ball_2d_height_from_hit = np.clip(ball_local_loc[..., 2:] - hit_local_loc[..., 2:], -ball_radius, ball_radius)
     ball_2d_x_dist_from_hit = np.sqrt(np.square(ball_radius) - np.square(ball_2d_height_from_hit))
     hit_to_ball_2d_direction = normalize_batch((ball_local_loc - hit_local_loc) * np.array([1, 1, 0]))
     ball_local_location_on_collision = (
@@ -48,7 +53,7 @@ def box_ball_low_location_on_collision(
         + hit_to_ball_2d_direction * ball_2d_x_dist_from_hit
     )
     box_local_location_on_collision = ball_local_loc - ball_local_location_on_collision
-    return box_rot_matrix.dot(box_local_location_on_collision) + box_loc
+    return box_local_location_on_collision.dot(box_rot_matrix.T) + box_loc
 
 
 def box_ball_collision_distance(
@@ -58,3 +63,119 @@ def box_ball_collision_distance(
     ball_local_loc = (ball_loc - box_loc).dot(box_rot_matrix)
     hit_local_loc = box_local_collision_location(ball_local_loc, box_corner, box_offset)
     return np.linalg.norm(hit_local_loc - ball_local_loc, axis=-1) - ball_radius
+
+
+def box_bounding_radius(box_corner=HITBOX, box_offset=HITBOX_OFFSET) -> float:
+    """Radius of the smallest sphere centered on the box's origin that contains the whole box"""
+    return float(np.linalg.norm(np.abs(box_offset) + box_corner))
+
+
+@jit(nopython=True, nogil=True, fastmath=True, cache=True)
+def drive_reach(delta_time, speed, boost):
+    """Cheap upper bound of the distance a car can drive in delta_time.
+    Uses the maximum acceleration of the 1d drive model and assumes the boost never runs out."""
+    delta_time = max(delta_time, 0.0)
+    max_acceleration = THROTTLE_ACCELERATION_0 + BOOST_ACCELERATION if boost > 0 else THROTTLE_ACCELERATION_0
+    return min(speed * delta_time + max_acceleration / 2 * delta_time**2, max(speed, MAX_CAR_SPEED) * delta_time)
+
+
+@jit(nopython=True, nogil=True, fastmath=True, cache=True)
+def broad_phase_margin(ball_loc, delta_time, box_loc, box_speed, box_boost, box_radius, ball_radius, max_height):
+    """Upper bound of how much further than needed the box can drive to touch the ball in delta_time,
+    comparing the bounding spheres to the drive reach. Negative where a collision is impossible."""
+    distance = math.sqrt(
+        (ball_loc[0] - box_loc[0]) ** 2 + (ball_loc[1] - box_loc[1]) ** 2 + (ball_loc[2] - box_loc[2]) ** 2
+    )
+    sphere_margin = drive_reach(delta_time, box_speed, box_boost) - (distance - box_radius - ball_radius)
+    return min(sphere_margin, max_height - ball_loc[2])
+
+
+@jit(nopython=True, nogil=True, fastmath=True, cache=True)
+def broad_phase_kernel(ball_locs, delta_times, box_locs, box_speeds, box_boosts, box_radius, ball_radius, max_height):
+    mask = np.empty((len(ball_locs), len(box_locs)), dtype=np.bool_)
+    for i in range(len(ball_locs)):
+        for j in range(len(box_locs)):
+            margin = broad_phase_margin(
+                ball_locs[i],
+                delta_times[i],
+                box_locs[j],
+                box_speeds[j],
+                box_boosts[j],
+                box_radius,
+                ball_radius,
+                max_height,
+            )
+            mask[i, j] = margin >= 0
+    return mask
+
+
+def box_ball_broad_phase(
+    ball_loc,
+    delta_time,
+    box_loc,
+    box_velocity,
+    box_boost=100.0,
+    box_corner=HITBOX,
+    box_offset=HITBOX_OFFSET,
+    ball_radius=92,
+    max_height=np.inf,
+):
+    """Conservative test of which boxes can collide with which ball locations in time, with bounding spheres
+    and the drive reach. Returns the mask of the candidates, False only where a collision is impossible,
+    and how many were culled. The ball locations (slices, with their delta times) and the boxes (cars, with their
+    velocities and boosts) can both be batched, the mask has the shape of the slices followed by the cars."""
+    ball_loc = np.asarray(ball_loc, dtype=np.float64)
+    box_loc = np.asarray(box_loc, dtype=np.float64)
+    box_velocity = np.asarray(box_velocity, dtype=np.float64)
+
+    ball_locs = ball_loc.reshape(-1, 3)
+    box_locs = box_loc.reshape(-1, 3)
+    delta_times = np.broadcast_to(np.asarray(delta_time, dtype=np.float64), ball_loc.shape[:-1]).reshape(-1)
+    box_speeds = np.linalg.norm(box_velocity.reshape(-1, 3), axis=-1) * np.ones(len(box_locs))
+    box_boosts = np.broadcast_to(np.asarray(box_boost, dtype=np.float64), box_loc.shape[:-1]).reshape(-1)
+
+    mask = broad_phase_kernel(
+        ball_locs,
+        delta_times,
+        box_locs,
+        box_speeds,
+        box_boosts,
+        box_bounding_radius(box_corner, box_offset),
+        float(ball_radius),
+        float(max_height),
+    )
+    mask = mask.reshape(ball_loc.shape[:-1] + box_loc.shape[:-1])
+    return mask, mask.size - np.count_nonzero(mask)
+
+
+def collision_ball_radius(collision_function, kwargs: dict) -> float:
+    """The ball radius a collision function is called with, 0 for the ones colliding with a point."""
+    if "ball_radius" in kwargs:
+        return kwargs["ball_radius"]
+    parameter = inspect.signature(collision_function).parameters.get("ball_radius")
+    return 0.0 if parameter is None else parameter.default
+
+
+def pruned_collision(
+    collision_function,
+    ball_loc,
+    delta_time,
+    box_loc,
+    box_rot_matrix,
+    box_velocity,
+    box_boost=100.0,
+    box_corner=HITBOX,
+    box_offset=HITBOX_OFFSET,
+    max_height=np.inf,
+    **kwargs,
+):
+    """Runs any of the collision functions above only on the ball locations of a box that pass the broad phase,
+    the other keyword arguments, like ball_radius, are passed to the collision function.
+    Returns the candidates mask, the results for the candidates and the number of culled ball locations."""
+    ball_loc = np.asarray(ball_loc, dtype=np.float64)
+    ball_radius = collision_ball_radius(collision_function, kwargs)
+    mask, culled = box_ball_broad_phase(
+        ball_loc, delta_time, box_loc, box_velocity, box_boost, box_corner, box_offset, ball_radius, max_height
+    )
+    result = collision_function(ball_loc[mask], box_loc, box_rot_matrix, box_corner, box_offset, **kwargs)
+    return mask, result, culled
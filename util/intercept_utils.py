@@ -0,0 +1,346 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+from numba import jit
+
+from util.collision_utils import broad_phase_margin
+from util.physics.drive_1d_simulation_utils import MAX_CAR_SPEED
+from util.physics.drive_1d_time import state_at_time
+
+# evaluations counts the slices and the points in between that were looked at, culled the slices the broad phase
+# ruled out without the narrow phase
+Intercept = namedtuple("Intercept", ["time", "ball_location", "evaluations", "culled"])
+
+# the fastest the ball can go, it bounds how fast the intercept margin of the ball prediction can change
+MAX_BALL_SPEED = 6000.0
+
+
+@jit(nopython=True, nogil=True, fastmath=True, cache=True)
+def hermite_interpolate(location_0, velocity_0, location_1, velocity_1, delta_time, s):
+    """Cubic hermite interpolation between two states delta_time apart, at the fraction s of the interval."""
+    s2 = s * s
+    s3 = s2 * s
+    h00 = 2 * s3 - 3 * s2 + 1
+    h10 = s3 - 2 * s2 + s
+    h01 = -2 * s3 + 3 * s2
+    h11 = s3 - s2
+    return h00 * location_0 + h10 * delta_time * velocity_0 + h01 * location_1 + h11 * delta_time * velocity_1
+
+
+def ball_location_at_time(ball_prediction: np.ndarray, game_time: float) -> np.ndarray:
+    """Interpolated ball location from the ball prediction at any game time covered by it."""
+    times = ball_prediction["game_seconds"]
+    i = int(np.clip(np.searchsorted(times, game_time), 1, len(ball_prediction) - 1))
+    physics_0 = ball_prediction[i - 1]["physics"]
+    physics_1 = ball_prediction[i]["physics"]
+    delta_time = float(times[i] - times[i - 1])
+    s = min(max((game_time - times[i - 1]) / max(delta_time, 1e-9), 0.0), 1.0)
+    return hermite_interpolate(
+        physics_0["location"].astype(np.float64),
+        physics_0["velocity"].astype(np.float64),
+        physics_1["location"].astype(np.float64),
+        physics_1["velocity"].astype(np.float64),
+        delta_time,
+        s,
+    )
+
+
+@jit(nopython=True, nogil=True, fastmath=True, cache=True)
+def margin_bound_rate(car_speed):
+    """How fast the broad_phase_margin of the ball prediction can grow: the reach bound grows at most twice as fast as the top speed,
+    where it's acceleration phase ends, and the ball moves the rest."""
+    return 2 * max(car_speed, MAX_CAR_SPEED) + MAX_BALL_SPEED
+
+
+@jit(nopython=True, nogil=True, fastmath=True, cache=True)
+def intercept_margin(
+    ball_location,
+    delta_time,
+    car_location,
+    car_velocity,
+    car_boost,
+    car_rot,
+    box_corner,
+    box_offset,
+    box_radius,
+    ball_radius,
+    max_height,
+):
+    """How much further than needed the car can drive to touch the ball location in time, positive if reachable.
+    Ball locations ruled out by the bounding sphere broad phase return a cheap negative bound instead."""
+    speed = math.sqrt(car_velocity[0] ** 2 + car_velocity[1] ** 2 + car_velocity[2] ** 2)
+    bound = broad_phase_margin(
+        ball_location, delta_time, car_location, speed, car_boost, box_radius, ball_radius, max_height
+    )
+    if bound < 0:
+        return bound
+
+    delta_time = max(delta_time, 0.0)
+    height_margin = max_height - ball_location[2]
+
+    rel_loc = ball_location - car_location
+    distance = math.sqrt(rel_loc[0] ** 2 + rel_loc[1] ** 2 + rel_loc[2] ** 2)
+
+    # narrow phase, the distance left until collision with the oriented box
+    collision_distance = 0.0
+    for i in range(3):
+        local = rel_loc[0] * car_rot[0, i] + rel_loc[1] * car_rot[1, i] + rel_loc[2] * car_rot[2, i]
+        hit = min(max(local - box_offset[i], -box_corner[i]), box_corner[i]) + box_offset[i]
+        collision_distance += (hit - local) ** 2
+    collision_distance = math.sqrt(collision_distance) - ball_radius
+
+    # only accurate if we're already moving towards the target
+    velocity = (rel_loc[0] * car_velocity[0] + rel_loc[1] * car_velocity[1] + rel_loc[2] * car_velocity[2]) / max(
+        distance, 1e-9
+    )
+    reach = state_at_time(delta_time, velocity, car_boost)[0]
+
+    return min(reach - collision_distance, height_margin)
+
+
+@jit(nopython=True, nogil=True, fastmath=True, cache=True)
+def earliest_intercept_kernel(
+    locations,
+    velocities,
+    delta_times,
+    car_location,
+    car_velocity,
+    car_boost,
+    car_rot,
+    box_corner,
+    box_offset,
+    ball_radius,
+    max_height,
+    stride,
+    tolerance,
+    max_iterations,
+):
+    """Returns (time, x, y, z, evaluations, culled) of the earliest reachable ball location,
+    time is -1 if there's none."""
+    num_slices = len(delta_times)
+    box_radius = math.sqrt(
+        (abs(box_offset[0]) + box_corner[0]) ** 2
+        + (abs(box_offset[1]) + box_corner[1]) ** 2
+        + (abs(box_offset[2]) + box_corner[2]) ** 2
+    )
+    speed = math.sqrt(car_velocity[0] ** 2 + car_velocity[1] ** 2 + car_velocity[2] ** 2)
+    bound_rate = margin_bound_rate(speed)
+    evaluations = 0
+    culled = 0
+
+    # bracketing, exits at the first reachable slice. Up to stride slices are stepped over at once,
+    # but only the ones that the margin bound of the current slice proves to be unreachable
+    hi = -1
+    i = 0
+    while i < num_slices:
+        bound = broad_phase_margin(
+            locations[i], delta_times[i], car_location, speed, car_boost, box_radius, ball_radius, max_height
+        )
+        evaluations += 1
+        if bound < 0:
+            unreachable_until = delta_times[i] - bound / bound_rate
+            j = i + 1
+            while j < min(i + stride, num_slices) and delta_times[j] < unreachable_until:
+                j += 1
+            culled += j - i
+            i = j
+            continue
+
+        margin = intercept_margin(
+            locations[i],
+            delta_times[i],
+            car_location,
+            car_velocity,
+            car_boost,
+            car_rot,
+            box_corner,
+            box_offset,
+            box_radius,
+            ball_radius,
+            max_height,
+        )
+        if margin > 0:
+            hi = i
+            break
+        i += 1
+
+    if hi < 0:
+        return -1.0, 0.0, 0.0, 0.0, evaluations, culled
+
+    if hi == 0:
+        return delta_times[0], locations[0, 0], locations[0, 1], locations[0, 2], evaluations, culled
+
+    # refinement in continuous time between the last unreachable slice and the first reachable one
+    time_0 = delta_times[hi - 1]
+    slice_time = delta_times[hi] - time_0
+    margin_lo = intercept_margin(
+        locations[hi - 1],
+        time_0,
+        car_location,
+        car_velocity,
+        car_boost,
+        car_rot,
+        box_corner,
+        box_offset,
+        box_radius,
+        ball_radius,
+        max_height,
+    )
+    margin_hi = intercept_margin(
+        locations[hi],
+        delta_times[hi],
+        car_location,
+        car_velocity,
+        car_boost,
+        car_rot,
+        box_corner,
+        box_offset,
+        box_radius,
+        ball_radius,
+        max_height,
+    )
+    evaluations += 2
+
+    s_lo = 0.0
+    s_hi = 1.0
+    location_hi = locations[hi]
+    side = 0
+    for _ in range(max_iterations):
+        if (s_hi - s_lo) * slice_time < tolerance:
+            break
+
+        # regula falsi, kept away from the ends of the interval
+        s = s_lo + (s_hi - s_lo) * -margin_lo / max(margin_hi - margin_lo, 1e-9)
+        s = min(max(s, s_lo + (s_hi - s_lo) * 0.05), s_hi - (s_hi - s_lo) * 0.05)
+
+        location = hermite_interpolate(
+            locations[hi - 1], velocities[hi - 1], locations[hi], velocities[hi], slice_time, s
+        )
+        margin = intercept_margin(
+            location,
+            time_0 + s * slice_time,
+            car_location,
+            car_velocity,
+            car_boost,
+            car_rot,
+            box_corner,
+            box_offset,
+            box_radius,
+            ball_radius,
+            max_height,
+        )
+        evaluations += 1
+
+        # Illinois modification to avoid one sided convergence
+        if margin > 0:
+            s_hi = s
+            margin_hi = margin
+            location_hi = location
+            if side == 1:
+                margin_lo /= 2
+            side = 1
+        else:
+            s_lo = s
+            margin_lo = margin
+            if side == -1:
+                margin_hi /= 2
+            side = -1
+
+    return time_0 + s_hi * slice_time, location_hi[0], location_hi[1], location_hi[2], evaluations, culled
+
+
+def earliest_intercept(
+    ball_prediction: np.ndarray,
+    current_time: float,
+    car,
+    car_rot: np.ndarray,
+    ball_radius: float = 92,
+    max_height: float = np.inf,
+    stride: int = 4,
+    tolerance: float = 1e-3,
+    max_iterations: int = 8,
+):
+    """Returns the earliest reachable Intercept in the ball prediction, or None.
+    Brackets the first reachable slice, stepping over up to stride slices at once where the broad phase proves
+    they're unreachable, then refines the time in between slices with regula falsi on the hermite interpolated
+    ball path. No reachable slice is stepped over, however short the window it's in."""
+
+    if len(ball_prediction) == 0:
+        return None
+
+    time, x, y, z, evaluations, culled = earliest_intercept_kernel(
+        ball_prediction["physics"]["location"].astype(np.float64),
+        ball_prediction["physics"]["velocity"].astype(np.float64),
+        ball_prediction["game_seconds"] - current_time,
+        np.asarray(car.location, dtype=np.float64),
+        np.asarray(car.velocity, dtype=np.float64),
+        float(car.boost),
+        np.asarray(car_rot, dtype=np.float64),
+        np.asarray(car.hitbox_corner, dtype=np.float64),
+        np.asarray(car.hitbox_offset, dtype=np.float64),
+        float(ball_radius),
+        float(max_height),
+        stride,
+        tolerance,
+        max_iterations,
+    )
+
+    if time < 0:
+        return None
+    return Intercept(time, np.array([x, y, z]), evaluations, culled)
+
+
+def car_intercept_margin(ball_location, delta_time, car, car_rot, ball_radius=92, max_height=np.inf) -> float:
+    """intercept_margin for a single ball location, positive if the car can still touch it in time."""
+    box_corner = np.asarray(car.hitbox_corner, dtype=np.float64)
+    box_offset = np.asarray(car.hitbox_offset, dtype=np.float64)
+    return intercept_margin(
+        np.asarray(ball_location, dtype=np.float64),
+        float(delta_time),
+        np.asarray(car.location, dtype=np.float64),
+        np.asarray(car.velocity, dtype=np.float64),
+        float(car.boost),
+        np.asarray(car_rot, dtype=np.float64),
+        box_corner,
+        box_offset,
+        float(np.linalg.norm(np.abs(box_offset) + box_corner)),
+        float(ball_radius),
+        float(max_height),
+    )
+
+
+def main():
+    """Testing for errors and performance"""
+
+    from timeit import timeit
+    from skeleton.util.structure import Player
+    from skeleton.util.structure.dtypes import dtype_Slice
+
+    ball_prediction = np.zeros(360, dtype_Slice)
+    ball_prediction["game_seconds"] = np.arange(1, 361) / 60
+    ball_prediction["physics"]["location"] = np.array([2000, 3000, 92]) + np.outer(np.arange(360) / 60, [-500, 0, 0])
+    ball_prediction["physics"]["velocity"] = np.array([-500, 0, 0])
+
+    car = Player()
+    car.location = np.array([0.0, 0.0, 17.0])
+    car.velocity = np.array([0.0, 1000.0, 0.0])
+    car.boost = 50
+    car_rot = np.array([[0.0, -1.0, 0.0], [1.0, 0.0, 0.0], [0.0, 0.0, 1.0]])
+
+    def test_function():
+        return earliest_intercept(ball_prediction, 0.0, car, car_rot, max_height=200)
+
+    print(test_function())
+
+    fps = 120
+    n_times = 10000
+    time_taken = timeit(test_function, number=n_times)
+    percentage = time_taken * fps / n_times * 100
+
+    print(f"Took {time_taken} seconds to run {n_times} times.")
+    print(f"That's {percentage:.5f} % of our time budget.")
+
+
+if __name__ == "__main__":
+    main()
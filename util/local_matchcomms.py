@@ -0,0 +1,90 @@
+from queue import Queue
+
+
+class LocalBroadcast(Queue):
+    """The outgoing broadcast of a local client. Messages wait in it until the server delivers them, when a client
+    reads it's incoming broadcast, like they wait for the websocket of rlbot's client. Once the server is closed,
+    the messages aren't kept anymore."""
+
+    def __init__(self, server: "LocalMatchcommsServer"):
+        super().__init__()
+        self.server = server
+
+    def _put(self, message):
+        if not self.server.closed:
+            super()._put(message)
+
+
+class LocalInbox(Queue):
+    """The incoming broadcast of a local client, the pending messages of the other clients are delivered to it
+    before it's read."""
+
+    def __init__(self, server: "LocalMatchcommsServer"):
+        super().__init__()
+        self.server = server
+
+    def empty(self) -> bool:
+        self.server.deliver()
+        return super().empty()
+
+    def qsize(self) -> int:
+        self.server.deliver()
+        return super().qsize()
+
+    def get(self, block=True, timeout=None):
+        self.server.deliver()
+        return super().get(block, timeout)
+
+
+class LocalMatchcommsClient:
+    """Queue backed stand-in for rlbot's MatchcommsClient, with the same incoming_broadcast and outgoing_broadcast.
+    Messages are passed as they are, without the json encoding of the websocket."""
+
+    def __init__(self, server: "LocalMatchcommsServer"):
+        self.server = server
+        self.incoming_broadcast = LocalInbox(server)
+        self.outgoing_broadcast = LocalBroadcast(server)
+
+    def close(self):
+        self.server.disconnect(self)
+
+
+class LocalMatchcommsServer:
+    """Delivers the broadcasts of each connected client to all the other clients, like the matchcomms server does,
+    so that test agents and graders can talk in one process. The messages are delivered in the order they're sent,
+    whenever a client reads, so that the episodes don't depend on thread timings."""
+
+    def __init__(self):
+        self.clients = []
+        self.closed = False
+
+    def connect(self) -> LocalMatchcommsClient:
+        client = LocalMatchcommsClient(self)
+        self.clients.append(client)
+        return client
+
+    def disconnect(self, client: LocalMatchcommsClient):
+        if client in self.clients:
+            self.clients.remove(client)
+
+    def deliver(self):
+        """Moves the pending messages of every client's outgoing broadcast to the other clients."""
+        for sender in self.clients:
+            outgoing = sender.outgoing_broadcast
+            while not outgoing.empty():
+                message = outgoing.get_nowait()
+                for client in self.clients:
+                    if client is not sender:
+                        client.incoming_broadcast.put_nowait(message)
+
+    def close(self):
+        """Delivers the pending messages, later ones are dropped, so that agents flushing their broadcast when
+        they retire don't wait for readers that are gone."""
+        self.deliver()
+        self.closed = True
+
+    def attach(self, agent) -> LocalMatchcommsClient:
+        """Connects a SkeletonAgent, it's matchcomms property returns the local client from then on."""
+        client = self.connect()
+        agent.matchcomms_factory = lambda: client
+        return agent.matchcomms
@@ -1,5 +1,7 @@
 import math
 
+from numba import jit
+
 PI = math.pi
 
 
@@ -25,3 +27,8 @@ def normalize_angle(angle, pi_unit=PI):
 def sign(x: float):
     """Retuns 1 if x > 0 else -1. > instead of >= so that sign(False) returns -1"""
     return 1 if x > 0 else -1
+
+
+# compiled versions, callable from inside numba kernels
+jit_clip = jit(nopython=True, fastmath=True, cache=True)(clip)
+jit_sign = jit(nopython=True, fastmath=True, cache=True)(sign)
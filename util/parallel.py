@@ -0,0 +1,90 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+THREADS = os.cpu_count() or 1
+
+# the threads are shared by all the batches of the process
+_executor = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(THREADS, thread_name_prefix="batch")
+    return _executor
+
+
+def split_batch(function, *arrays, shared=(), min_chunk_size: int = 1024, max_chunks: int = None):
+    """Calls function(*chunks, *shared) on chunks of the arrays along their first axis, on the thread pool,
+    and concatenates the results, which can be arrays or tuples of arrays.
+    Only speeds things up when the function releases the GIL, like numpy operations, numba gufuncs
+    and nogil jitted functions do. Small batches are run directly on the calling thread."""
+
+    n = len(arrays[0])
+    max_chunks = max_chunks or THREADS
+    n_chunks = max(min(n // min_chunk_size, max_chunks), 1)
+    if n_chunks == 1:
+        return function(*arrays, *shared)
+
+    bounds = np.linspace(0, n, n_chunks + 1).astype(int)
+    futures = [
+        get_executor().submit(function, *(array[start:end] for array in arrays), *shared)
+        for start, end in zip(bounds[:-1], bounds[1:])
+    ]
+    results = [future.result() for future in futures]
+
+    if isinstance(results[0], tuple):
+        return tuple(np.concatenate(parts) for parts in zip(*results))
+    return np.concatenate(results)
+
+
+def main():
+    """Testing for errors and performance"""
+
+    from timeit import timeit
+    from util.physics.drive_1d_distance import state_at_distance_vectorized
+
+    n = 100000
+    distance = np.linspace(0, 5000, n)
+    velocity = np.linspace(-2300, 2300, n)
+    boost = np.linspace(0, 100, n)
+
+    def test_function():
+        return state_at_distance_vectorized(distance, velocity, boost)
+
+    def test_function_split():
+        return split_batch(state_at_distance_vectorized, distance, velocity, boost)
+
+    for expected, result in zip(test_function(), test_function_split()):
+        assert np.array_equal(expected, result)
+
+    n_times = 100
+    for function in (test_function, test_function_split):
+        time_taken = timeit(function, number=n_times)
+        print(f"{function.__name__}: took {time_taken} seconds to run {n_times} times with {n} states.")
+
+    # the collision broad phase of many ball locations against a few cars
+    from util.collision_utils import broad_phase_kernel
+
+    ball_locations = np.random.uniform(-4000, 4000, (n, 3))
+    delta_times = np.linspace(0, 6, n)
+    car_locations = np.random.uniform(-4000, 4000, (8, 3))
+    shared = (car_locations, np.full(8, 1000.0), np.full(8, 50.0), 100.0, 92.0, np.inf)
+
+    def test_collision():
+        return broad_phase_kernel(ball_locations, delta_times, *shared)
+
+    def test_collision_split():
+        return split_batch(broad_phase_kernel, ball_locations, delta_times, shared=shared)
+
+    assert np.array_equal(test_collision(), test_collision_split())
+    for function in (test_collision, test_collision_split):
+        time_taken = timeit(function, number=n_times)
+        print(f"{function.__name__}: took {time_taken} seconds to run {n_times} times with {n} ball locations.")
+    print(f"Using {THREADS} threads.")
+
+
+if __name__ == "__main__":
+    main()
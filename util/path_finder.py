@@ -1,7 +1,10 @@
 import heapq
 from collections import namedtuple
 
+from util.boost_utils import pad_geometry, PAD_RELATIVE_LOCATION
 from util.physics.drive_1d_heuristic import state_at_distance_heuristic, state_at_distance_heuristic_vectorized
+from util.physics.drive_2d_heuristic import state_at_distance_turning_vectorized
+from util.physics.turn_time_table import state_at_distance_turn_table
 
 import numpy as np
 
@@ -18,7 +21,12 @@ class PrioritizedItem:
 Node = namedtuple("Node", ["time", "vel", "boost", "i", "prev"])
 
 
-def find_fastest_path(boost_pads: np.ndarray, start: np.ndarray, target: np.ndarray, vel: np.ndarray, boost: float):
+def find_fastest_path(
+    boost_pads: np.ndarray, start: np.ndarray, target: np.ndarray, vel: np.ndarray, boost: float, tables=None
+):
+    """The fastest route to the target through the boost pads, the pad to pad legs are read from the pad geometry
+    table of the shared tables if it's given."""
+    geometry = pad_geometry(boost_pads, tables)
     queue = [PrioritizedItem(0, Node(0, vel, boost, -2, None))]
 
     # -1 is target, -2 is start
@@ -40,11 +48,14 @@ def find_fastest_path(boost_pads: np.ndarray, start: np.ndarray, target: np.ndar
             location = boost_pads[state.i]["location"]
 
         for i in boost_indices:
-            pad_location = target
-            if i != -1:
-                pad_location = boost_pads[i]["location"]
-
-            delta_time, vel, boost = state_at_distance_heuristic(pad_location - location, state.vel, state.boost)
+            if i == -1:
+                relative_location = target - location
+            elif state.i == -2:
+                relative_location = boost_pads[i]["location"] - location
+            else:
+                relative_location = geometry[state.i, i, PAD_RELATIVE_LOCATION]
+
+            delta_time, vel, boost = state_at_distance_heuristic(relative_location, state.vel, state.boost)
             time = state.time + delta_time
 
             if i != -1:
@@ -66,14 +77,38 @@ def first_target(boost_pads: np.ndarray, target: np.ndarray, route: Node):
     return boost_pads[route.i]["location"]
 
 
-def optional_boost_target(boost_pads: np.ndarray, start: np.ndarray, target: np.ndarray, vel: np.ndarray, boost: float):
-    """Returns the original target or a boost location that will help to get to the target faster."""
-
-    time_to_target = state_at_distance_heuristic(target - start, vel, boost)[0]
-
-    time_at_pad, vel_at_pad, boost_at_pad = state_at_distance_heuristic_vectorized(
-        boost_pads["location"] - start, [vel] * len(boost_pads), [boost] * len(boost_pads)
-    )
+def optional_boost_target(
+    boost_pads: np.ndarray,
+    start: np.ndarray,
+    target: np.ndarray,
+    vel: np.ndarray,
+    boost: float,
+    forward: np.ndarray = None,
+    yaw_rate: float = 0.0,
+    turn_table: np.ndarray = None,
+):
+    """Returns the original target or a boost location that will help to get to the target faster.
+    If the car's forward direction is given, the travel times account for turning,
+    with the times of the turn table from the car's yaw rate if it's given too."""
+
+    if forward is None:
+        time_to_target = state_at_distance_heuristic(target - start, vel, boost)[0]
+
+        time_at_pad, vel_at_pad, boost_at_pad = state_at_distance_heuristic_vectorized(
+            boost_pads["location"] - start, [vel] * len(boost_pads), [boost] * len(boost_pads)
+        )
+    elif turn_table is not None:
+        time_to_target = state_at_distance_turn_table(target - start, forward, vel, yaw_rate, boost, turn_table)[0][0]
+
+        time_at_pad, vel_at_pad, boost_at_pad = state_at_distance_turn_table(
+            boost_pads["location"] - start, forward, vel, yaw_rate, boost, turn_table
+        )
+    else:
+        time_to_target = state_at_distance_turning_vectorized(target - start, forward, vel, boost)[0][0]
+
+        time_at_pad, vel_at_pad, boost_at_pad = state_at_distance_turning_vectorized(
+            boost_pads["location"] - start, forward, vel, boost
+        )
 
     pad_recharge_time = np.where(boost_pads["is_full_boost"], 10, 4)
     valid_mask = (boost_pads["timer"] + time_at_pad >= pad_recharge_time) | boost_pads["is_active"]
@@ -89,9 +124,20 @@ def optional_boost_target(boost_pads: np.ndarray, start: np.ndarray, target: np.
     pad_boost = np.where(valid_boosts["is_full_boost"], 100, 12)
     boost_at_pad = np.minimum(boost_at_pad + pad_boost, 100)
 
-    time_at_target, vel_at_target, boost_at_target = state_at_distance_heuristic_vectorized(
-        target - valid_boosts["location"], vel_at_pad, boost_at_pad
-    )
+    if forward is None:
+        time_at_target, vel_at_target, boost_at_target = state_at_distance_heuristic_vectorized(
+            target - valid_boosts["location"], vel_at_pad, boost_at_pad
+        )
+    elif turn_table is not None:
+        # the car faces the way it arrived at the pad, without turning yet
+        time_at_target, vel_at_target, boost_at_target = state_at_distance_turn_table(
+            target - valid_boosts["location"], vel_at_pad, vel_at_pad, 0, boost_at_pad, turn_table
+        )
+    else:
+        # the car faces the way it arrived at the pad
+        time_at_target, vel_at_target, boost_at_target = state_at_distance_turning_vectorized(
+            target - valid_boosts["location"], vel_at_pad, vel_at_pad, boost_at_pad
+        )
 
     time_at_target = time_at_target + time_at_pad
     min_pad_time_key = np.argmin(time_at_target)
@@ -106,6 +152,8 @@ def main():
     """Testing for errors and performance"""
 
     from timeit import timeit
+    from util.physics.turn_time_table import TURN_TABLE
+    from util.shared_tables import attach_table
     from rlbot.utils.structures.game_data_struct import GameTickPacket
     from skeleton.test.skeleton_agent_test import SkeletonAgentTest, MAX_BOOSTS
 
@@ -134,6 +182,18 @@ def main():
 
     print(test_function())
 
+    def test_function():
+        return optional_boost_target(boost_pads, my_loc, target_loc, vel, 50, np.array([1, 0, 0]))
+
+    print(test_function())
+
+    turn_table = attach_table(TURN_TABLE)
+
+    def test_function():
+        return optional_boost_target(boost_pads, my_loc, target_loc, vel, 50, np.array([1, 0, 0]), 0, turn_table)
+
+    print(test_function())
+
     fps = 120
     n_times = 100
     time_taken = timeit(test_function, number=n_times)
@@ -6,7 +6,7 @@ from util.physics.drive_1d_simulation_utils import *
 throttle_acceleration = vectorize([f8(f8, f8)], nopython=True, fastmath=True, cache=True)(throttle_acceleration)
 
 
-@jit([UniTuple(f8, 3)(f8, f8, f8)], nopython=True, fastmath=True, cache=True)
+@jit([UniTuple(f8, 3)(f8, f8, f8)], nopython=True, nogil=True, fastmath=True, cache=True)
 def state_at_distance_simulation(max_distance: float, v_0: float, initial_boost: float):
 
     time = 0
@@ -37,7 +37,7 @@ def state_at_distance_simulation_vectorized(
         )
 
 
-@jit([UniTuple(f8, 3)(f8, f8, f8)], nopython=True, fastmath=True, cache=True)
+@jit([UniTuple(f8, 3)(f8, f8, f8)], nopython=True, nogil=True, fastmath=True, cache=True)
 def state_at_time_simulation(time_window: float, initial_velocity: float, boost_amount: float):
 
     distance = 0
@@ -60,7 +60,7 @@ def state_at_time_simulation_vectorized(time, initial_velocity, boost_amount, ou
         out_dist[i], out_vel[i], out_boost[i] = state_at_time_simulation(time[i], initial_velocity[i], boost_amount[i])
 
 
-@jit([UniTuple(f8, 3)(f8, f8, f8)], nopython=True, fastmath=True, cache=True)
+@jit([UniTuple(f8, 3)(f8, f8, f8)], nopython=True, nogil=True, fastmath=True, cache=True)
 def state_at_velocity_simulation(desired_velocity: float, initial_velocity: float, boost_amount: float):
 
     time = 0
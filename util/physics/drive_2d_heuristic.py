@@ -0,0 +1,123 @@
+import math
+
+import numpy as np
+from numba import jit, guvectorize
+
+from util.physics.drive_1d_distance import state_at_distance
+from util.physics.drive_1d_simulation_utils import BREAK_ACCELERATION
+from util.physics.drive_2d_simulation import max_curvature, speed_at_curvature
+
+
+@jit(nopython=True, nogil=True, fastmath=True, cache=True)
+def state_at_target_2d(x: float, y: float, forward_vel: float, boost: float):
+    """Returns the state reached (time, vel, boost, direction_x, direction_y) after driving to a target
+    at (x, y) in the car's local coordinates, turning towards it at the minimum turning radius of the current speed
+    and then driving straight. Targets inside the turning circle are reached on a single arc after slowing down.
+    The path length is driven with the 1d model, the final direction is in local coordinates too."""
+
+    side = 1.0 if y >= 0 else -1.0
+    y = abs(y)
+    if x == 0 and y == 0:
+        return 0.0, forward_vel, boost, 1.0, 0.0
+
+    turn_vel = max(forward_vel, 0.0)
+    radius = 1 / max_curvature(turn_vel)
+
+    time = 0.0
+    center_distance = math.sqrt(x**2 + (y - radius) ** 2)
+
+    if center_distance >= radius:
+        # arc until the tangent towards the target, then straight
+        heading = math.pi / 2 + math.atan2(y - radius, x) - math.acos(radius / center_distance)
+        if heading < -1e-6:
+            heading += 2 * math.pi
+        heading = max(heading, 0.0)
+        path_length = radius * heading + math.sqrt(center_distance**2 - radius**2)
+    else:
+        # the target is inside the turning circle, slowing down to turn on the arc through it
+        curvature = 2 * y / (x**2 + y**2)
+        slow_vel = speed_at_curvature(curvature)
+        time += (turn_vel - slow_vel) / BREAK_ACCELERATION
+        forward_vel = slow_vel
+
+        heading = 2 * math.atan2(y, x)
+        path_length = heading / curvature
+
+    delta_time, vel, boost = state_at_distance(path_length, forward_vel, boost)
+
+    return time + delta_time, vel, boost, math.cos(heading), side * math.sin(heading)
+
+
+@guvectorize(
+    ["(f8[:], f8[:], f8[:], f8[:], f8[:], f8[:], f8[:], f8[:], f8[:])"],
+    "(n), (n), (n), (n) -> (n), (n), (n), (n), (n)",
+    nopython=True,
+)
+def state_at_target_2d_vectorized(
+    x, y, forward_vel, boost, out_time, out_vel, out_boost, out_direction_x, out_direction_y
+) -> None:
+    """Returns the states reached (time[], vel[], boost[], direction_x[], direction_y[]) after driving to many targets."""
+    for i in range(len(x)):
+        out_time[i], out_vel[i], out_boost[i], out_direction_x[i], out_direction_y[i] = state_at_target_2d(
+            x[i], y[i], forward_vel[i], boost[i]
+        )
+
+
+def state_at_distance_turning_vectorized(rel_loc, forward, vel, boost):
+    """Like state_at_distance_heuristic_vectorized, but aware of the car's forward direction and turning radius.
+    Takes (n, 3) arrays of the targets relative to the cars, the cars' forward directions and velocities,
+    and returns the (time[], vel[n, 3], boost[]) reached on the ground."""
+    rel_loc = np.atleast_2d(np.asarray(rel_loc, dtype=np.float64))
+    forward = np.broadcast_to(np.asarray(forward, dtype=np.float64), rel_loc.shape)
+    vel = np.broadcast_to(np.asarray(vel, dtype=np.float64), rel_loc.shape)
+    boost = np.broadcast_to(np.asarray(boost, dtype=np.float64), rel_loc.shape[:1])
+
+    # the forward direction projected on the ground, and its perpendicular
+    forward_x = forward[:, 0]
+    forward_y = forward[:, 1]
+    forward_norm = np.maximum(np.sqrt(forward_x**2 + forward_y**2), 1e-9)
+    forward_x = forward_x / forward_norm
+    forward_y = forward_y / forward_norm
+
+    x = rel_loc[:, 0] * forward_x + rel_loc[:, 1] * forward_y
+    y = -rel_loc[:, 0] * forward_y + rel_loc[:, 1] * forward_x
+    forward_vel = vel[:, 0] * forward_x + vel[:, 1] * forward_y
+
+    time, final_vel, final_boost, direction_x, direction_y = state_at_target_2d_vectorized(
+        x, y, forward_vel, np.ascontiguousarray(boost)
+    )
+
+    final_vel_3d = np.zeros(rel_loc.shape)
+    final_vel_3d[:, 0] = final_vel * (direction_x * forward_x - direction_y * forward_y)
+    final_vel_3d[:, 1] = final_vel * (direction_x * forward_y + direction_y * forward_x)
+    return time, final_vel_3d, final_boost
+
+
+def main():
+    """Testing for errors and performance"""
+
+    from timeit import timeit
+
+    n = 5000
+    angle = np.linspace(-np.pi, np.pi, n)
+    rel_loc = np.stack([np.cos(angle), np.sin(angle), np.zeros(n)], axis=1) * 2000
+    forward = np.array([1.0, 0.0, 0.0])
+    vel = np.array([1500.0, 0.0, 0.0])
+    boost = np.full(n, 50.0)
+
+    def test_function():
+        return state_at_distance_turning_vectorized(rel_loc, forward, vel, boost)[0]
+
+    print(test_function())
+
+    fps = 120
+    n_times = 1000
+    time_taken = timeit(test_function, number=n_times)
+    percentage = time_taken * fps / n_times * 100
+
+    print(f"Took {time_taken} seconds to run {n_times} times with {n} targets.")
+    print(f"That's {percentage:.5f} % of our time budget.")
+
+
+if __name__ == "__main__":
+    main()
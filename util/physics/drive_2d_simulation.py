@@ -0,0 +1,126 @@
+import math
+
+from numba import jit
+
+from util.numerics import jit_clip
+from util.physics.drive_1d_simulation_utils import (
+    throttle_acceleration,
+    BOOST_ACCELERATION,
+    BOOST_CONSUMPTION_RATE,
+    MAX_CAR_SPEED,
+    DT,
+)
+
+throttle_acceleration = jit(nopython=True, nogil=True, fastmath=True, cache=True)(throttle_acceleration)
+
+# maximum curvature of the car's path at some forward speeds, it's linearly interpolated in between
+CURVATURE_SPEEDS = (0.0, 500.0, 1000.0, 1500.0, 1750.0, 2300.0)
+CURVATURES = (0.0069, 0.00398, 0.00235, 0.001375, 0.0011, 0.00088)
+
+# how fast the yaw rate follows the steering, per second
+STEER_RESPONSE = 15.0
+# the yaw rate multiplier while powersliding
+HANDBRAKE_TURN_FACTOR = 1.5
+# how fast the sideways velocity is cancelled by the tires, per second
+LATERAL_GRIP = 60.0
+HANDBRAKE_LATERAL_GRIP = 2.0
+
+
+@jit(nopython=True, nogil=True, fastmath=True, cache=True)
+def max_curvature(speed: float) -> float:
+    """The inverse of the car's minimum turning radius at some forward speed."""
+    speed = abs(speed)
+    for i in range(1, len(CURVATURE_SPEEDS)):
+        if speed <= CURVATURE_SPEEDS[i]:
+            s = (speed - CURVATURE_SPEEDS[i - 1]) / (CURVATURE_SPEEDS[i] - CURVATURE_SPEEDS[i - 1])
+            return CURVATURES[i - 1] + s * (CURVATURES[i] - CURVATURES[i - 1])
+    return CURVATURES[-1]
+
+
+@jit(nopython=True, nogil=True, fastmath=True, cache=True)
+def speed_at_curvature(curvature: float) -> float:
+    """The highest forward speed at which the car can still turn with the curvature."""
+    if curvature >= CURVATURES[0]:
+        return 0.0
+    for i in range(1, len(CURVATURES)):
+        if curvature >= CURVATURES[i]:
+            s = (curvature - CURVATURES[i - 1]) / (CURVATURES[i] - CURVATURES[i - 1])
+            return CURVATURE_SPEEDS[i - 1] + s * (CURVATURE_SPEEDS[i] - CURVATURE_SPEEDS[i - 1])
+    return CURVATURE_SPEEDS[-1]
+
+
+@jit(nopython=True, nogil=True, fastmath=True, cache=True)
+def drive_2d_step(x, y, vx, vy, yaw, yaw_rate, boost, throttle, steer, use_boost, handbrake, dt=DT):
+    """Advances a car driving on flat ground by dt with the given controls.
+    The state is (x, y, vx, vy, yaw, yaw_rate, boost), positive steer increases the yaw.
+    Returns the new state."""
+
+    cos_yaw = math.cos(yaw)
+    sin_yaw = math.sin(yaw)
+    forward_vel = vx * cos_yaw + vy * sin_yaw
+    lateral_vel = -vx * sin_yaw + vy * cos_yaw
+
+    # forward acceleration
+    boosting = use_boost and boost > 0
+    if boosting:
+        throttle = 1.0
+    acceleration = throttle_acceleration(forward_vel, jit_clip(throttle))
+    if boosting:
+        acceleration += BOOST_ACCELERATION
+        boost = max(boost - BOOST_CONSUMPTION_RATE * dt, 0.0)
+
+    new_forward_vel = forward_vel + acceleration * dt
+    if acceleration * forward_vel < 0 and new_forward_vel * forward_vel < 0:
+        # braking and coasting stop the car, they don't reverse it
+        new_forward_vel = 0.0
+
+    # sideways grip
+    grip = HANDBRAKE_LATERAL_GRIP if handbrake else LATERAL_GRIP
+    lateral_vel *= math.exp(-grip * dt)
+
+    # steering
+    target_yaw_rate = jit_clip(steer) * max_curvature(new_forward_vel) * new_forward_vel
+    if handbrake:
+        target_yaw_rate *= HANDBRAKE_TURN_FACTOR
+    yaw_rate += (target_yaw_rate - yaw_rate) * min(STEER_RESPONSE * dt, 1.0)
+
+    vx = new_forward_vel * cos_yaw - lateral_vel * sin_yaw
+    vy = new_forward_vel * sin_yaw + lateral_vel * cos_yaw
+
+    speed = math.sqrt(vx**2 + vy**2)
+    if speed > MAX_CAR_SPEED:
+        vx *= MAX_CAR_SPEED / speed
+        vy *= MAX_CAR_SPEED / speed
+
+    x += vx * dt
+    y += vy * dt
+    yaw += yaw_rate * dt
+    yaw = (yaw + math.pi) % (2 * math.pi) - math.pi
+
+    return x, y, vx, vy, yaw, yaw_rate, boost
+
+
+def main():
+    """Testing for errors and performance"""
+
+    from timeit import timeit
+
+    def test_function():
+        state = (0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 100.0)
+        for _ in range(120):
+            state = drive_2d_step(*state, 1.0, 1.0, True, False)
+        return state
+
+    print(test_function())
+
+    fps = 120
+    n_times = 1000
+    time_taken = timeit(test_function, number=n_times)
+    percentage = time_taken * fps / n_times * 100
+
+    print(f"Took {time_taken} seconds to run {n_times} times.")
+    print(f"That's {percentage:.5f} % of our time budget.")
+
+
+if __name__ == "__main__":
+    main()
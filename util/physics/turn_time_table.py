@@ -0,0 +1,231 @@
+import math
+
+import numpy as np
+from numba import jit, guvectorize
+
+from mechanic.drive_turn_face_target import drive_turn_face_target, turn_face_target_controls
+from util import numerics
+from util.physics import drive_1d_simulation_utils, drive_2d_simulation
+from util.physics.drive_1d_distance import state_at_distance_vectorized
+from util.physics.drive_1d_simulation_utils import MAX_CAR_SPEED, DT
+from util.physics.drive_2d_simulation import drive_2d_step
+from util.shared_tables import register_table, attach_table, publish_table
+
+# the table's grid, the angle to the target is mirrored so that it's always positive
+TABLE_ANGLES = np.linspace(0, math.pi, 33)
+TABLE_SPEEDS = np.linspace(0, MAX_CAR_SPEED, 24)
+TABLE_ANGULAR_VELOCITIES = np.linspace(-5.5, 5.5, 23)
+
+# the table's columns
+TURN_TIME = 0
+TURN_DISTANCE = 1
+TURN_FINAL_SPEED = 2
+
+# turns that haven't finished by then are cut short
+MAX_TURN_TIME = 4.0
+
+# the name of the table in the shared tables
+TURN_TABLE = "turn_time"
+
+
+@jit(nopython=True, nogil=True, fastmath=True, cache=True)
+def simulate_turn(angle, speed, angular_velocity):
+    """Simulates DriveTurnFaceTarget until the car faces a direction at angle from it's forward direction.
+    angular_velocity is the yaw rate towards positive angles. Returns (time, distance, final_speed)."""
+
+    x, y, vx, vy, yaw, yaw_rate, boost = 0.0, 0.0, speed, 0.0, 0.0, angular_velocity, 0.0
+    target_in_local_coords = np.zeros(3)
+    car_local_velocity = np.zeros(3)
+    car_ang_vel_local_coords = np.zeros(3)
+
+    time = 0.0
+    distance = 0.0
+    while time < MAX_TURN_TIME:
+        yaw_angle_to_target = (angle - yaw + math.pi) % (2 * math.pi) - math.pi
+        target_in_local_coords[0] = math.cos(yaw_angle_to_target)
+        target_in_local_coords[1] = math.sin(yaw_angle_to_target)
+        car_local_velocity[0] = vx * math.cos(yaw) + vy * math.sin(yaw)
+        car_local_velocity[1] = -vx * math.sin(yaw) + vy * math.cos(yaw)
+        car_ang_vel_local_coords[2] = yaw_rate
+
+        # the finished condition of DriveTurnFaceTarget
+        if abs(yaw_rate) + abs(yaw_angle_to_target) < 0.01:
+            break
+
+        steer, handbrake, _, _ = turn_face_target_controls(
+            target_in_local_coords, car_local_velocity, car_ang_vel_local_coords
+        )
+        x, y, vx, vy, yaw, yaw_rate, boost = drive_2d_step(
+            x, y, vx, vy, yaw, yaw_rate, boost, 0.5, steer, False, handbrake
+        )
+
+        time += DT
+        distance += math.sqrt(vx**2 + vy**2) * DT
+
+    return time, distance, math.sqrt(vx**2 + vy**2)
+
+
+@jit(nopython=True, nogil=True, fastmath=True, cache=True)
+def generate_turn_table(angles, speeds, angular_velocities):
+    table = np.zeros((3, len(angles), len(speeds), len(angular_velocities)), dtype=np.float32)
+    for i in range(len(angles)):
+        for j in range(len(speeds)):
+            for k in range(len(angular_velocities)):
+                time, distance, final_speed = simulate_turn(angles[i], speeds[j], angular_velocities[k])
+                table[TURN_TIME, i, j, k] = time
+                table[TURN_DISTANCE, i, j, k] = distance
+                table[TURN_FINAL_SPEED, i, j, k] = final_speed
+    return table
+
+
+def build_turn_table() -> np.ndarray:
+    return generate_turn_table(TABLE_ANGLES, TABLE_SPEEDS, TABLE_ANGULAR_VELOCITIES)
+
+
+# rebuilt when the grid or the simulated mechanic and physics change
+register_table(
+    TURN_TABLE,
+    build_turn_table,
+    version=1,
+    inputs=(TABLE_ANGLES, TABLE_SPEEDS, TABLE_ANGULAR_VELOCITIES, MAX_TURN_TIME),
+    sources=(drive_turn_face_target, drive_2d_simulation, drive_1d_simulation_utils, numerics),
+)
+
+
+@jit(nopython=True, nogil=True, fastmath=True, cache=True)
+def grid_position(grid, value):
+    """Returns the index of the grid cell containing the value, and the position in that cell."""
+    s = (value - grid[0]) / (grid[1] - grid[0])
+    i = min(max(int(math.floor(s)), 0), len(grid) - 2)
+    return i, min(max(s - i, 0.0), 1.0)
+
+
+@guvectorize(
+    ["(f8[:], f8[:], f8[:], f4[:, :, :, :], f8[:], f8[:], f8[:], f8[:], f8[:], f8[:])"],
+    "(n), (n), (n), (c, a, s, w), (a), (s), (w) -> (n), (n), (n)",
+    nopython=True,
+)
+def turn_table_lookup(
+    angle, speed, angular_velocity, table, angles, speeds, angular_velocities, out_time, out_distance, out_final_speed
+) -> None:
+    """Trilinear interpolation of the table, returns (time[], distance[], final_speed[])."""
+    for n in range(len(angle)):
+        # mirroring negative angles
+        mirror = -1.0 if angle[n] < 0 else 1.0
+        i, si = grid_position(angles, abs(angle[n]))
+        j, sj = grid_position(speeds, speed[n])
+        k, sk = grid_position(angular_velocities, angular_velocity[n] * mirror)
+
+        out_time[n] = 0.0
+        out_distance[n] = 0.0
+        out_final_speed[n] = 0.0
+        for di in range(2):
+            wi = si if di else 1 - si
+            for dj in range(2):
+                wj = sj if dj else 1 - sj
+                for dk in range(2):
+                    w = wi * wj * (sk if dk else 1 - sk)
+                    out_time[n] += w * table[TURN_TIME, i + di, j + dj, k + dk]
+                    out_distance[n] += w * table[TURN_DISTANCE, i + di, j + dj, k + dk]
+                    out_final_speed[n] += w * table[TURN_FINAL_SPEED, i + di, j + dj, k + dk]
+
+
+def turn_time(angle, speed, angular_velocity, turn_table: np.ndarray = None):
+    """Returns (time[], distance[], final_speed[]) of DriveTurnFaceTarget facing targets at angle from the car's
+    forward direction, with some forward speeds and yaw rates towards positive angles, looked up in the turn table.
+    The table is attached if it isn't given."""
+    if turn_table is None:
+        turn_table = attach_table(TURN_TABLE)
+
+    angle, speed, angular_velocity = np.broadcast_arrays(
+        np.asarray(angle, dtype=np.float64),
+        np.asarray(speed, dtype=np.float64),
+        np.asarray(angular_velocity, dtype=np.float64),
+    )
+    return turn_table_lookup(
+        np.atleast_1d(angle),
+        np.atleast_1d(speed),
+        np.atleast_1d(angular_velocity),
+        np.asarray(turn_table),
+        TABLE_ANGLES,
+        TABLE_SPEEDS,
+        TABLE_ANGULAR_VELOCITIES,
+    )
+
+
+def state_at_distance_turn_table(rel_loc, forward, vel, yaw_rate, boost, turn_table: np.ndarray = None):
+    """Like state_at_distance_turning_vectorized, but the cars turn to face the targets like DriveTurnFaceTarget,
+    with the time and distance of the turn from the turn table, and then drive the rest of the way straight.
+    Takes (n, 3) arrays of the targets relative to the cars, the cars' forward directions and velocities,
+    and the yaw rates, and returns the (time[], vel[n, 3], boost[]) reached on the ground."""
+    rel_loc = np.atleast_2d(np.asarray(rel_loc, dtype=np.float64))
+    forward = np.broadcast_to(np.asarray(forward, dtype=np.float64), rel_loc.shape)
+    vel = np.broadcast_to(np.asarray(vel, dtype=np.float64), rel_loc.shape)
+    yaw_rate = np.broadcast_to(np.asarray(yaw_rate, dtype=np.float64), rel_loc.shape[:1])
+    boost = np.broadcast_to(np.asarray(boost, dtype=np.float64), rel_loc.shape[:1])
+
+    # the targets in the car's local coordinates on the ground, like state_at_distance_turning_vectorized
+    forward_x = forward[:, 0]
+    forward_y = forward[:, 1]
+    forward_norm = np.maximum(np.sqrt(forward_x**2 + forward_y**2), 1e-9)
+    forward_x = forward_x / forward_norm
+    forward_y = forward_y / forward_norm
+
+    x = rel_loc[:, 0] * forward_x + rel_loc[:, 1] * forward_y
+    y = -rel_loc[:, 0] * forward_y + rel_loc[:, 1] * forward_x
+    forward_vel = np.maximum(vel[:, 0] * forward_x + vel[:, 1] * forward_y, 0)
+
+    time, turn_distance, turn_speed = turn_time(np.arctan2(y, x), forward_vel, yaw_rate, turn_table)
+
+    # the distance driven while turning is counted as getting closer to the target
+    distance = np.sqrt(x**2 + y**2)
+    straight_time, final_speed, final_boost = state_at_distance_vectorized(
+        np.maximum(distance - turn_distance, 0), turn_speed, np.ascontiguousarray(boost)
+    )
+
+    final_vel_3d = np.zeros(rel_loc.shape)
+    final_vel_3d[:, :2] = rel_loc[:, :2] * (final_speed / np.maximum(distance, 1e-9))[:, None]
+    return time + straight_time, final_vel_3d, final_boost
+
+
+def main():
+    """Generating the table and testing for errors and performance"""
+
+    from timeit import timeit
+
+    time_taken = timeit(lambda: publish_table(TURN_TABLE), number=1)
+    print(f"Took {time_taken} seconds to generate the table.")
+
+    angle = np.linspace(-math.pi, math.pi, 360)
+    speed = np.linspace(0, 2300, 360)
+    angular_velocity = np.zeros(360)
+
+    def test_function():
+        return turn_time(angle, speed, angular_velocity)[0]
+
+    print(test_function())
+
+    fps = 120
+    n_times = 10000
+    time_taken = timeit(test_function, number=n_times)
+    percentage = time_taken * fps / n_times * 100
+
+    print(f"Took {time_taken} seconds to run {n_times} times.")
+    print(f"That's {percentage:.5f} % of our time budget.")
+
+    rel_loc = np.stack([np.cos(angle), np.sin(angle), np.zeros(360)], axis=1) * 2000
+
+    def test_function():
+        return state_at_distance_turn_table(rel_loc, np.array([1.0, 0.0, 0.0]), np.array([1000.0, 0.0, 0.0]), 0, 50)[0]
+
+    print(test_function())
+
+    time_taken = timeit(test_function, number=n_times)
+    percentage = time_taken * fps / n_times * 100
+
+    print(f"Took {time_taken} seconds to run {n_times} times with 360 targets.")
+    print(f"That's {percentage:.5f} % of our time budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,18 +8,30 @@ def render_local_line_3d(renderer, local_line, origin_loc, origin_rot_matrix, co
     renderer.draw_line_3d(point1, point2, color)
 
 
-def render_hitbox(renderer, my_loc, my_rot, color, hitbox_corner, hitbox_offset):
-    """Uses the renderer to draw a wireframe view of the car's hitbox."""
-
-    signs = ([1, 1, 1], [-1, -1, 1], [-1, 1, -1], [1, -1, -1])
-
-    for s in signs:
-        point = hitbox_corner * np.array(s)
-        for i in range(3):
-            ss = np.array([1, 1, 1])
-            ss[i] *= -1
-            line = np.array([point + hitbox_offset, point * ss + hitbox_offset])
-            render_local_line_3d(renderer, line, my_loc, my_rot, color)
+def _hitbox_edge_signs() -> np.ndarray:
+    """Signs of the corners at both ends of the 12 edges of a box, each edge flips one axis of a corner."""
+    corners = np.array([[1, 1, 1], [-1, -1, 1], [-1, 1, -1], [1, -1, -1]])
+    flips = 1 - 2 * np.eye(3, dtype=int)
+    starts = np.repeat(corners, 3, axis=0)
+    ends = starts * np.tile(flips, (4, 1))
+    return np.stack((starts, ends), axis=1)
+
+
+# (12, 2, 3)
+HITBOX_EDGE_SIGNS = _hitbox_edge_signs()
+
+
+def hitbox_edges(my_loc, my_rot, hitbox_corner, hitbox_offset) -> np.ndarray:
+    """The start and end of the 12 edges of the car's hitbox in world coordinates, as a (12, 2, 3) array."""
+    local = HITBOX_EDGE_SIGNS * hitbox_corner + hitbox_offset
+    return local @ np.transpose(my_rot) + my_loc
+
+
+def render_hitbox(render_buffer, my_loc, my_rot, color, hitbox_corner, hitbox_offset):
+    """Uses the render buffer to draw a wireframe view of the car's hitbox, all the edges in one batch."""
+
+    edges = hitbox_edges(my_loc, my_rot, hitbox_corner, hitbox_offset)
+    render_buffer.draw_lines_3d(edges[:, 0], edges[:, 1], color)
 
 
 def render_car_text(renderer, car, text_list, text_color, text_size=2, spacing=20):
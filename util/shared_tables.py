@@ -0,0 +1,90 @@
+import glob
+import hashlib
+import inspect
+import os
+import tempfile
+from typing import Callable, Dict, Iterable, NamedTuple
+
+import numpy as np
+
+# the tables are published once per machine, as .npy files memory mapped read only by every bot process
+TABLES_DIRECTORY = os.environ.get("DISASTERBOT_TABLES", os.path.join(tempfile.gettempdir(), "disaster_bot_tables"))
+
+
+class TableSpec(NamedTuple):
+    build: Callable[[], np.ndarray]
+    version: int
+    # the values and the modules the table is built from, changing any of them makes published tables stale
+    inputs: tuple
+    sources: tuple
+
+
+_specs: Dict[str, TableSpec] = {}
+_attached: Dict[str, np.ndarray] = {}
+
+
+def register_table(name: str, build: Callable[[], np.ndarray], version: int = 1, inputs=(), sources=()):
+    """Registers how to build a table, so that it can be attached by name."""
+    _specs[name] = TableSpec(build, version, tuple(inputs), tuple(sources))
+
+
+def table_hash(name: str) -> str:
+    """Hash of everything the table depends on, it's part of the published file name."""
+    spec = _specs[name]
+    sha = hashlib.sha1(f"{name} {spec.version}".encode())
+    for value in spec.inputs:
+        value = np.asarray(value)
+        sha.update(f"{value.dtype} {value.shape}".encode())
+        sha.update(value.tobytes())
+    for source in spec.sources:
+        sha.update(inspect.getsource(source).encode())
+    return sha.hexdigest()[:16]
+
+
+def table_path(name: str) -> str:
+    return os.path.join(TABLES_DIRECTORY, f"{name}-{table_hash(name)}.npy")
+
+
+def publish_table(name: str) -> str:
+    """Builds the table and publishes it, replacing the stale versions. Returns the path of the published file."""
+    path = table_path(name)
+    os.makedirs(TABLES_DIRECTORY, exist_ok=True)
+
+    # written next to it's final path and renamed, so that other processes never see a partial file
+    table = np.ascontiguousarray(_specs[name].build())
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as file:
+        np.save(file, table)
+    os.replace(temporary_path, path)
+
+    for stale_path in glob.glob(os.path.join(TABLES_DIRECTORY, f"{name}-*.npy")):
+        if stale_path != path:
+            try:
+                os.remove(stale_path)
+            except OSError:
+                # still mapped by a running process on some systems, it's removed by a later publish
+                pass
+
+    return path
+
+
+def attach_table(name: str) -> np.ndarray:
+    """The read only table, memory mapped from the published file. It's built and published first
+    if it doesn't exist yet or is stale. Attached tables are reused for the lifetime of the process."""
+    table = _attached.get(name)
+    if table is None:
+        path = table_path(name)
+        if not os.path.exists(path):
+            publish_table(name)
+        try:
+            table = np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            # a corrupted file, from a crash before atomic publishing or a full disk
+            publish_table(name)
+            table = np.load(path, mmap_mode="r")
+        _attached[name] = table
+    return table
+
+
+def attach_tables(names: Iterable[str]) -> Dict[str, np.ndarray]:
+    return {name: attach_table(name) for name in names}